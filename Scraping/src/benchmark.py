@@ -0,0 +1,415 @@
+"""
+Benchmarks for the scraper
+
+benchmark_scroll() runs the old fixed scroll schedule and the adaptive
+ScrollController against a simulated infinite-scroll feed on a virtual clock,
+so thousands of simulated scroll seconds take milliseconds of real time.
+
+benchmark_convert() times src.posts.convert_accounts on synthetic exports
+with an increasing number of worker processes.
+
+benchmark_standin() runs the real BundesScraper.process_profile in Firefox
+against the local stand-in (src/standin.py) and reports seconds per account,
+posts captured per minute and the time spent in each phase.
+
+benchmark_lean() runs the same stand-in accounts with and without
+Config.LEAN_BROWSER and checks that blocking media leaves every capture
+count unchanged while downloads, browser RSS and CPU per scroll drop.
+
+    python -m src.benchmark scroll
+    python -m src.benchmark convert --accounts 48 --posts 1500
+    python -m src.benchmark standin --accounts 6 --posts 30 300 --headless
+    python -m src.benchmark lean --accounts 4 --posts 60
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.scroll import ScrollController
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class SimulatedFeed:
+    """
+    Infinite-scroll profile grid
+
+    A scroll to the bottom requests the next page of `page_size` posts if no
+    request is in flight. The response lands after `latency` seconds (plus an
+    occasional long stall, like Instagram throttling) and is captured by
+    Zeeschuimer at the same moment the grid grows.
+    """
+
+    def __init__(self, clock, total_posts, page_size=12, latency=(0.6, 1.4),
+                 stall_chance=0.05, stall_latency=(4, 10), row_height=300, seed=0):
+        self.clock = clock
+        self.total_posts = total_posts
+        self.page_size = page_size
+        self.latency = latency
+        self.stall_chance = stall_chance
+        self.stall_latency = stall_latency
+        self.row_height = row_height
+        self.rng = random.Random(seed)
+
+        self.loaded = min(page_size, total_posts)  # first page comes with the profile
+        self._pending = None  # (ready_at, posts)
+
+    def _settle(self):
+        if self._pending and self._pending[0] <= self.clock():
+            self.loaded = min(self.total_posts, self.loaded + self._pending[1])
+            self._pending = None
+
+    def scroll(self):
+        self._settle()
+        if self._pending is None and self.loaded < self.total_posts:
+            if self.rng.random() < self.stall_chance:
+                delay = self.rng.uniform(*self.stall_latency)
+            else:
+                delay = self.rng.uniform(*self.latency)
+            self._pending = (self.clock() + delay, self.page_size)
+
+    @property
+    def captured(self):
+        self._settle()
+        return self.loaded
+
+    @property
+    def height(self):
+        self._settle()
+        return 400 + (self.loaded // 3 + 1) * self.row_height
+
+
+def run_fixed_schedule(feed, clock, target_count, seed=0):
+    """The pre-controller loop: 30-scroll rounds, 1.5-3 s per scroll, 5 retries"""
+    rng = random.Random(seed)
+    retries = 0
+    last_count = 0
+    while True:
+        scrolls = 0
+        last_height = 0
+        no_change_count = 0
+        while scrolls < 30:
+            feed.scroll()
+            clock.sleep(rng.uniform(1.5, 3))
+            scrolls += 1
+            new_height = feed.height
+            if new_height == last_height:
+                no_change_count += 1
+                if no_change_count >= 3:
+                    break
+            else:
+                no_change_count = 0
+            last_height = new_height
+            if feed.captured >= target_count:
+                break
+
+        current_count = feed.captured
+        clock.sleep(1)
+        if retries >= 5 or current_count >= target_count:
+            return current_count
+        if current_count == last_count:
+            retries += 1
+        else:
+            retries = 0
+        last_count = current_count
+        clock.sleep(rng.uniform(1.5, 3))
+
+
+def run_adaptive(feed, clock, target_count, **controller_kwargs):
+    """Mirror of BundesScraper.scroll_profile driven by ScrollController"""
+    controller = ScrollController(target_count, clock=clock, **controller_kwargs)
+    controller.start(feed.captured, feed.height)
+    while not controller.done:
+        feed.scroll()
+        clock.sleep(controller.next_delay())
+        controller.observe(feed.captured, feed.height)
+    return controller
+
+
+def benchmark_scroll(post_counts=(50, 500, 5000), repeats=5, **feed_kwargs):
+    """Seconds per account and capture rate: fixed schedule vs. ScrollController"""
+    rows = []
+    for total in post_counts:
+        for seed in range(repeats):
+            clock = SimulatedClock()
+            feed = SimulatedFeed(clock, total, seed=seed, **feed_kwargs)
+            captured = run_fixed_schedule(feed, clock, total, seed=seed)
+            rows.append({'schedule': 'fixed', 'posts': total, 'seed': seed,
+                         'captured': captured, 'seconds': clock.now})
+
+            clock = SimulatedClock()
+            feed = SimulatedFeed(clock, total, seed=seed, **feed_kwargs)
+            random.seed(seed)
+            controller = run_adaptive(feed, clock, total)
+            rows.append({'schedule': 'adaptive', 'posts': total, 'seed': seed,
+                         'captured': controller.count, 'seconds': clock.now})
+
+    results = pd.DataFrame(rows)
+    results['posts_per_min'] = results['captured'] / results['seconds'] * 60
+    return (results
+            .groupby(['posts', 'schedule'])[['captured', 'seconds', 'posts_per_min']]
+            .mean()
+            .round(1))
+
+
+def write_synthetic_exports(directory, accounts=24, posts=1000, seed=0):
+    """Zeeschuimer-style exports for `accounts` fake handles; returns the accounts frame"""
+    from src.standin import make_profile
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = []
+    for n in range(accounts):
+        handle = f"mdb_{n:03d}"
+        profile = make_profile(handle, posts, seed=seed + n)
+        path = directory / f"{handle}.ndjson"
+        with open(path, "w", encoding="utf-8") as f:
+            for item in profile["items"]:
+                # Longer captions, closer to real posts (and to the regex cost)
+                item["caption"]["text"] += " " + " ".join(f"#thema{k} Satz {k}." for k in range(20))
+                f.write(json.dumps({"item_id": item["code"], "source_platform": "instagram.com", "data": item}) + "\n")
+        rows.append({"IG_handle": handle, "Export_Path": str(path)})
+    return pd.DataFrame(rows)
+
+
+def benchmark_convert(accounts=24, posts=1000, workers=None):
+    """Wall time of convert_accounts over the same exports per worker count"""
+    from src.posts import convert_accounts
+
+    if workers is None:
+        cores = os.cpu_count() or 1
+        workers = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        accounts_df = write_synthetic_exports(tmp / "exports", accounts, posts)
+        for n in workers:
+            out = tmp / f"workers_{n}"
+            started = time.perf_counter()
+            result = convert_accounts(accounts_df, out / "post_csvs", out / "global_posts",
+                                      out / "accounts_analysis.csv", workers=n)
+            seconds = time.perf_counter() - started
+            rows.append({'workers': n, 'converted': int(result['CSV_Path'].notna().sum()),
+                         'seconds': round(seconds, 2), 'posts_per_sec': round(accounts * posts / seconds)})
+
+    results = pd.DataFrame(rows).set_index('workers')
+    results['speedup'] = (results['seconds'].iloc[0] / results['seconds']).round(2)
+    return results
+
+
+def _process_tree(pid):
+    """pid and all its descendants (Firefox content processes), from /proc"""
+    children = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack += children.get(current, [])
+    return tree
+
+
+def browser_usage(pid):
+    """(RSS in MB, CPU seconds) of a browser process tree; (None, None) without /proc"""
+    if not pid or not Path(f"/proc/{pid}").exists():
+        return None, None
+    page_kb = os.sysconf("SC_PAGE_SIZE") / 1024
+    ticks = os.sysconf("SC_CLK_TCK")
+    rss_kb = cpu = 0.0
+    for process in _process_tree(pid):
+        try:
+            rss_kb += int(Path(f"/proc/{process}/statm").read_text().split()[1]) * page_kb
+            fields = Path(f"/proc/{process}/stat").read_text().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / ticks  # utime + stime
+        except (OSError, IndexError):
+            continue
+    return rss_kb / 1024, cpu
+
+
+def run_standin(accounts=6, post_counts=(30, 300), page_size=12, latency=(0.2, 0.6),
+                headless=False, lean=False, work_dir="data/benchmark"):
+    """
+    process_profile in Firefox for every stand-in account
+
+    Every account of every post count gets a stand-in profile of exactly that
+    many posts; tracking state, exports and metrics go to `work_dir`, so
+    data/ stays untouched. Returns one row per account (captured posts and
+    the seconds of every phase process_profile records, see src.metrics)
+    and the run totals: browser start, media downloads, browser peak RSS
+    and CPU seconds per scroll.
+    """
+    from src.config.config import Config
+    from src.journal import StateJournal
+    from src.metrics import ACCOUNT, ScrapeMetrics, load_metrics
+    from src.scraper import BundesScraper
+    from src.standin import StandInServer, make_profile
+
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    profiles = [make_profile(f"mdb_{posts}_{n:03d}", posts, followers=12_345, following=321, seed=n)
+                for posts in post_counts for n in range(accounts)]
+    links = pd.Series([f"https://www.instagram.com/{profile['handle']}/" for profile in profiles], dtype="string")
+    frame = pd.DataFrame({'Account-Link': links, 'scrape_status': 'pending', 'Export_Path': '',
+                          'Export_Segments': '', 'ZS_count': '0', 'IG_count': '0'}, dtype="string")
+
+    config = Config()
+    config.HUMAN_DELAY = False
+    config.HEADLESS = headless
+    config.LEAN_BROWSER = lean
+    scraper = BundesScraper(config, worker_id="benchmark", accounts=frame)
+    scraper.accounts_csv = work_dir / "accounts.csv"
+    scraper.journal = StateJournal(work_dir / "accounts.journal", fsync=config.JOURNAL_FSYNC)
+    scraper.exports_dir = work_dir / "exports"
+    scraper.exports_dir.mkdir(parents=True, exist_ok=True)
+    run = time.strftime('%Y%m%d_%H%M%S')
+    scraper.metrics = ScrapeMetrics(work_dir / "metrics", f"standin-{run}", worker="benchmark")
+    scraper.options = scraper._configure_firefox()
+
+    rows = []
+    peak_rss = cpu_seconds = None
+    with StandInServer(profiles, page_size=page_size, latency=latency) as standin:
+        with scraper.metrics.span("browser_start"):
+            scraper.start_browser(test_url=standin.url)
+        pid = scraper.driver.capabilities.get("moz:processID")
+        _, cpu_start = browser_usage(pid)
+        scraper.popup_url = standin.popup_url
+        scraper.driver.get(scraper.popup_url)
+        try:
+            for idx, link in links.items():
+                ok = scraper.process_profile(idx, standin.profile_url(link))
+                handle = standin.handle_of(link)
+                rows.append({'account': handle, 'posts': standin.profiles[handle]['posts'], 'ok': ok,
+                             'captured': int(scraper.accounts.at[idx, 'ZS_count']) if ok else 0,
+                             'served': standin.served_count(handle), 'received': standin.received_count(handle)})
+                rss, cpu = browser_usage(pid)
+                if rss is not None:
+                    peak_rss = max(peak_rss or 0.0, rss)
+                    cpu_seconds = cpu - cpu_start
+        finally:
+            scraper.driver.quit()
+
+    records = load_metrics([scraper.metrics.path])
+    accounts_records = records[records['account'].notna()]
+    phases = accounts_records.pivot_table(index='account', columns='phase', values='seconds', aggfunc='sum')
+    results = pd.DataFrame(rows).set_index('account').join(phases.rename(columns={ACCOUNT: 'seconds'}))
+    scrolls = pd.to_numeric(accounts_records['scrolls'], errors='coerce').sum() if 'scrolls' in accounts_records else 0
+    stats = {
+        'startup_seconds': records.loc[records['phase'] == 'browser_start', 'seconds'].sum(),
+        'media_requests': standin.media_requests,
+        'media_mb': standin.media_bytes / 1e6,
+        'browser_peak_rss_mb': peak_rss,
+        'cpu_s_per_scroll': cpu_seconds / scrolls if cpu_seconds is not None and scrolls else None,
+    }
+    return results, stats
+
+
+def benchmark_standin(accounts=6, post_counts=(30, 300), page_size=12, latency=(0.2, 0.6),
+                      headless=False, lean=False, work_dir="data/benchmark"):
+    """Seconds per account, posts per minute and per-phase seconds of process_profile, by post count"""
+    results, stats = run_standin(accounts, post_counts, page_size, latency, headless, lean, work_dir)
+    phase_columns = [column for column in results.columns
+                     if column not in ('posts', 'ok', 'captured', 'served', 'received', 'seconds')]
+    summary = results.groupby('posts').agg(
+        accounts=('ok', 'size'), ok=('ok', 'sum'), captured=('captured', 'mean'),
+        s_per_account=('seconds', 'mean'), **{phase: (phase, 'mean') for phase in phase_columns})
+    summary['posts_per_min'] = summary['captured'] / summary['s_per_account'] * 60
+    summary = summary.round(2)
+    summary.attrs.update(stats)
+    return summary
+
+
+def benchmark_lean(accounts=4, post_counts=(60,), page_size=12, latency=(0.2, 0.6), headless=True,
+                   work_dir="data/benchmark"):
+    """
+    Full vs. Config.LEAN_BROWSER on the same stand-in profiles
+
+    Returns one row per mode (captured posts, posts served but never received
+    by the page, seconds per account, media downloads, browser peak RSS, CPU
+    per scroll) and whether blocking media cost Zeeschuimer nothing: every
+    account scraped in both modes, with the same capture counts, and every
+    post the stand-in served was reported back by the browser (the stand-in
+    captures in the page, see src.standin).
+    """
+    rows, captured = [], {}
+    complete = True
+    for lean in (False, True):
+        mode = "lean" if lean else "full"
+        results, stats = run_standin(accounts, post_counts, page_size, latency, headless, lean,
+                                     Path(work_dir) / mode)
+        captured[mode] = results['captured']
+        lost = int((results['served'] - results['received']).sum())
+        complete = complete and results['ok'].all() and lost == 0
+        rows.append({'mode': mode, 'ok': int(results['ok'].sum()), 'captured': int(results['captured'].sum()),
+                     'lost': lost, 's_per_account': results['seconds'].mean(), **stats})
+    same_capture = complete and captured['full'].equals(captured['lean'])
+    return pd.DataFrame(rows).set_index('mode').round(3), same_capture
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scroll = sub.add_parser("scroll", help="fixed vs. adaptive scroll schedule on a simulated feed")
+    scroll.add_argument("--posts", type=int, nargs="+", default=[50, 500, 5000])
+    scroll.add_argument("--repeats", type=int, default=5)
+
+    convert = sub.add_parser("convert", help="ndjson -> post CSV conversion vs. number of worker processes")
+    convert.add_argument("--accounts", type=int, default=24)
+    convert.add_argument("--posts", type=int, default=1000)
+    convert.add_argument("--workers", type=int, nargs="+", default=None)
+
+    standin = sub.add_parser("standin", help="process_profile in Firefox against the local stand-in")
+    standin.add_argument("--accounts", type=int, default=6, help="accounts per post count")
+    standin.add_argument("--posts", type=int, nargs="+", default=[30, 300])
+    standin.add_argument("--page-size", type=int, default=12)
+    standin.add_argument("--latency", type=float, nargs=2, default=[0.2, 0.6], metavar=("MIN", "MAX"))
+    standin.add_argument("--headless", action="store_true")
+    standin.add_argument("--lean", action="store_true", help="Config.LEAN_BROWSER (no images, video, fonts)")
+
+    lean = sub.add_parser("lean", help="full vs. lean browser: capture counts, media, RSS and CPU per scroll")
+    lean.add_argument("--accounts", type=int, default=4)
+    lean.add_argument("--posts", type=int, nargs="+", default=[60])
+    lean.add_argument("--headed", action="store_true", help="show the browser windows")
+
+    args = parser.parse_args()
+    if args.command == "scroll":
+        print(benchmark_scroll(args.posts, args.repeats).to_string())
+    elif args.command == "convert":
+        print(benchmark_convert(args.accounts, args.posts, args.workers).to_string())
+    elif args.command == "standin":
+        results = benchmark_standin(args.accounts, args.posts, args.page_size, tuple(args.latency),
+                                    args.headless, args.lean)
+        print(f"Browser start: {results.attrs['startup_seconds']:.1f}s, "
+              f"media: {results.attrs['media_requests']} requests / {results.attrs['media_mb']:.1f} MB")
+        print(results.to_string())
+    elif args.command == "lean":
+        results, same_capture = benchmark_lean(args.accounts, args.posts, headless=not args.headed)
+        print(results.to_string())
+        print(f"Capture complete and identical: {'yes' if same_capture else 'NO'}")
+        if not same_capture:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
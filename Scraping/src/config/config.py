@@ -32,9 +32,26 @@ class Config:
     # Add these new settings
     MAX_SCROLL_ATTEMPTS = 3
     SCROLL_VERIFICATION_INTERVAL = 30  # Seconds between checks
+    SCROLL_MIN_DELAY = 0.3  # Seconds between scrolls while posts keep arriving
+    SCROLL_MAX_DELAY = 6.0  # Backoff ceiling while the feed stalls
+    SCROLL_MAX_STALLS = 12  # Consecutive scrolls without new posts before giving up
+    SCROLL_MAX_SCROLLS = 5000  # Hard cap per account, ~3x what a 5000-post feed needs
+    SCROLL_MAX_DURATION = 1800  # Seconds of scrolling per account before giving up
     MIN_EXPORT_SIZE = 1024  # 1KB
+    WAIT_TIMEOUT = 10  # Seconds for popup/page readiness conditions
+    EXPORT_TIMEOUT = 60  # Seconds for the .ndjson download to finish
+    HUMAN_DELAY = True  # Randomized anti-detection pauses (_human_delay/_human_type)
+    HUMAN_DELAY_SCALE = 1.0  # Multiplier for those pauses
     RATE_LIMIT_EVERY = 5  # Accounts
     RATE_LIMIT_DELAY = 15  # Seconds
+    POOL_WORKERS = 3  # Parallel Firefox/Zeeschuimer sessions in ScraperPool
+    INCREMENTAL = False  # Re-scrape exported accounts only back to their newest exported post
+    PINNED_POSTS = 3  # Instagram shows up to 3 pinned (old) posts before the newest ones
+    JOURNAL_FSYNC = True  # fsync every accounts.journal line (crash-safe, a few ms per update)
+    PERSISTENT_PROFILE = False  # Keep cookies + Zeeschuimer in data/browser_profiles/, log in only if the session expired
+    HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"  # Firefox without a window (servers, many workers)
+    WINDOW_SIZE = (1366, 900)  # Fixed viewport, so headless runs load as many grid rows per scroll
+    LEAN_BROWSER = False  # Block images, video and web fonts; Zeeschuimer only needs the API JSON
 
     # Testing Configuration
     MIN_FOLLOWERS = 1
@@ -51,9 +68,9 @@ class Config:
     
     TRACKING_COLUMNS = [
         'Account-Link', 'scrape_status', 'last_scraped',
-        'Export_Path', 'ZS_count', 'IG_count',
+        'Export_Path', 'Export_Segments', 'ZS_count', 'IG_count',
         'IG_Followers', 'IG_Followed',
-        'Scrape_Start', 'Scrape_End', 'Notes'
+        'Scrape_Start', 'Scrape_End', 'Scroll_Seconds', 'Notes'
     ]
     
     CSV_COLUMNS = TRACKING_COLUMNS  # Alias for consistency
@@ -67,7 +84,7 @@ class Config:
         self.password = os.getenv("INSTAGRAM_PASSWORD")
         self.zeeschuimer_xpi = Path(os.getenv("ZEESCHUIMER_XPI_PATH", "src/extension/zeeschuimer.xpi")).resolve()
         self.data_dir = Path(os.getenv("DATA_DIR", "data")).resolve()
-        self.headless = os.getenv("HEADLESS", "False").lower() == "true"
+        self.headless = self.HEADLESS
 
         # Ensure extensions directory exists
         self.extension_dir = Path("src/extension")
@@ -87,7 +104,6 @@ class Config:
         self.EXPORTS_DIR.mkdir(exist_ok=True)
         
         # Scraping parameters
-        self.HEADLESS = False
         self.TEST_MODE = True
 
     @property
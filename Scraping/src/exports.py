@@ -0,0 +1,273 @@
+"""
+Zeeschuimer export detection
+
+Firefox creates an empty placeholder under the final file name when a
+download starts, writes into a .part file and moves it over the placeholder
+when it is done. ExportWatcher listens for those filesystem events (inotify
+and friends via watchdog) instead of sleeping and globbing the whole exports
+dir, and only hands out a file once it passes MIN_EXPORT_SIZE and ends in a
+complete ndjson line (or, without a trailing newline, once its size stayed
+the same for a few polls).
+
+The helpers at the bottom read finished exports back: the newest post of an
+account (incremental re-scrapes stop there) and the delta segment that only
+keeps posts newer than it.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+EXPORT_PREFIX = "zeeschuimer-export-instagram.com-"
+SEGMENT_SEP = ";"  # Separator of the delta files in the Export_Segments column
+
+
+class FileCreationHandler(FileSystemEventHandler):
+    def __init__(self, event, pattern):
+        super().__init__()
+        self.event = event
+        self.pattern = pattern
+        self.paths = []
+        self._lock = threading.Lock()
+
+    def _matches(self, path):
+        name = os.path.basename(path)
+        return self.pattern in name and name.endswith(".ndjson")
+
+    def _signal(self, path):
+        if self._matches(path):
+            with self._lock:
+                if path not in self.paths:
+                    self.paths.append(path)
+            self.event.set()
+
+    def on_created(self, event):
+        if event.is_directory:
+            return
+        self._signal(event.src_path)
+
+    def on_moved(self, event):
+        # .part -> final name: the download is finished
+        if event.is_directory:
+            return
+        self._signal(event.dest_path)
+
+    def on_modified(self, event):
+        if event.is_directory:
+            return
+        self._signal(event.src_path)
+
+    def on_closed(self, event):
+        if event.is_directory:
+            return
+        self._signal(event.src_path)
+
+    def snapshot(self):
+        with self._lock:
+            return list(reversed(self.paths))  # newest first
+
+
+def last_line_complete(path, chunk_size=64 * 1024):
+    """True if the file ends with a newline-terminated, parseable JSON line"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return False
+        f.seek(max(0, size - chunk_size))
+        tail = f.read()
+    if not tail.endswith(b"\n"):
+        return False
+    lines = tail.rstrip(b"\n").split(b"\n")
+    if len(lines) == 1 and size > len(tail):
+        # Last line is longer than the chunk, fall back to reading it whole
+        with open(path, "rb") as f:
+            lines = f.read().rstrip(b"\n").split(b"\n")
+    try:
+        json.loads(lines[-1])
+    except ValueError:
+        return False
+    return True
+
+
+class ExportWatcher:
+    """
+    Watch a download dir for the next finished Zeeschuimer export
+
+    with ExportWatcher(exports_dir, min_size=config.MIN_EXPORT_SIZE) as watcher:
+        export_btn.click()
+        export = watcher.wait(timeout=60)
+    """
+
+    def __init__(self, directory, min_size=0, pattern=EXPORT_PREFIX, stable_polls=3):
+        self.directory = Path(directory)
+        self.min_size = min_size
+        self.stable_polls = stable_polls
+        self._sizes = {}  # path -> (size, polls it stayed that size)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._event = threading.Event()
+        self._handler = FileCreationHandler(self._event, pattern)
+        self._observer = None
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._observer = Observer()
+        self._observer.schedule(self._handler, str(self.directory), recursive=False)
+        self._observer.start()
+        return self
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _stable(self, path, size):
+        """Size unchanged for stable_polls consecutive checks"""
+        previous, polls = self._sizes.get(path, (None, 0))
+        polls = polls + 1 if size == previous else 0
+        self._sizes[path] = (size, polls)
+        return polls >= self.stable_polls
+
+    def _check(self, path):
+        """'ok', 'pending' (still downloading) or 'too_small'"""
+        try:
+            if not path.exists():
+                return 'pending'
+            size = path.stat().st_size
+            downloading = path.with_name(path.name + ".part").exists()
+            if size == 0:
+                # Firefox's placeholder while the .part file is written, otherwise an empty export
+                return 'pending' if downloading else 'too_small'
+            # No trailing newline (or a last line that does not parse) is fine once the size settled
+            complete = last_line_complete(path) or (not downloading and self._stable(path, size))
+        except OSError:
+            return 'pending'
+        if not complete:
+            return 'pending'
+        if size < self.min_size:
+            return 'too_small'
+        return 'ok'
+
+    def wait(self, timeout):
+        """Path of the finished export, or None on timeout/undersized export"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.warning(f"No complete export in {self.directory} after {timeout}s")
+                return None
+            # Re-check at least once a second in case a final write event got coalesced
+            self._event.wait(min(remaining, 1.0))
+            self._event.clear()
+
+            for path in map(Path, self._handler.snapshot()):
+                status = self._check(path)
+                if status == 'ok':
+                    return path
+                if status == 'too_small':
+                    self.logger.warning(
+                        f"Export {path.name} is only {path.stat().st_size} bytes "
+                        f"(MIN_EXPORT_SIZE {self.min_size}) - not using it"
+                    )
+                    return None
+
+
+def iter_export_records(path):
+    """Parsed lines of an ndjson export (broken lines are skipped)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def post_timestamp(item):
+    """Upload time of a post in epoch seconds (item-list or GraphQL format)"""
+    value = item.get("taken_at") or item.get("taken_at_timestamp")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def post_shortcode(item):
+    return item.get("code") or item.get("shortcode")
+
+
+def account_exports(export_path, segments=""):
+    """Existing export files of an account: the full export plus its delta segments"""
+    paths = []
+    values = [export_path] + ("" if segments is None else str(segments)).split(SEGMENT_SEP)
+    for value in values:
+        text = "" if value is None else str(value).strip()
+        if text in ("", "nan", "<NA>", "None"):  # empty CSV cells
+            continue
+        path = Path(text)
+        if path.is_file():
+            paths.append(path)
+    return paths
+
+
+def newest_post(paths):
+    """{'taken_at', 'shortcode', 'posts'} of the newest post in the given exports, or None"""
+    newest = None
+    posts = set()
+    for path in paths:
+        for record in iter_export_records(path):
+            item = record.get("data", record)
+            taken_at = post_timestamp(item)
+            if taken_at is None:
+                continue
+            posts.add(post_shortcode(item) or record.get("item_id"))
+            if newest is None or taken_at > newest["taken_at"]:
+                newest = {"taken_at": taken_at, "shortcode": post_shortcode(item)}
+    if newest is not None:
+        newest["posts"] = len(posts)
+    return newest
+
+
+def write_delta(export_path, segment_path, since):
+    """
+    Copy the posts of `export_path` taken after `since` into `segment_path`
+
+    Lines are copied verbatim, so a segment is a regular Zeeschuimer export.
+    Pinned (older) posts at the top of the grid are dropped with the rest of
+    the overlap. Returns the number of posts written; no file is created for
+    an empty delta.
+    """
+    lines = []
+    seen = set()
+    with open(export_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            item = record.get("data", record)
+            taken_at = post_timestamp(item)
+            key = post_shortcode(item) or record.get("item_id")
+            if taken_at is None or taken_at <= since or key in seen:
+                continue
+            seen.add(key)
+            lines.append(line if line.endswith("\n") else line + "\n")
+
+    if lines:
+        with open(segment_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+    return len(lines)
@@ -0,0 +1,97 @@
+"""
+Instagram profile header in one round trip
+
+PROFILE_HEADER_JS reads posts, followers, following, the private-account
+notice and the display name with a single execute_script; profile_header()
+wraps it as a WebDriverWait condition, so a profile costs one wait instead of
+one per counter. All counters go through parse_count, which understands the
+German and English header formats:
+
+    parse_count("1.298 Beiträge")   # 1298
+    parse_count("12,3 Tsd.")        # 12300
+    parse_count("1,2 Mio.")         # 1200000
+    parse_count("1.000 Tsd")        # 1000000
+    parse_count("12.3K")            # 12300
+"""
+import re
+
+from selenium.common.exceptions import WebDriverException
+
+# Counter text of the first span of every header list item, like
+# //header//ul/li[n]//span. Followers carry the exact count in their title
+# attribute ("12.345" next to "12,3 Tsd."), which is preferred when present.
+PROFILE_HEADER_JS = """
+const header = document.querySelector("header");
+const list = header && header.querySelector("ul");
+if (!list) return null;
+const counters = Array.from(list.querySelectorAll(":scope > li")).slice(0, 3).map(li => {
+    const span = li.querySelector("span[title]") || li.querySelector("span");
+    return span ? (span.getAttribute("title") || span.textContent) : null;
+});
+const privateNotice = Array.from(document.querySelectorAll("h2")).some(
+    h2 => /account is private|konto ist privat/i.test(h2.textContent));
+const heading = header.querySelector("h1");
+let name = heading ? heading.textContent.trim() : null;
+if (!name && document.title.includes(" (@")) name = document.title.split(" (@")[0].trim();
+return {counters: counters, private: privateNotice, name: name};
+"""
+
+# "T" (Tausend) is what data/raw_accounts.csv uses
+MULTIPLIERS = {"tsd": 1_000, "t": 1_000, "k": 1_000, "mio": 1_000_000, "m": 1_000_000,
+               "mrd": 1_000_000_000, "b": 1_000_000_000}
+_COUNT = re.compile(r"(\d[\d.,\s]*)\s*([^\W\d_]*)")
+
+
+def _decimal(number):
+    """Float from the number before a suffix: "12,3", "1.000", "1.234,5" (German) or "12.3", "1,234.5" (English)"""
+    separators = [i for i, char in enumerate(number) if char in ".,"]
+    if not separators:
+        return float(number)
+    last = separators[-1]
+    kinds = {number[i] for i in separators}
+    # "1.000 Tsd" / "1.234.567 Tsd": the dot groups thousands, "12.3K" / "1,5 Mio": a decimal point
+    thousands = len(kinds) == 1 and (len(separators) > 1 or number[last] == "." and len(number) - last - 1 == 3)
+    if thousands:
+        return float(re.sub(r"\D", "", number))
+    return float(re.sub(r"\D", "", number[:last]) + "." + number[last + 1:])
+
+
+def parse_count(text):
+    """Integer from a header counter ("1.298", "1,298", "12,3 Tsd.", "1.000 Tsd", "12.3K"), None if there is none"""
+    if text is None:
+        return None
+    match = _COUNT.search(str(text).replace("\xa0", " ").replace("\u202f", " "))
+    if not match:
+        return None
+    number, suffix = match.group(1).strip().replace(" ", ""), match.group(2).lower()
+    multiplier = MULTIPLIERS.get(suffix, 1)
+    if multiplier == 1:
+        # Separators are thousands separators in both locales
+        return int(re.sub(r"\D", "", number))
+
+    return int(round(_decimal(number) * multiplier))
+
+
+def read_header(driver):
+    """posts/followers/following counts, private flag and name of the open profile, None until rendered"""
+    raw = driver.execute_script(PROFILE_HEADER_JS)
+    if not raw or len(raw["counters"]) < 3:
+        return None
+    posts, followers, following = (parse_count(text) for text in raw["counters"])
+    if posts is None:
+        return None
+    return {
+        "posts": posts,
+        "followers": followers,
+        "following": following,
+        "private": bool(raw["private"]),
+        "name": raw["name"],
+    }
+
+
+def profile_header(driver):
+    """WebDriverWait condition: the parsed header once its counters are rendered"""
+    try:
+        return read_header(driver) or False
+    except WebDriverException:
+        return False
@@ -0,0 +1,119 @@
+"""
+Append-only state journal for accounts.csv
+
+Every change to an account's tracking columns is appended to
+data/accounts.journal as one JSON line (O(1) per update) instead of rewriting
+the whole CSV. compact() materializes accounts.csv on demand or at shutdown:
+it writes a temp file, moves it over the CSV with os.replace and only then
+empties the journal. On load the journal is replayed on top of accounts.csv.
+A crash can therefore only ever lose the line being written (replay skips a
+torn last line), and a crash between replace and truncate just replays values
+that are already in the CSV.
+
+    {"ts": "2025-03-01T12:00:00", "op": "set", "account": "https://www.instagram.com/x/",
+     "changes": {"scrape_status": "completed", "ZS_count": "412"}}
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+KEY = 'Account-Link'
+
+
+class StateJournal:
+    def __init__(self, path, fsync=True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, account, changes, op="set"):
+        """Journal new values of one account ('add' creates the row on replay)"""
+        line = json.dumps({
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "op": op,
+            "account": account,
+            "changes": changes,
+        }, default=str, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self._file.tell() and not self._ends_with_newline():
+                    self._file.write("\n")  # Close a torn line, so the next entry stays readable
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def entries(self):
+        """Journal lines in order, without a torn line from a crash"""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"Skipping unreadable journal line {number} in {self.path}")
+
+    def replay(self, accounts):
+        """Apply the journal to `accounts`; returns (accounts, number of entries applied)"""
+        rows = {link: idx for idx, link in accounts[KEY].items()} if KEY in accounts else {}
+        added = {}  # link -> columns of accounts added after the last compaction
+        applied = 0
+        for entry in self.entries():
+            account = entry.get("account")
+            changes = entry.get("changes", {})
+            if account in rows:
+                idx = rows[account]
+                for col, value in changes.items():
+                    if col not in accounts.columns:
+                        accounts[col] = pd.NA
+                    accounts.at[idx, col] = value
+            elif account in added:
+                added[account].update(changes)
+            elif entry.get("op") == "add":
+                added[account] = {KEY: account, **changes}
+            else:
+                continue  # Account filtered out of this run
+            applied += 1
+
+        if added:
+            accounts = pd.concat([accounts, pd.DataFrame(list(added.values()))], ignore_index=True)
+        return accounts, applied
+
+    def compact(self, accounts, csv_path):
+        """Write accounts.csv atomically, then start an empty journal"""
+        csv_path = Path(csv_path)
+        temp_path = csv_path.with_suffix(".csv.tmp")
+        accounts.to_csv(temp_path, index=False)
+        with open(temp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, csv_path)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self.path.exists():
+                open(self.path, "w").close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,217 @@
+"""
+Per-phase timings of a scrape run
+
+Every BundesScraper (and every pool worker) owns a ScrapeMetrics that writes
+one JSON line per finished phase to data/metrics/<name>.jsonl and keeps a
+Prometheus text file (<name>.prom, for node_exporter's textfile collector)
+up to date with the phase durations, retries and scroll stall events.
+
+Step-by-step code like process_profile uses a trace, where starting the next
+phase ends the current one:
+
+    trace = self.metrics.trace("knut_abraham_mdb")
+    trace.phase("profile_load")
+    ...
+    trace.phase("scroll", scrolls=41, stall_events=2)
+    trace.close(ok=True)
+
+Self-contained steps use a span:
+
+    with self.metrics.span("zeeschuimer_setup") as span:
+        span["attempts"] = 2
+
+Where does the time per account go (p50/p95 per phase):
+
+    python -m src.metrics data/metrics/*.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ACCOUNT = "account"  # phase name of the whole process_profile call
+PREFIX = "bundesposts"
+QUANTILES = (0.5, 0.95)
+
+logger = logging.getLogger(__name__)
+
+
+class Trace:
+    """Consecutive phases of one account (or of a setup step); each phase() ends the one before"""
+
+    def __init__(self, metrics, account, total=ACCOUNT):
+        self.metrics = metrics
+        self.account = account
+        self.total = total
+        self.started = time.perf_counter()
+        self._phase = None  # (name, started, attributes)
+
+    def phase(self, name, **attributes):
+        self._end()
+        self._phase = (name, time.perf_counter(), attributes)
+
+    def set(self, **attributes):
+        """Attach attributes (counts, reasons) to the current phase"""
+        if self._phase:
+            self._phase[2].update(attributes)
+
+    def _end(self, ok=True):
+        if self._phase:
+            name, started, attributes = self._phase
+            self.metrics.record(name, time.perf_counter() - started, ok, account=self.account, **attributes)
+            self._phase = None
+
+    def close(self, ok, **attributes):
+        """End the current phase (failed unless `ok`) and record the total"""
+        self._end(ok)
+        self.metrics.record(self.total, time.perf_counter() - self.started, ok, account=self.account, **attributes)
+        self.metrics.write_prometheus()
+
+
+class ScrapeMetrics:
+    def __init__(self, directory="data/metrics", name="scrape", worker=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{name}.jsonl"
+        self.prom_path = self.directory / f"{name}.prom"
+        self.worker = worker
+        self.durations = {}  # phase -> [seconds]
+        self.failures = {}  # phase -> count
+        self.events = {}  # event -> count
+        self.stall_events = 0
+        self._lock = threading.Lock()
+
+    def trace(self, account, total=ACCOUNT):
+        return Trace(self, account, total)
+
+    @contextmanager
+    def span(self, phase, account=None, **attributes):
+        """Time a block; the yielded dict takes attributes, an exception marks the span failed"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield attributes
+            ok = True
+        finally:
+            self.record(phase, time.perf_counter() - started, ok, account=account, **attributes)
+            if account is None:
+                self.write_prometheus()
+
+    def record(self, phase, seconds, ok=True, account=None, **attributes):
+        with self._lock:
+            self.durations.setdefault(phase, []).append(seconds)
+            if not ok:
+                self.failures[phase] = self.failures.get(phase, 0) + 1
+            self.stall_events += int(attributes.get("stall_events", 0))
+        self._write({"phase": phase, "account": account, "seconds": round(seconds, 4), "ok": ok, **attributes})
+
+    def event(self, name, account=None, **attributes):
+        """Count a retry, restart, ... and log it as its own line"""
+        with self._lock:
+            self.events[name] = self.events.get(name, 0) + 1
+        self._write({"event": name, "account": account, **attributes})
+        self.write_prometheus()
+
+    def _write(self, entry):
+        entry = {"time": datetime.now().isoformat(timespec="milliseconds"), "worker": self.worker, **entry}
+        line = json.dumps(entry, default=str) + "\n"
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            # Metrics must never break a scrape
+            logger.warning(f"Could not write metrics to {self.path}: {str(e)}")
+
+    def write_prometheus(self):
+        """Replace the .prom file with the current totals (atomic, scrapers may read it anytime)"""
+        labels = f'worker="{self.worker}",' if self.worker is not None else ""
+        metric = f"{PREFIX}_phase_seconds"
+        lines = [f"# HELP {metric} Duration of scraper phases", f"# TYPE {metric} summary"]
+        with self._lock:
+            for phase, durations in sorted(self.durations.items()):
+                for q, value in zip(QUANTILES, np.quantile(durations, QUANTILES)):
+                    lines.append(f'{metric}{{{labels}phase="{phase}",quantile="{q}"}} {value:.4f}')
+                lines.append(f'{metric}_sum{{{labels}phase="{phase}"}} {sum(durations):.4f}')
+                lines.append(f'{metric}_count{{{labels}phase="{phase}"}} {len(durations)}')
+            lines += [f"# HELP {PREFIX}_phase_failures_total Phases that raised or reported failure",
+                      f"# TYPE {PREFIX}_phase_failures_total counter"]
+            lines += [f'{PREFIX}_phase_failures_total{{{labels}phase="{phase}"}} {count}'
+                      for phase, count in sorted(self.failures.items())]
+            lines += [f"# HELP {PREFIX}_events_total Retries and other scraper events",
+                      f"# TYPE {PREFIX}_events_total counter"]
+            lines += [f'{PREFIX}_events_total{{{labels}event="{name}"}} {count}'
+                      for name, count in sorted(self.events.items())]
+            lines += [f"# HELP {PREFIX}_scroll_stall_events_total Scroll backoffs while the feed stalled",
+                      f"# TYPE {PREFIX}_scroll_stall_events_total counter",
+                      f"{PREFIX}_scroll_stall_events_total{{{labels.rstrip(',')}}} {self.stall_events}"]
+        temp_path = self.prom_path.with_suffix(".prom.tmp")
+        try:
+            temp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            os.replace(temp_path, self.prom_path)
+        except OSError as e:
+            logger.warning(f"Could not write {self.prom_path}: {str(e)}")
+
+
+def load_metrics(paths):
+    """Phase records (no events) of one or more .jsonl files as a DataFrame"""
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            entries += [json.loads(line) for line in f if line.strip()]
+    frame = pd.DataFrame(entries)
+    if "phase" not in frame.columns:
+        return frame.iloc[0:0]
+    return frame[frame["phase"].notna()]
+
+
+def summarize(records):
+    """
+    p50/p95/mean seconds per account of every process_profile phase
+
+    share: part of the mean account time spent in the phase. Phases that
+    ran several times for one account (retries) are added up first. Empty
+    when no account finished yet (e.g. a trace with only the login).
+    """
+    empty = pd.DataFrame(columns=["p50", "p95", "mean", "share"])
+    if "account" not in records.columns or "phase" not in records.columns:
+        return empty
+    accounts = records[records["account"].notna() & records["phase"].notna()]
+    if ACCOUNT not in set(accounts["phase"]):
+        return empty
+    accounts = accounts.fillna({"worker": ""})
+    per_account = accounts.pivot_table(index=["worker", "account"], columns="phase", values="seconds",
+                                       aggfunc="sum", dropna=False)
+    per_account = per_account.dropna(subset=[ACCOUNT])
+    summary = pd.DataFrame({
+        "p50": per_account.quantile(0.5),
+        "p95": per_account.quantile(0.95),
+        "mean": per_account.mean(),
+    })
+    summary["share"] = summary["mean"] / summary.loc[ACCOUNT, "mean"]
+    return summary.sort_values("mean", ascending=False).round(3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Where the time per account goes")
+    parser.add_argument("paths", nargs="+", help="metrics .jsonl files")
+    args = parser.parse_args()
+
+    records = load_metrics(args.paths)
+    summary = summarize(records)
+    print(summary.to_string() if not summary.empty else "No finished accounts")
+    setup = records[records["account"].isna()] if "account" in records.columns else records.iloc[0:0]
+    if not setup.empty:
+        print()
+        print(setup.groupby("phase")["seconds"].describe()[["count", "50%", "max"]].round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Multi-browser worker pool for BundesScraper
+
+N isolated Firefox/Zeeschuimer sessions take accounts from a shared queue.
+Every worker has its own browser profile (Selenium creates a fresh one per
+Firefox instance), its own download dir (data/exports/worker_<n>) and its own
+zeeschuimer_uuid. The coordinator is a regular BundesScraper that owns
+self.accounts and is the only one writing accounts.csv; workers report their
+results back to it.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.scraper import BundesScraper
+
+
+class RateLimiter:
+    """RATE_LIMIT_EVERY/RATE_LIMIT_DELAY applied across all workers"""
+
+    def __init__(self, every, delay):
+        self.every = every
+        self.delay = delay
+        self._started = 0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next account may start"""
+        with self._lock:
+            if self.every and self._started and self._started % self.every == 0:
+                self._resume_at = time.monotonic() + self.delay
+            self._started += 1
+            resume_at = self._resume_at
+
+        pause = resume_at - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+
+class PoolWorker(BundesScraper):
+    """One browser session of the pool"""
+
+    def __init__(self, pool, worker_id):
+        self.pool = pool
+        # Workers keep no account state of their own
+        super().__init__(pool.config, worker_id=worker_id, accounts=pool.coordinator.accounts.iloc[0:0].copy())
+
+    def _record_export(self, idx, metadata):
+        self.pool.record_export(idx, metadata)
+
+    def _update_account(self, idx, **changes):
+        # Workers have no journal, the coordinator writes every state change
+        self.pool.update_account(idx, **changes)
+
+    def _save_accounts(self):
+        # Never compact the worker's empty frame over accounts.csv
+        self.pool.save()
+
+    def start_session(self):
+        """Launch Firefox and prepare Zeeschuimer + Instagram (or the stand-in)"""
+        standin = self.pool.standin
+        if standin:
+            with self.metrics.span("browser_start"):
+                self.start_browser(test_url=standin.url)
+            self.popup_url = standin.popup_url
+            self.driver.get(self.popup_url)
+            return
+
+        with self.metrics.span("browser_start"):
+            self.start_browser(test_url=None)
+        if not self.prepare_session():
+            raise RuntimeError("Instagram login failed")
+
+    def run(self):
+        """Thread target: drain the shared queue"""
+        try:
+            self.start_session()
+        except Exception as e:
+            # Accounts stay in the queue for the remaining workers
+            self.logger.critical(f"Worker could not start: {str(e)}", exc_info=True)
+            self._quit()
+            return
+
+        try:
+            while not self.pool.stop_event.is_set():
+                try:
+                    idx, link, baseline = self.pool.queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self.pool.rate_limiter.wait()
+                    self._scrape_account(idx, link, baseline)
+                finally:
+                    self.pool.queue.task_done()
+        finally:
+            self._quit()
+
+    def _scrape_account(self, idx, link, baseline=None):
+        profile_url = self.pool.standin.profile_url(link) if self.pool.standin else link
+        max_retries = self.config.MAX_RETRIES
+
+        for attempt in range(max_retries):
+            self.logger.info(f"\nProcessing profile: {link}")
+            try:
+                if self.process_profile(idx, profile_url, baseline):
+                    self.pool.mark_scraped(idx)
+                    return
+            except Exception as e:
+                self.logger.error(f"Error processing {link}: {str(e)}")
+
+            if attempt + 1 < max_retries:
+                self.logger.warning(f"Retrying {link} (attempt {attempt + 2}/{max_retries})")
+                self.metrics.event("retry", account=self._sanitize_handle(link), step="process_profile",
+                                   attempt=attempt + 2)
+                time.sleep(5)
+
+        self.logger.error(f"Failed to process {link} after {max_retries} attempts")
+        self.pool.mark_failed(idx)
+
+    def _quit(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self.logger.warning(f"Driver shutdown failed: {str(e)}")
+            self.driver = None
+
+
+class ScraperPool:
+    """
+    Coordinator for N PoolWorker sessions
+
+    pool = ScraperPool(config, workers=3)
+    pool.scrape_accounts()
+
+    Pass a started StandInServer as `standin` to run the same pool against
+    local fake profiles instead of instagram.com (see run_against_standin).
+    """
+
+    def __init__(self, config, workers=None, coordinator=None, standin=None):
+        self.config = config
+        self.size = workers or config.POOL_WORKERS
+        self.coordinator = coordinator or BundesScraper(config)
+        self.standin = standin
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.queue = queue.Queue()
+        self.rate_limiter = RateLimiter(config.RATE_LIMIT_EVERY, config.RATE_LIMIT_DELAY)
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.workers = []
+
+    @property
+    def accounts(self):
+        return self.coordinator.accounts
+
+    # Account state (coordinator only)
+    def record_export(self, idx, metadata):
+        with self._lock:
+            self.coordinator._record_export(idx, metadata)
+
+    def update_account(self, idx, **changes):
+        with self._lock:
+            self.coordinator._update_account(idx, **changes)
+
+    def mark_scraped(self, idx):
+        with self._lock:
+            new_status = self.coordinator._capture_status(idx)
+            self.logger.info(f"Successfully processed {self.accounts.at[idx, 'Account-Link']} ({new_status})")
+            self.coordinator._update_account(idx, scrape_status=new_status, last_scraped=datetime.now().isoformat())
+
+    def mark_failed(self, idx):
+        with self._lock:
+            self.coordinator._update_account(idx, scrape_status='failed')
+
+    def save(self):
+        """Compact the coordinator's journal into accounts.csv"""
+        with self._lock:
+            self.coordinator._save_accounts()
+
+    def _fill_queue(self, incremental=False):
+        if 'scrape_status' not in self.accounts.columns:
+            self.accounts['scrape_status'] = 'pending'
+
+        for idx, row in self.accounts.iterrows():
+            if 'Account-Link' not in row or pd.isna(row['Account-Link']) or not row['Account-Link']:
+                self.logger.info(f"Skipping row {idx}: No valid Account-Link")
+                self.coordinator._update_account(idx, scrape_status='skipped')
+                continue
+            # Baselines are read here, workers never look at the account table
+            baseline = self.coordinator._incremental_baseline(row) if incremental else None
+            if not baseline and BundesScraper._is_scraped(row):
+                self.logger.info(f"Skipping {row['Account-Link']}: {row['scrape_status']} profile")
+                continue
+            self.queue.put((idx, row['Account-Link'], baseline))
+
+    def scrape_accounts(self, incremental=None):
+        """Scrape all pending accounts with `size` browsers in parallel
+
+        incremental: see BundesScraper.scrape_accounts
+        """
+        if incremental is None:
+            incremental = self.config.INCREMENTAL
+        self._fill_queue(incremental)
+        pending = self.queue.qsize()
+        size = min(self.size, pending)
+        self.logger.info(f"Scraping {pending} accounts with {size} workers")
+
+        self.workers = [PoolWorker(self, worker_id) for worker_id in range(size)]
+        threads = [
+            threading.Thread(target=worker.run, name=f"pool-worker-{worker.worker_id}", daemon=True)
+            for worker in self.workers
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.logger.warning("Interrupted - letting workers finish their current account")
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.save()
+
+        left = self.queue.qsize()
+        if left:
+            self.logger.error(f"{left} accounts left unprocessed (no worker available)")
+        print("Scraping finished.")
+
+
+def run_against_standin(config, workers=2, limit=6, max_posts=60, work_dir="data/standin"):
+    """
+    Smoke-test the pool end to end against the local stand-in
+
+    Uses the first `limit` accounts with fresh tracking columns and writes
+    the tracking CSV to `work_dir`, so data/accounts.csv stays untouched.
+    """
+    from src.journal import StateJournal
+    from src.standin import StandInServer
+
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    accounts = pd.read_csv(config.ACCOUNTS_CSV, dtype="string").head(limit).reset_index(drop=True)
+    accounts = accounts.assign(scrape_status='pending', Export_Path='', Export_Segments='', ZS_count='0', IG_count='0')
+
+    coordinator = BundesScraper(config, accounts=accounts)
+    coordinator.accounts_csv = work_dir / "accounts.csv"
+    coordinator.journal = StateJournal(work_dir / "accounts.journal", fsync=config.JOURNAL_FSYNC)
+
+    with StandInServer.from_accounts(accounts, max_posts=max_posts) as standin:
+        pool = ScraperPool(config, workers=workers, coordinator=coordinator, standin=standin)
+        pool.scrape_accounts()
+
+    return pool.accounts
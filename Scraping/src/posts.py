@@ -0,0 +1,372 @@
+"""
+Zeeschuimer ndjson -> one row per post
+
+Streaming replacement for the importer in post_processing.ipynb
+(convert_single_ndjson_to_csv + the groupby("id").agg(list) dedup step).
+Every ndjson line is parsed once and mapped to a single post record with the
+media of a carousel already folded into the image_url/media_url lists, then
+written straight to the final CSV. Only the ids of posts already written are
+kept in memory, so memory stays flat however large an export is.
+
+The item mapping is taken from 4CAT, available under Mozilla Public License
+2.0 at https://github.com/digitalmethodsinitiative/4cat/tree/master/datasources/instagram
+(via Michael Achmann. (2023). michaelachmann/social-media-lab: 06.11.2023
+(v0.0.3). Zenodo. https://doi.org/10.5281/zenodo.8199901)
+
+    from src.posts import convert_accounts
+    accounts_df = convert_accounts(accounts_df, workers=4)
+
+The global corpus goes to the Parquet store in src/store.py.
+
+Accounts are independent, so convert_accounts spreads them over a process
+pool (JSON parsing and the hashtag regex are CPU bound).
+"""
+import csv
+import json
+import logging
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src import store
+from src.exports import account_exports
+
+logger = logging.getLogger(__name__)
+
+# some magic numbers instagram uses
+MEDIA_TYPE_PHOTO = 1
+MEDIA_TYPE_VIDEO = 2
+MEDIA_TYPE_CAROUSEL = 8
+
+HASHTAG_RE = re.compile(r"#([^\s!@#$%ˆ&*()_+{}:\"|<>?;'\,./`~']+)")
+
+# Column order of the post CSVs (= the columns of the old deduplicated CSVs)
+FIELDS = [
+    "id", "thread_id", "parent_id", "body", "author", "author_fullname",
+    "author_avatar_url", "timestamp", "type", "url", "image_url", "media_url",
+    "hashtags", "num_likes", "num_comments", "num_media", "location_name",
+    "location_latlong", "location_city", "unix_timestamp", "media_n",
+    "media_filename",
+]
+LIST_FIELDS = ("image_url", "media_url")
+
+
+def _location(node):
+    location = {"name": "", "latlong": "", "city": ""}
+    # location has 'id', 'has_public_page', 'name', and 'slug' keys in tested examples; no lat long or "city" though name seems
+    if node.get("location"):
+        location["name"] = node["location"].get("name")
+        location["latlong"] = str(node["location"]["lat"]) + "," + str(node["location"]["lng"]) if node[
+            "location"].get("lat") else ""
+        location["city"] = node["location"].get("city")
+    return location
+
+
+def parse_graph_item(node):
+    """
+    Parse Instagram post in Graph format
+
+    :param node:  Data as received from Instagram
+    :return dict:  Mapped post, media urls of all carousel items as lists
+    """
+    try:
+        caption = node["edge_media_to_caption"]["edges"][0]["node"]["text"]
+    except IndexError:
+        caption = ""
+
+    if node["__typename"] == "GraphSidecar":
+        media_nodes = [edge["node"] for edge in node["edge_sidecar_to_children"]["edges"]]
+    else:
+        media_nodes = [node]
+    num_media = len(media_nodes)
+
+    # for videos get the video url, for photos the highest resolution
+    image_urls, media_urls = [], []
+    for media_node in media_nodes:
+        if media_node["__typename"] == "GraphVideo":
+            media_url = media_node["video_url"]
+        elif media_node["__typename"] == "GraphImage":
+            resources = media_node.get("display_resources", media_node.get("thumbnail_resources"))
+            try:
+                media_url = resources[-1]["src"]
+            except (TypeError, IndexError, KeyError):
+                media_url = media_node.get("display_url", "")
+        else:
+            media_url = media_node["display_url"]
+        image_urls.append(node["display_url"])
+        media_urls.append(media_url)
+
+    # type, 'mixed' means carousel with video and photo
+    type_map = {"GraphImage": "photo", "GraphVideo": "video"}
+    if node["__typename"] != "GraphSidecar":
+        media_type = type_map.get(node["__typename"], "unknown")
+    else:
+        media_types = set([n["__typename"] for n in media_nodes])
+        media_type = "mixed" if len(media_types) > 1 else type_map.get(media_types.pop(), "unknown")
+
+    location = _location(node)
+    shortcode = node["shortcode"]
+
+    return {
+        "id": shortcode,
+        "thread_id": shortcode,
+        "parent_id": shortcode,
+        "body": caption,
+        "author": node["owner"]["username"],
+        "author_fullname": node["owner"].get("full_name", ""),
+        "author_avatar_url": node["owner"].get("profile_pic_url", ""),
+        "timestamp": datetime.fromtimestamp(node["taken_at_timestamp"]).strftime("%Y-%m-%d %H:%M:%S"),
+        "type": media_type,
+        "url": "https://www.instagram.com/p/" + shortcode,
+        "image_url": image_urls,
+        "media_url": media_urls,
+        "hashtags": ",".join(HASHTAG_RE.findall(caption)),
+        "num_likes": node["edge_media_preview_like"]["count"],
+        "num_comments": node.get("edge_media_preview_comment", {}).get("count", 0),
+        "num_media": num_media,
+        "location_name": location["name"],
+        "location_latlong": location["latlong"],
+        "location_city": location["city"],
+        "unix_timestamp": node["taken_at_timestamp"],
+        "media_n": 0,
+        "media_filename": f"{shortcode}_0" if num_media > 1 else shortcode,
+    }
+
+
+def parse_itemlist_item(node):
+    """
+    Parse Instagram post in 'item list' format
+
+    :param node:  Data as received from Instagram
+    :return dict:  Mapped post, media urls of all carousel items as lists
+    """
+    caption = "" if not node.get("caption") else node["caption"]["text"]
+
+    if node["media_type"] == MEDIA_TYPE_CAROUSEL:
+        media_nodes = node["carousel_media"]
+    else:
+        media_nodes = [node]
+    num_media = len(media_nodes)
+
+    # for videos get the video url, for photos the highest resolution
+    image_urls, media_urls = [], []
+    for media_node in media_nodes:
+        if media_node["media_type"] == MEDIA_TYPE_VIDEO:
+            media_url = media_node["video_versions"][0]["url"]
+            if "image_versions2" in media_node:
+                display_url = media_node["image_versions2"]["candidates"][0]["url"]
+            else:
+                # no image links at all :-/
+                # video is all we have
+                display_url = media_node["video_versions"][0]["url"]
+        elif media_node["media_type"] == MEDIA_TYPE_PHOTO:
+            media_url = media_node["image_versions2"]["candidates"][0]["url"]
+            display_url = media_url
+        else:
+            media_url = ""
+            display_url = ""
+        image_urls.append(display_url)
+        media_urls.append(media_url)
+
+    # type, 'mixed' means carousel with video and photo
+    type_map = {MEDIA_TYPE_PHOTO: "photo", MEDIA_TYPE_VIDEO: "video"}
+    if node["media_type"] != MEDIA_TYPE_CAROUSEL:
+        media_type = type_map.get(node["media_type"], "unknown")
+    else:
+        media_types = set([s["media_type"] for s in media_nodes])
+        media_type = "mixed" if len(media_types) > 1 else type_map.get(media_types.pop(), "unknown")
+
+    if "comment_count" in node:
+        num_comments = node["comment_count"]
+    elif "comments" in node and type(node["comments"]) is list:
+        num_comments = len(node["comments"])
+    else:
+        num_comments = -1
+
+    location = _location(node)
+    code = node["code"]
+
+    return {
+        "id": code,
+        "thread_id": code,
+        "parent_id": code,
+        "body": caption,
+        "author": node["user"]["username"],
+        "author_fullname": node["user"]["full_name"],
+        "author_avatar_url": node["user"]["profile_pic_url"],
+        "timestamp": datetime.fromtimestamp(node["taken_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+        "type": media_type,
+        "url": "https://www.instagram.com/p/" + code,
+        "image_url": image_urls,
+        "media_url": media_urls,
+        "hashtags": ",".join(HASHTAG_RE.findall(caption)),
+        "num_likes": node["like_count"],
+        "num_comments": num_comments,
+        "num_media": num_media,
+        "location_name": location["name"],
+        "location_latlong": location["latlong"],
+        "location_city": location["city"],
+        "unix_timestamp": node["taken_at"],
+        "media_n": 0,
+        "media_filename": f"{code}_0" if num_media > 1 else code,
+    }
+
+
+def map_item(item):
+    """
+    Map Instagram item, None for ads
+
+    Instagram importing is a little bit roundabout since we can expect
+    input in two separate and not completely overlapping formats - an "edge
+    list" or an "item list", and posts are structured differently between
+    those, and do not contain the same data. So we find a middle ground
+    here... each format has its own handler function
+    """
+    link = item.get("link", "")
+    if (item.get("product_type", "") == "ad") or \
+            (link and link.startswith("https://www.facebook.com/ads/ig_redirect")):
+        return None
+
+    is_graph_response = "__typename" in item and item["__typename"] not in ("XDTMediaDict",)
+    if is_graph_response:
+        return parse_graph_item(item)
+    return parse_itemlist_item(item)
+
+
+def iter_posts(paths, seen=None):
+    """
+    Deduplicated posts of one or more ndjson exports, one line at a time
+
+    `seen` collects the ids already yielded (pass a shared set to dedupe
+    across calls). Lines that are not JSON or cannot be mapped are logged
+    and skipped.
+    """
+    seen = set() if seen is None else seen
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    post = map_item(json.loads(line)["data"])
+                except (ValueError, KeyError, TypeError, IndexError) as e:
+                    logger.warning(f"{path}:{number}: skipping unparsable item ({type(e).__name__}: {e})")
+                    continue
+                if post is None or post["id"] in seen:
+                    continue
+                seen.add(post["id"])
+                yield post
+
+
+def _csv_row(post):
+    # Lists are stored the way pandas wrote the old agg(list) columns
+    return {k: (str(v) if k in LIST_FIELDS else v) for k, v in post.items()}
+
+
+def write_posts(paths, output_path, store_root=None, handle=None):
+    """
+    Stream the posts of `paths` into `output_path` (CSV); returns the post count
+
+    With `store_root` the same posts also go into the account's partition of
+    the Parquet corpus (src/store.py) in the same pass.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+
+        def written():
+            for post in iter_posts(paths):
+                writer.writerow(_csv_row(post))
+                yield post
+
+        if store_root is not None:
+            return store.write_account(store_root, handle, written())
+        return sum(1 for _ in written())
+
+
+def _convert_export(exports, output_path, store_root=None, handle=None):
+    """Process pool task for one account: (post count, error or None)"""
+    try:
+        return write_posts(exports, output_path, store_root, handle), None
+    except Exception as e:
+        # Isolated per file: one broken export must not take down the pool
+        return 0, f"{type(e).__name__}: {e}"
+
+
+def _run_jobs(jobs, workers):
+    """{idx: (count, error)} for {idx: _convert_export arguments}"""
+    if workers <= 1 or len(jobs) <= 1:
+        return {idx: _convert_export(*job) for idx, job in jobs.items()}
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_convert_export, *job): idx for idx, job in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:  # worker process died (BrokenProcessPool)
+                results[futures[future]] = (0, f"{type(e).__name__}: {e}")
+    return results
+
+
+def convert_accounts(accounts_df, post_dir="data/post_csvs", store_root=store.STORE_ROOT,
+                     analysis_path="data/accounts_analysis.csv", workers=None):
+    """
+    Convert every account's export (Export_Path + Export_Segments)
+
+    Writes one deduplicated post CSV per account into `post_dir` and rebuilds
+    the global corpus, a Parquet dataset partitioned by handle and year at
+    `store_root` (read it with src.store.load_posts). Accounts are spread over
+    `workers` processes (default: all cores, 1 = serial); every account's
+    partition is swapped in only when complete, so a broken export never
+    leaves half an account in the corpus. The corpus is rebuilt next to
+    `store_root` and replaces it only once the conversion has finished, an
+    interrupted run keeps the previous one. The per-account file goes into
+    CSV_Path and the frame is saved to `analysis_path`.
+    """
+    post_dir = Path(post_dir)
+    workers = workers or os.cpu_count() or 1
+    staging = store.stage(store_root)
+    accounts_df = accounts_df.copy()
+    if "CSV_Path" not in accounts_df.columns:
+        accounts_df["CSV_Path"] = pd.Series(pd.NA, index=accounts_df.index, dtype="object")
+
+    jobs = {}
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for idx, row in accounts_df.iterrows():
+        handle = row.get("IG_handle")
+        exports = account_exports(row.get("Export_Path"), row.get("Export_Segments"))
+        if pd.isna(handle) or not exports:
+            logger.warning(f"Skipping row {idx}: missing IG_handle or export file")
+            continue
+        handle = str(handle).strip()
+        jobs[idx] = (exports, post_dir / f"{timestamp}_{handle}.csv", staging, handle)
+
+    logger.info(f"Converting {len(jobs)} exports with {min(workers, len(jobs) or 1)} workers")
+    try:
+        results = _run_jobs(jobs, workers)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    store.swap_in(staging, store_root)
+
+    total = 0
+    for idx, (exports, output_path, _, handle) in jobs.items():
+        count, error = results[idx]
+        if error:
+            logger.error(f"Error converting {handle} ({exports[0]}): {error}")
+            continue
+        accounts_df.at[idx, "CSV_Path"] = str(output_path)
+        total += count
+        logger.info(f"Converted {handle}: {count} posts -> {output_path}")
+
+    accounts_df.to_csv(analysis_path, index=False)
+    logger.info(f"Global dataset {store_root} with {total} posts")
+    return accounts_df
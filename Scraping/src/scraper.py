@@ -12,8 +12,12 @@ from selenium.webdriver.firefox.service import Service
 from webdriver_manager.firefox import GeckoDriverManager
 from selenium.common.exceptions import TimeoutException, WebDriverException, StaleElementReferenceException, NoSuchElementException
 from src.config.config import Config, SortMode
-#from watchdog.observers import Observer
-#from watchdog.events import FileSystemEventHandler
+from src.scroll import ScrollController
+from src.journal import StateJournal
+from src.metrics import ScrapeMetrics
+from src.exports import ExportWatcher, SEGMENT_SEP, account_exports, newest_post, write_delta
+from src.waits import zeeschuimer_count, document_ready, field_value, element_selected, extension_uuid, instagram_session
+from src.header import parse_count, profile_header
 import threading
 import selenium.webdriver as webdriver
 from selenium.webdriver.common.action_chains import ActionChains
@@ -24,28 +28,93 @@ from IPython.display import display, clear_output
 import re
 import numpy as np
 
-# class FileCreationHandler(FileSystemEventHandler):
-#     def __init__(self, event, pattern):
-#         super().__init__()
-#         self.event = event
-#         self.pattern = pattern
-
-#     def on_created(self, event):
-#         if event.is_directory:
-#             return
-#         if self.pattern in event.src_path:
-#             self.event.set()
+# Counts Zeeschuimer's captured items straight from its IndexedDB instead of
+# reloading the popup. With a uuid the script runs in chrome context and opens
+# the extension's database by principal (no tab switch at all); without one it
+# runs inside the popup page, which shares the extension origin.
+# With `before` (epoch seconds) only items taken at or before that time are
+# counted, which tells an incremental re-scrape that it reached known posts.
+ZEESCHUIMER_COUNT_JS = """
+const [uuid, platform, before, done] = arguments;
+let request;
+try {
+    if (uuid) {
+        const uri = Services.io.newURI(`moz-extension://${uuid}/`);
+        const principal = Services.scriptSecurityManager.createContentPrincipal(uri, {});
+        request = indexedDB.openForPrincipal(principal, "zeeschuimer-data");
+    } else {
+        request = indexedDB.open("zeeschuimer-data");
+    }
+} catch (e) {
+    done(-1);
+    return;
+}
+// Never create the database ourselves
+request.onupgradeneeded = () => request.transaction.abort();
+request.onerror = () => done(-1);
+request.onsuccess = () => {
+    const db = request.result;
+    try {
+        const index = db.transaction("items", "readonly").objectStore("items").index("source_platform");
+        if (before === null) {
+            const query = index.count(platform);
+            query.onsuccess = () => { db.close(); done(query.result); };
+            query.onerror = () => { db.close(); done(-1); };
+            return;
+        }
+        let older = 0;
+        const cursor = index.openCursor(IDBKeyRange.only(platform));
+        cursor.onsuccess = () => {
+            const entry = cursor.result;
+            if (!entry) { db.close(); done(older); return; }
+            let data = entry.value.data || {};
+            if (typeof data === "string") {
+                try { data = JSON.parse(data); } catch (e) { data = {}; }
+            }
+            const takenAt = data.taken_at || data.taken_at_timestamp;
+            if (takenAt && takenAt <= before) older += 1;
+            entry.continue();
+        };
+        cursor.onerror = () => { db.close(); done(-1); };
+    } catch (e) {
+        db.close();
+        done(-1);
+    }
+};
+"""
+
+# Config.LEAN_BROWSER: nothing the grid displays is downloaded. Zeeschuimer
+# reads the GraphQL/API responses, which are neither media nor fonts.
+LEAN_PREFERENCES = {
+    "permissions.default.image": 2,  # no images
+    "media.autoplay.default": 5,  # no autoplay, not even muted
+    "media.preload.default": 0,  # no video metadata/data preloading
+    "media.preload.auto": 0,
+    "media.mediasource.enabled": False,  # no MSE video streams (reels)
+    "gfx.downloadable_fonts.enabled": False,  # no web fonts
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+}
 
 class BundesScraper:
-    def __init__(self, config):
-        """Config validation"""
+    def __init__(self, config, worker_id=None, accounts=None):
+        """Config validation
+
+        worker_id/accounts are set by ScraperPool: a worker gets its own
+        download dir and no account list of its own (the pool owns it).
+        """
         self.config = config
         #self._validate_config()
         
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.worker_id = worker_id
+        name = self.__class__.__name__ if worker_id is None else f"{self.__class__.__name__}[{worker_id}]"
+        self.logger = logging.getLogger(name)
         
         self.driver = None
         self.zeeschuimer_uuid = None
+        self.popup_url = None  # Overrides the moz-extension popup (local stand-in)
+        self._chrome_progress = True  # Chrome-context count query still usable
         self._scroll_count = 0
         
         # Initialize directories
@@ -57,12 +126,14 @@ class BundesScraper:
             'scrape_status': 'string',
             'last_scraped': 'datetime64[ns]',
             'Export_Path': 'string',
+            'Export_Segments': 'string',
             'ZS_count': 'int64',
             'IG_count': 'int64',
             'IG_Followers': 'int64',
             'IG_Followed': 'int64',
             'Scrape_Start': 'datetime64[ns]',
             'Scrape_End': 'datetime64[ns]',
+            'Scroll_Seconds': 'float64',
             'Notes': 'string'
         }
         
@@ -70,15 +141,21 @@ class BundesScraper:
         self._apply_processing_limits()
         
         # Account initialization
-        self.accounts = self._prepare_accounts()
-        if self.accounts.empty:
-            self._process_raw_accounts()
+        if accounts is not None:
+            self.accounts = accounts
+        else:
+            self.accounts = self._prepare_accounts()
+            if self.accounts.empty:
+                self._process_raw_accounts()
+            else:
+                self._replay_journal()
         
         # Configure GeckoDriver
         self._setup_geckodriver()
         
         self.live_view = None  # Will hold our display object
-        self._init_live_view()
+        if worker_id is None:
+            self._init_live_view()
         
     # def _validate_config(self):
     #     """Ensure critical .env settings exist"""
@@ -99,6 +176,22 @@ class BundesScraper:
         self.zeeschuimer_xpi = Path("src/extension/zeeschuimer.xpi")
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
+        self.accounts_csv = self.data_dir / "accounts.csv"
+        # State changes go here first, accounts.csv is only written by _save_accounts.
+        # Pool workers get none: the pool's coordinator is the only journal writer
+        self.journal = None
+        if self.worker_id is None:
+            self.journal = StateJournal(self.data_dir / "accounts.journal", fsync=self.config.JOURNAL_FSYNC)
+        self.exports_dir = self.data_dir / "exports"
+        metrics_name = "scrape"
+        self.profile_dir = self.data_dir / "browser_profiles" / "main"
+        if self.worker_id is not None:
+            # Separate download dir per pool worker, so exports never race
+            self.exports_dir = self.exports_dir / f"worker_{self.worker_id}"
+            metrics_name = f"scrape-worker_{self.worker_id}"
+            # A Firefox profile can only be open in one browser
+            self.profile_dir = self.profile_dir.with_name(f"worker_{self.worker_id}")
+        self.metrics = ScrapeMetrics(self.data_dir / "metrics", metrics_name, worker=self.worker_id)
         self.drivers_dir = Path("src/driver")
         self.drivers_dir.mkdir(exist_ok=True)
         
@@ -157,7 +250,7 @@ class BundesScraper:
             
             # Use backticks to escape column names with special characters
             processed = raw_df.assign(
-                IG_Followers_manual=lambda df: df['Followers'].apply(self._parse_metric_number)
+                IG_Followers_manual=lambda df: df['Followers'].apply(lambda value: parse_count(value) or 0)
             ).query(
                 "`IG_Followers_manual` > 0 and "
                 "`Account-Link`.str.match('^https://www\.instagram\.com/[a-zA-Z0-9_.]+/?$')"
@@ -175,12 +268,14 @@ class BundesScraper:
                 'scrape_status': 'pending',
                 'last_scraped': pd.NaT,
                 'Export_Path': '',
+                'Export_Segments': '',
                 'ZS_count': 0,
                 'IG_count': 0,
                 'IG_Followers': 0,  # Will be populated during scraping
                 'IG_Followed': 0,
                 'Scrape_Start': pd.NaT,
                 'Scrape_End': pd.NaT,
+                'Scroll_Seconds': 0.0,
                 'Notes': ''  # Empty for manual notes
             })
             
@@ -197,8 +292,9 @@ class BundesScraper:
             
             self.accounts = processed
             
-            # Save filtered accounts
+            # Save filtered accounts (a fresh account list starts a fresh journal)
             processed.to_csv(self.config.ACCOUNTS_CSV, index=False)
+            self.journal.clear()
             self.logger.info(f"Saved {len(processed)} accounts")
             
         except Exception as e:
@@ -206,7 +302,11 @@ class BundesScraper:
             raise
 
     def _save_accounts(self):
-        """Preserve original order while maintaining sorted display"""
+        """Compact: materialize accounts.csv (original order) and empty the journal
+
+        Only needed on demand or at shutdown, every single update is already
+        in the journal (see _update_account).
+        """
         # Keep original unsorted version for saving
         original_df = self.accounts.copy()
         
@@ -214,44 +314,34 @@ class BundesScraper:
         track_cols = ['ZS_count', 'IG_count', 'IG_Followers', 'IG_Followed']
         original_df[track_cols] = original_df[track_cols].astype(str)
         
-        # Save original order CSV
-        original_df.to_csv(self.data_dir / "accounts.csv", index=False)
-        
-        # Maintain sorted display version separately
-        if 'IG_Followers_manual' in original_df.columns:
-            self.display_df = original_df.sort_values('IG_Followers_manual', ascending=False)
-        else:
-            self.display_df = original_df.copy()
-
-    def _convert_followers(self, val):
-        """Handle follower count conversion"""
-        original = str(val).strip()
-        if original == '-':
-            return 0
-        try:
-            # Remove thousand separators
-            without_thousands = original.replace('.', '')
-            # Handle decimal commas
-            normalized = without_thousands.replace(',', '.')
-            # Extract numeric part
-            clean = ''.join([c for c in normalized if c.isdigit() or c in ('.', '-')])
-            if not clean:
-                return 0
-                
-            # Process suffixes
-            multiplier = 1
-            if 'T' in original.upper():
-                multiplier = 1000
-            elif 'M' in original.upper():
-                multiplier = 1_000_000
-            elif 'K' in original.upper():
-                multiplier = 1000
-                
-            return int(float(clean) * multiplier)
-            
-        except Exception as e:
-            self.logger.error(f"Follower conversion failed: {original} → {e}")
-            return 0
+        # Atomic replace, then truncate the journal
+        self.journal.compact(original_df, self.accounts_csv)
+
+    @property
+    def display_df(self):
+        """Sorted display version, kept separate from the stored order"""
+        if 'IG_Followers_manual' in self.accounts.columns:
+            return self.accounts.sort_values('IG_Followers_manual', ascending=False)
+        return self.accounts.copy()
+
+    def _update_account(self, idx, **changes):
+        """Set tracking columns of one account and append the change to the journal"""
+        for col, value in changes.items():
+            try:
+                self.accounts.at[idx, col] = value
+            except (TypeError, ValueError):
+                # String into a column typed by _enforce_accounts_dtypes (e.g. ZS_count '7' into int32)
+                self.accounts[col] = self.accounts[col].astype(object)
+                self.accounts.at[idx, col] = value
+        link = self.accounts.at[idx, 'Account-Link'] if 'Account-Link' in self.accounts.columns else None
+        if link is not None and not pd.isna(link):
+            self.journal.append(link, changes)
+
+    def _replay_journal(self):
+        """Apply state changes made since accounts.csv was last written"""
+        self.accounts, applied = self.journal.replay(self.accounts)
+        if applied:
+            self.logger.info(f"Replayed {applied} journal entries from {self.journal.path}")
 
     def _setup_geckodriver(self):
         """Setup and configure geckodriver"""
@@ -282,19 +372,28 @@ class BundesScraper:
 
     def _human_type(self, element, text):
         """Simulate human typing patterns"""
+        if not self.config.HUMAN_DELAY:
+            element.send_keys(text)
+            return
         for char in text:
             element.send_keys(char)
-            time.sleep(random.uniform(0.05, 0.2))
+            time.sleep(random.uniform(0.05, 0.2) * self.config.HUMAN_DELAY_SCALE)
             
     def _human_delay(self, base=5):  # Increased base delay
-        """Randomized wait patterns"""
+        """Randomized wait patterns
+
+        Anti-detection only (HUMAN_DELAY/HUMAN_DELAY_SCALE in Config) - never
+        use it to wait for the page, that is what WebDriverWait is for.
+        """
+        if not self.config.HUMAN_DELAY:
+            return
         delay = base * random.uniform(0.7, 2.0)  # More variance
         if random.random() < 0.2:  # 20% chance for extra pause
             delay += random.uniform(3, 7)
-        time.sleep(delay)
+        time.sleep(delay * self.config.HUMAN_DELAY_SCALE)
 
 
-    def start_browser(self):
+    def start_browser(self, test_url="https://en.wikipedia.org/wiki/Special:Random"):
         """Complete workflow executor"""
         try:
             # Verify we're using the project's geckodriver
@@ -311,10 +410,10 @@ class BundesScraper:
             self.driver = webdriver.Firefox(service=self.service, options=self.options)
             
             # Login sequence
-            self.logger.info("Opening browser on random wikipedia page as test")
-            self.driver.get("https://en.wikipedia.org/wiki/Special:Random")
-            
-            self._human_delay(2)
+            if test_url:
+                self.logger.info(f"Opening browser on {test_url} as test")
+                self.driver.get(test_url)
+                self._human_delay(2)
             self.logger.info("Browser opened")
             
 
@@ -349,7 +448,7 @@ class BundesScraper:
         options = webdriver.FirefoxOptions()
         
         # Critical path settings (single source of truth)
-        exports_path = (self.data_dir / "exports").resolve()  # Make path absolute
+        exports_path = self.exports_dir.resolve()  # Make path absolute
         exports_path.mkdir(parents=True, exist_ok=True)  # Explicit directory creation
         
         options.set_preference("browser.download.folderList", 2)
@@ -361,60 +460,84 @@ class BundesScraper:
         options.set_preference("useAutomationExtension", False)
         options.set_preference("pdfjs.disabled", True)
         
+        # Chrome context for the Zeeschuimer count query (required since Firefox 138)
+        options.add_argument("-remote-allow-system-access")
+        
+        width, height = self.config.WINDOW_SIZE
+        options.add_argument(f"--width={width}")
+        options.add_argument(f"--height={height}")
+        if self.config.HEADLESS:
+            options.add_argument("-headless")
+        
+        if self.config.LEAN_BROWSER:
+            for name, value in LEAN_PREFERENCES.items():
+                options.set_preference(name, value)
+        
+        if self.config.PERSISTENT_PROFILE:
+            # Firefox runs on this directory in place (no temporary copy), so the
+            # Instagram cookies and the installed Zeeschuimer outlive the session
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            options.add_argument("-profile")
+            options.add_argument(str(self.profile_dir.resolve()))
+        
         return options
         
     # Zeeschuimer Management
+    def _zeeschuimer_popup(self):
+        """URL of the Zeeschuimer interface"""
+        if self.popup_url:
+            return self.popup_url
+        return f"moz-extension://{self.zeeschuimer_uuid}/popup/interface.html"
+
     def _setup_zeeschuimer(self, retries=3):
         """Fixed setup with tab cleanup"""
-        for attempt in range(retries):
-            try:
-                self._close_all_tabs_except(self.driver.current_window_handle)
-                # 1. Install extension
-                self.logger.info("Installing Zeeschuimer extension")
-                self.driver.install_addon(str(self.zeeschuimer_xpi), temporary=True)
-                time.sleep(5)  # Critical for extension initialization
-                
-                # 2. Get UUID via debugging interface
-                self._get_zeeschuimer_uuid()
-                
-                # 3. Enable collection
-                self._enable_collection()
-                return
-            except Exception as e:
-                self.logger.warning(f"Zeeschuimer setup failed (attempt {attempt + 1}): {str(e)}")
-                if attempt == retries - 1:
-                    raise
-                time.sleep(2 ** attempt)
-            finally:
-                self._close_all_tabs_except(self.driver.current_window_handle)  # New cleanup
+        with self.metrics.span("zeeschuimer_setup") as span:
+            for attempt in range(retries):
+                span["attempts"] = attempt + 1
+                try:
+                    self._close_all_tabs_except(self.driver.current_window_handle)
+                    # 1. Install extension
+                    self.logger.info("Installing Zeeschuimer extension")
+                    with self.metrics.span("zeeschuimer_install"):
+                        # Permanent install into a persistent profile (release builds are signed)
+                        self.driver.install_addon(str(self.zeeschuimer_xpi),
+                                                  temporary=not self.config.PERSISTENT_PROFILE)
+                    
+                    # 2. Get UUID via debugging interface (waits until the extension is listed)
+                    with self.metrics.span("zeeschuimer_uuid"):
+                        self._get_zeeschuimer_uuid()
+                    
+                    # 3. Enable collection
+                    with self.metrics.span("zeeschuimer_enable"):
+                        self._enable_collection()
+                    return
+                except Exception as e:
+                    self.logger.warning(f"Zeeschuimer setup failed (attempt {attempt + 1}): {str(e)}")
+                    self.metrics.event("retry", step="zeeschuimer_setup", attempt=attempt + 1, error=str(e))
+                    if attempt == retries - 1:
+                        raise
+                    time.sleep(2 ** attempt)
+                finally:
+                    self._close_all_tabs_except(self.driver.current_window_handle)  # New cleanup
 
 
     def _get_zeeschuimer_uuid(self):
         """Reliable UUID detection from about:debugging"""
         self.driver.get("about:debugging#/runtime/this-firefox")
-        time.sleep(3)  # Allow full page load
         
         try:
-            extensions = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.card"))
+            self.zeeschuimer_uuid = WebDriverWait(self.driver, 15).until(
+                extension_uuid("Zeeschuimer"),
+                "Zeeschuimer extension not found in about:debugging"
             )
-            
-            for ext in extensions:
-                if "Zeeschuimer" in ext.text:
-                    uuid_elem = ext.find_element(By.XPATH, ".//dt[contains(., 'UUID')]/following-sibling::dd")
-                    self.zeeschuimer_uuid = uuid_elem.text.strip()
-                    self.logger.info(f"Zeeschuimer UUID: {self.zeeschuimer_uuid}")
-                    return
-                    
-            raise RuntimeError("Zeeschuimer extension not found in about:debugging")
+            self.logger.info(f"Zeeschuimer UUID: {self.zeeschuimer_uuid}")
         except Exception as e:
             self.logger.error(f"UUID extraction failed: {e}")
             raise
 
     def _enable_collection(self):
         """Reliable interface initialization with retries"""
-        self.driver.get(f"moz-extension://{self.zeeschuimer_uuid}/popup/interface.html")
-        self._human_delay(3)
+        self.driver.get(self._zeeschuimer_popup())
         
         for attempt in range(3):
             try:
@@ -424,12 +547,11 @@ class BundesScraper:
                 toggle = instagram_row.find_element(By.ID, "zs-enabled-instagram.com")
                 if not toggle.is_selected():
                     instagram_row.find_element(By.CSS_SELECTOR, "label[for='zs-enabled-instagram.com']").click()
-                    self._human_delay(1)
+                    WebDriverWait(self.driver, 5).until(element_selected((By.ID, "zs-enabled-instagram.com")))
                 self.logger.info("Instagram collection enabled")
                 return
             except TimeoutException:
                 self.driver.refresh()
-                self._human_delay(3)
                 
         raise RuntimeError("Failed to enable Instagram collection")
         
@@ -455,13 +577,13 @@ class BundesScraper:
         )
         username_field.click()
         self._human_type(username_field, self.config.INSTAGRAM_EMAIL)
-        time.sleep(0.5)  # Critical for UI update
+        WebDriverWait(self.driver, 5).until(field_value((By.NAME, "username"), self.config.INSTAGRAM_EMAIL))
         
         # 2. Password entry
         password_field = self.driver.find_element(By.NAME, "password")
         password_field.click()
         self._human_type(password_field, self.config.INSTAGRAM_PASSWORD)
-        time.sleep(0.5)
+        WebDriverWait(self.driver, 5).until(field_value((By.NAME, "password"), self.config.INSTAGRAM_PASSWORD))
         
         # 3. Submit with guaranteed click
         submit = self.driver.find_element(By.XPATH, "//button[@type='submit']")
@@ -498,33 +620,14 @@ class BundesScraper:
         """Robust Zeeschuimer reset with verification"""
         try:
             # 1. Navigate to Zeeschuimer interface
-            self.driver.get(f"moz-extension://{self.zeeschuimer_uuid}/popup/interface.html")
-            time.sleep(3)  # Allow proper load
+            self.driver.get(self._zeeschuimer_popup())
             
-            # 2. Verify interface loaded
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "stats-instagramcom"))
-            )
+            # 2. Verify interface loaded (count cell shows a number)
+            current_count = int(WebDriverWait(self.driver, self.config.WAIT_TIMEOUT).until(zeeschuimer_count()))
             
             # 3. Reset if needed
-            count_elem = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, "#stats-instagramcom td.num-items"))
-            )
-            current_count = int(count_elem.text.strip().replace('.', '').replace(',', ''))
-            
             if current_count > 0:
-                reset_btn = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#stats-instagramcom button.reset"))
-                )
-                reset_btn.click()
-                time.sleep(2)
-                
-                # Verify reset worked
-                count_elem = WebDriverWait(self.driver, 10).until(
-                    EC.visibility_of_element_located((By.CSS_SELECTOR, "#stats-instagramcom td.num-items"))
-                )
-                final_count = int(count_elem.text.strip().replace('.', '').replace(',', ''))
-                assert final_count == 0, "Reset failed: count not zero"
+                self._click_reset()
                 
             return True
             
@@ -532,135 +635,142 @@ class BundesScraper:
             self.logger.error(f"Reset failed: {str(e)}")
             return False
 
-    def get_instagram_post_count(self):
-        """Extract post count from Instagram profile"""
-        try:
-            count_element = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.XPATH, "//header//ul/li[1]//span"))
+    def _click_reset(self, attempts=2):
+        """Click the popup reset button until the count reads 0"""
+        for attempt in range(attempts):
+            reset_btn = WebDriverWait(self.driver, self.config.WAIT_TIMEOUT).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "#stats-instagramcom button.reset"))
             )
-            count_text = count_element.get_attribute("innerText")
-            
-            # Extract numeric part before text (e.g. "1298 Beiträge")
-            numeric_part = count_text.split()[0]
-            clean_count = numeric_part.replace('.', '').replace(',', '').strip()
-            return int(clean_count)
-        except Exception as e:
-            self.logger.error(f"Failed to get Instagram post count: {str(e)}")
-            return None
-
+            reset_btn.click()
+            try:
+                WebDriverWait(self.driver, self.config.WAIT_TIMEOUT).until(zeeschuimer_count(lambda count: count == 0))
+                return
+            except TimeoutException:
+                self.logger.warning(f"Reset failed, count is not 0 (attempt {attempt + 1}/{attempts})")
+        raise Exception("Failed to reset Zeeschuimer count to 0")
 
-    def get_instagram_follower_count(self):
-        """Extract post count from Instagram profile"""
+    def get_profile_header(self):
+        """Posts, followers, following, private flag and name of the open profile (one wait, one script per poll)"""
         try:
-            count_element = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.XPATH, "//header//ul/li[2]//span"))#/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[2]/div/div[1]/section/main/div/header/section[3]/ul/li[2]/div/a/span/span
-            )
-            count_text = count_element.get_attribute("innerText")
-
+            return WebDriverWait(self.driver, 20).until(profile_header)
+        except TimeoutException:
+            self.logger.error("Profile header did not render")
+            return None
 
-            # Handle metric suffixes (k/M)
-            count = count_text.replace('\xa0', ' ').replace(',', '.').strip()
-            if ' Mio' in count:
-                return int(float(count.replace(' Mio', '')) * 1_000_000)
-            if ' Tsd' in count:
-                return int(float(count.replace(' Tsd', '')) * 1_000)
+    def scroll_profile(self, target_count, controller=None, baseline=None):
+        """Scroll profile until the target count is captured or the feed stalls
+
+        With a `baseline` (see _incremental_baseline) scrolling also stops as
+        soon as the newest post of the previous export has been captured.
+        """
+        if controller is None:
+            controller = ScrollController.from_config(self.config, target_count)
+        controller.start(
+            self._safe_zeeschuimer_count(0),
+            self.driver.execute_script("return document.body.scrollHeight"),
+            reached=self._reached_known_posts(baseline),
+        )
+        
+        while not controller.done:
+            # Scroll down
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(controller.next_delay())
             
-            return int(count.replace('.', '').replace(',', '').split()[0])
+            # Check new height and captured posts after every scroll
+            new_height = self.driver.execute_script("return document.body.scrollHeight")
+            current_count = self._safe_zeeschuimer_count(controller.count)
+            controller.observe(current_count, new_height, self._reached_known_posts(baseline))
+            self.logger.info(
+                f"Scroll {controller.scrolls}: Height {new_height}, "
+                f"{current_count}/{target_count} posts, next delay {controller.delay:.1f}s"
+            )
+        
+        self.logger.info(f"Scrolling stopped: {controller.summary()}")
+        return controller.reason in ('target', 'known_post')
 
+    def _reached_known_posts(self, baseline):
+        """Enough already-exported posts captured to know the scroll caught up
 
-            # # Clean and convert the count
-            # clean_count = count_text.replace('.', '').replace(',', '').strip()
-            # return int(clean_count)
+        Counting `overlap` old posts instead of looking for the exact shortcode
+        keeps pinned posts (old posts shown first) from ending the scroll early.
+        """
+        if not baseline:
+            return False
+        try:
+            older = self._get_zeeschuimer_count(before=baseline['taken_at'])
         except Exception as e:
-            self.logger.error(f"Failed to get Instagram follower count: {str(e)}")
-            return None
-
+            self.logger.debug(f"Known-post check failed: {str(e)}")
+            return False
+        # None: no way to tell (popup without database), the count target decides
+        return older is not None and older >= baseline['overlap']
 
-    def get_instagram_followed_count(self):
-        """Extract followed count from Instagram profile"""
+    def _safe_zeeschuimer_count(self, default):
+        """Zeeschuimer count, or `default` if it cannot be read right now"""
         try:
-            count_element = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.XPATH, "//header//ul/li[3]//span"))
-            )
-            count_text = count_element.get_attribute("innerText")
-            
-            # Extract numeric part before text (e.g. "1701 Gefolgt")
-            numeric_part = count_text.split()[0]
-            clean_count = numeric_part.replace('.', '').replace(',', '').strip()
-            return int(clean_count)
+            count = self._get_zeeschuimer_count()
         except Exception as e:
-            self.logger.error(f"Failed to get Instagram followed count: {str(e)}")
-            return None
-
-
-
-    def scroll_profile(self, target_count, max_scrolls=30):
-        """Scroll profile with progress monitoring"""
-        scrolls = 0
-        last_height = 0
-        no_change_count = 0
-        
-        while scrolls < max_scrolls:
-            # Scroll down
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(random.uniform(1.5, 3))
-            scrolls += 1
-            
-            # Check new height
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                no_change_count += 1
-                if no_change_count >= 3:  # If height hasn't changed for 3 consecutive scrolls
-                    self.logger.info("Reached apparent bottom of page")
-                    break
-            else:
-                no_change_count = 0
-                
-            last_height = new_height
-            self.logger.info(f"Scroll {scrolls}: Height {new_height}")
-            
-            # Every 5 scrolls, check Zeeschuimer count
-            if scrolls % 20 == 0:
-                if self.check_zeeschuimer_progress(target_count):
-                    self.logger.info("Reached target post count")
-                    return True
-                    
-        return False
+            self.logger.error(f"Failed to check Zeeschuimer progress: {str(e)}")
+            return default
+        return default if count is None else count
 
     def check_zeeschuimer_progress(self, target_count):
         """Check current Zeeschuimer count against target"""
         try:
-            # Store current handle
-            current_handle = self.driver.current_window_handle
-
-            # Close any accidental extra tabs
-            while len(self.driver.window_handles) > 2:
-                self.driver.switch_to.window(self.driver.window_handles[-1])
-                self.driver.close()
-
-
-            # Switch to Zeeschuimer tab (first window handle)
-            self.driver.switch_to.window(self.driver.window_handles[0])
-            self.driver.refresh()
-            time.sleep(2)
-            
-            # Get count
-            count_elem = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, "#stats-instagramcom td.num-items"))
-            )
-            current_count = int(count_elem.text.strip().replace('.', '').replace(',', ''))
-            
-            # Return to profile tab
-            self.driver.switch_to.window(current_handle)
-        
+            current_count = self._get_zeeschuimer_count()
             self.logger.info(f"Progress: {current_count}/{target_count} posts collected")
-            return current_count >= target_count    
+            return current_count is not None and current_count >= target_count
             
         except Exception as e:
             self.logger.error(f"Failed to check Zeeschuimer progress: {str(e)}")
-            self.driver.switch_to.window(current_handle)
             return False
 
+    def _get_zeeschuimer_count(self, before=None):
+        """Captured instagram.com items, read without reloading the popup
+
+        With `before` (epoch seconds) only items taken up to then are counted;
+        returns None if that cannot be answered (no extension database) or
+        the database is not readable yet.
+        """
+        if self._chrome_progress and not self.popup_url:
+            try:
+                with self.driver.context(self.driver.CONTEXT_CHROME):
+                    count = self.driver.execute_async_script(ZEESCHUIMER_COUNT_JS, self.zeeschuimer_uuid, "instagram.com", before)
+            except WebDriverException as e:
+                # Only a missing chrome context ends the channel for this session
+                self.logger.debug(f"Chrome context unavailable: {str(e)}")
+                self.logger.info("Chrome-context progress query unavailable, reading counts from the popup tab")
+                self._chrome_progress = False
+            else:
+                # -1/None: database still opening (or not created yet), no count yet
+                if count is None or count < 0:
+                    return None
+                return int(count)
+            
+        return self._read_popup_count(before)
+
+    def _read_popup_count(self, before=None):
+        """Count from the (already open) popup tab, then return to the current tab"""
+        current_handle = self.driver.current_window_handle
+        popup_handle = self.driver.window_handles[0]
+        try:
+            if current_handle != popup_handle:
+                self.driver.switch_to.window(popup_handle)
+            
+            count = self.driver.execute_async_script(ZEESCHUIMER_COUNT_JS, None, "instagram.com", before)
+            if (count is None or count < 0) and before is not None:
+                return None  # The popup only shows the total
+            if count is None or count < 0:
+                # No extension database on this origin (e.g. local stand-in): the popup refreshes itself
+                text = self.driver.execute_script(
+                    "const cell = document.querySelector('#stats-instagramcom td.num-items');"
+                    "return cell ? cell.textContent : null;"
+                )
+                count = int(text.strip().replace('.', '').replace(',', ''))
+            return int(count)
+        finally:
+            if current_handle != popup_handle:
+                self.driver.switch_to.window(current_handle)
+
     def get_latest_export(self, export_dir, timestamp_threshold):
         """Get the most recently created .ndjson file in export directory"""
         try:
@@ -675,9 +785,15 @@ class BundesScraper:
             self.logger.error(f"Error finding export file: {str(e)}")
         return None
 
-    def process_profile(self, idx, profile_url):
-        """Process a single profile with strict tab management"""
+    def process_profile(self, idx, profile_url, baseline=None):
+        """Process a single profile with strict tab management
+
+        Pass a `baseline` (see _incremental_baseline) for an incremental
+        re-scrape: scrolling stops at the last exported post and only the new
+        posts are saved, as a segment next to the account's Export_Path.
+        """
         profile_tab = None
+        trace = self.metrics.trace(self._sanitize_handle(profile_url))
         start_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         metadata = {
             'ZS_count': 0,
@@ -686,124 +802,101 @@ class BundesScraper:
             'IG_Followed': None,
             'Scrape_Start': start_time,
             'Scrape_End': None,
+            'Scroll_Seconds': 0.0,
             'Notes': ''
         }
 
         try:
             # 1. Ensure Zeeschuimer tab is ready (tab 1) and clean
+            trace.phase("popup_reset")
             while len(self.driver.window_handles) > 1:
                 self.driver.switch_to.window(self.driver.window_handles[-1])
                 self.driver.close()
             self.driver.switch_to.window(self.driver.window_handles[0])
-            self.driver.get(f"moz-extension://{self.zeeschuimer_uuid}/popup/interface.html")
-            time.sleep(2)
+            self.driver.get(self._zeeschuimer_popup())
             
             # Verify Zeeschuimer is clean before starting
-            count_elem = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, "#stats-instagramcom td.num-items"))
-            )
-            if int(count_elem.text.strip()) != 0:
-                reset_btn = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#stats-instagramcom button.reset"))
-                )
-                reset_btn.click()
-                time.sleep(2)
+            if int(WebDriverWait(self.driver, self.config.WAIT_TIMEOUT).until(zeeschuimer_count())) != 0:
+                self._click_reset()
                 
             # 2. Open profile in new tab (tab 2)
+            trace.phase("profile_load")
             self.driver.switch_to.new_window('tab')
             profile_tab = self.driver.current_window_handle
             self.driver.get(profile_url)
-            time.sleep(3)
-            
-            # 3. Extract profile metadata
-            metadata['IG_count'] = self.get_instagram_post_count()
-
-            if not metadata['IG_count']:
-                self.logger.warning(f"Could not get post count for {profile_url}")
-                # Proper cleanup before returning
-                self.driver.close()
-                self.driver.switch_to.window(self.driver.window_handles[0])
-                return False
-                
-            self.logger.info(f"Found {metadata['IG_count']} posts")
             
-            metadata['IG_Followers'] = self.get_instagram_follower_count()
-
-            if not metadata['IG_Followers']:
-                self.logger.warning(f"Could not get follower count for {profile_url}")
-                # Proper cleanup before returning
-                self.driver.close()
-                self.driver.switch_to.window(self.driver.window_handles[0])
-                return False
-                
-            self.logger.info(f"Found {metadata['IG_Followers']} Followers")
-
-            metadata['IG_Followed'] = self.get_instagram_followed_count()
-
-            if not metadata['IG_Followed']:
-                self.logger.warning(f"Could not get followed count for {profile_url}")
+            # 3. Extract profile metadata (the header wait covers the page load)
+            trace.phase("header")
+            header = self.get_profile_header()
+            problem = None
+            if header is None:
+                problem = "Could not read profile header"
+            elif header['private']:
+                problem = "Private account detected - skipping"
+            else:
+                metadata['IG_count'] = header['posts']
+                metadata['IG_Followers'] = header['followers']
+                metadata['IG_Followed'] = header['following']
+                missing = [name for name in ('posts', 'followers', 'following') if not header[name]]
+                if missing:
+                    problem = f"Could not get {'/'.join(missing)} count"
+
+            if problem:
+                self.logger.warning(f"{problem} for {profile_url}")
                 # Proper cleanup before returning
                 self.driver.close()
                 self.driver.switch_to.window(self.driver.window_handles[0])
+                trace.close(ok=False)
                 return False
                 
-            self.logger.info(f"Found {metadata['IG_Followed']} Followed")
+            self.logger.info(
+                f"Found {metadata['IG_count']} posts, {metadata['IG_Followers']} Followers, "
+                f"{metadata['IG_Followed']} Followed ({header['name']})"
+            )
 
             
-            # 4. Scroll and monitor progress with retry limit
-            retries = 0
-            last_count = 0
-            while True:
-                # Scroll in profile tab
-                success = self.scroll_profile(metadata['IG_count'])
-                
-                # Switch to Zeeschuimer tab to check progress
-                self.driver.switch_to.window(self.driver.window_handles[0])
-                count_elem = WebDriverWait(self.driver, 10).until(
-                    EC.visibility_of_element_located((By.CSS_SELECTOR, "#stats-instagramcom td.num-items"))
+            # 4. Scroll until the capture-rate controller reaches the target or gives up
+            target = metadata['IG_count']
+            if baseline:
+                # New posts since the last run plus enough overlap to pass the pinned posts
+                new_posts = metadata['IG_count'] - baseline['ig_count'] if baseline['ig_count'] else metadata['IG_count']
+                target = min(metadata['IG_count'], max(new_posts, 0) + baseline['overlap'])
+                self.logger.info(
+                    f"Incremental: scrolling back to {baseline['shortcode']} "
+                    f"({datetime.fromtimestamp(baseline['taken_at']):%Y-%m-%d %H:%M}), target {target}"
                 )
-                current_count = int(count_elem.text.strip().replace('.', '').replace(',', ''))
-                metadata['ZS_count'] = current_count
-                
-                time.sleep(1)
-                self.logger.info(f"Progress: {current_count}/{metadata['IG_count']} posts collected")
-                
-                # Exit conditions with progressive thresholds
-                if retries >= 5:
-                    threshold = 0.75 * metadata['IG_count']
-                    if current_count >= threshold:
-                        metadata['Notes'] = f"Accepting partial capture ({current_count}/{metadata['IG_count']}) after {retries} retries"
-                        self.logger.info(metadata['Notes'])
-                        break
-                    else:
-                        metadata['Notes'] = f"Failed capture after {retries} retries: {current_count}/{metadata['IG_count']}"
-                        self.logger.warning(metadata['Notes'])
-                        break
-                elif current_count >= metadata['IG_count']:
-                    break
-                
-                if current_count == last_count:
-                    retries += 1
-                    self.logger.warning(f"No new posts found, retry {retries}/5")
+            trace.phase("scroll")
+            controller = ScrollController.from_config(self.config, target)
+            self.scroll_profile(target, controller, baseline)
+            trace.set(scrolls=controller.scrolls, stall_events=controller.stall_events,
+                      reason=controller.reason, captured=controller.count, target=target)
+            current_count = controller.count
+            metadata['ZS_count'] = current_count
+            metadata['Scroll_Seconds'] = round(controller.elapsed, 1)
+            self.logger.info(f"Progress: {current_count}/{target} posts collected in {metadata['Scroll_Seconds']}s")
+            
+            # Exit conditions with progressive thresholds
+            if current_count < target and controller.reason != 'known_post':
+                threshold = 0.75 * target
+                if current_count >= threshold:
+                    metadata['Notes'] = f"Accepting partial capture ({current_count}/{target}) after {controller.stalls} stalled scrolls"
+                    self.logger.info(metadata['Notes'])
                 else:
-                    retries = 0
-                last_count = current_count
-                
-                # Switch back to profile tab for more scrolling
-                self.driver.switch_to.window(profile_tab)
-                time.sleep(random.uniform(1.5, 3))
+                    metadata['Notes'] = f"Failed capture after {controller.stalls} stalled scrolls: {current_count}/{target}"
+                    self.logger.warning(metadata['Notes'])
                 
-            # 5. Export    
-            pre_export_time = time.time()
-            
+            # 5. Export from the Zeeschuimer tab
+            trace.phase("export")
+            self.driver.switch_to.window(self.driver.window_handles[0])
             export_btn = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "#stats-instagramcom button.download-ndjson"))
             )
-            export_btn.click()
-            time.sleep(5)
             
-            export_dir = self.data_dir / "exports"
-            latest_export = self.get_latest_export(export_dir, pre_export_time)
+            # Filesystem events signal the finished download (size + complete last line checked)
+            export_dir = self.exports_dir
+            with ExportWatcher(export_dir, min_size=self.config.MIN_EXPORT_SIZE) as watcher:
+                export_btn.click()
+                latest_export = watcher.wait(self.config.EXPORT_TIMEOUT)
             
             if latest_export:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -813,52 +906,35 @@ class BundesScraper:
                 
                 try:
                     latest_export.rename(new_path)
-                    # Convert all values to strings explicitly
-                    self.accounts.at[idx, 'Export_Path'] = str(new_path)
-                    self.accounts.at[idx, 'ZS_count'] = str(metadata['ZS_count'])
-                    self.accounts.at[idx, 'IG_count'] = str(metadata['IG_count'])
-                    self.accounts.at[idx, 'IG_Followers'] = str(metadata['IG_Followers'])
-                    self.accounts.at[idx, 'IG_Followed'] = str(metadata['IG_Followed'])
+                    metadata['Export_Path'] = str(new_path)
+                    metadata['Export_Segments'] = ''
+                    if baseline:
+                        self._store_delta(new_path, baseline, metadata)
                     # Keep datetime as string
-                    self.accounts.at[idx, 'Scrape_End'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    metadata['Scrape_End'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     self.logger.info(f"Successfully renamed export to {new_filename}")
-                    
-                    # Force dtype consistency before save
-                    self._enforce_accounts_dtypes()
-                    self._save_accounts()
+                    self._record_export(idx, metadata)
                     
                 except Exception as e:
                     self.logger.error(f"Error updating tracking: {str(e)}")
                     self._save_accounts()  # Emergency save
 
             # 6. Reset Zeeschuimer and verify
-            reset_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "#stats-instagramcom button.reset"))
-            )
-            reset_btn.click()
-            time.sleep(2)
-            
-            count_elem = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, "#stats-instagramcom td.num-items"))
-            )
-            final_count = int(count_elem.text.strip())
-            if final_count != 0:
-                self.logger.warning(f"Reset failed, count is {final_count}")
-                reset_btn.click()
-                time.sleep(2)
-                if int(count_elem.text.strip()) != 0:
-                    raise Exception("Failed to reset Zeeschuimer count to 0")
-            
+            trace.phase("reset")
+            self._click_reset()
             self.logger.info("Successfully reset Zeeschuimer")
             
             # Close profile tab
+            trace.phase("cleanup")
             self.driver.switch_to.window(profile_tab)
             self.driver.close()
             self.driver.switch_to.window(self.driver.window_handles[0])
+            trace.close(ok=True, exported=bool(latest_export))
             return True
 
         except Exception as e:
             self.logger.error(f"Error processing {profile_url}: {str(e)}")
+            trace.close(ok=False, error=type(e).__name__)
             try:
                 if profile_tab and profile_tab in self.driver.window_handles:
                     self.driver.switch_to.window(profile_tab)
@@ -868,56 +944,158 @@ class BundesScraper:
             self.driver.switch_to.window(self.driver.window_handles[0])
             return False
 
-    def update_accounts_csv(self, account_data):
-        """Atomic CSV update with full column validation"""
-        try:
-            current_data = pd.read_csv(self.config.ACCOUNTS_CSV)
-            
-            # Ensure type consistency
-            for col, dtype in self.tracking_columns.items():
-                if col in current_data:
-                    current_data[col] = current_data[col].astype(dtype)
-                else:
-                    current_data[col] = pd.Series(dtype=dtype)
-                
-        except FileNotFoundError:
-            current_data = pd.DataFrame(columns=self.tracking_columns.keys()).astype(self.tracking_columns)
-        
-        new_row = pd.DataFrame([account_data]).astype(self.tracking_columns)
-        updated = pd.concat([current_data, new_row], ignore_index=True)
+    def _record_export(self, idx, metadata):
+        """Write export results of one account into the tracking table"""
+        # Convert all values to strings explicitly
+        columns = ('Export_Path', 'Export_Segments', 'ZS_count', 'IG_count', 'IG_Followers', 'IG_Followed', 'Scrape_End', 'Scroll_Seconds', 'Notes')
+        self._update_account(idx, **{col: str(metadata[col]) for col in columns})
         
-        # Atomic write
-        temp_path = self.config.ACCOUNTS_CSV.with_suffix('.tmp')
-        updated.to_csv(temp_path, index=False)
-        temp_path.replace(self.config.ACCOUNTS_CSV)
+        # Force dtype consistency in memory (the journal holds the strings)
+        self._enforce_accounts_dtypes()
+
+    def _store_delta(self, export_path, baseline, metadata):
+        """Keep only the posts newer than the baseline as a new segment"""
+        segment = export_path.with_name(f"{export_path.stem}_delta.ndjson")
+        new_posts = write_delta(export_path, segment, baseline['taken_at'])
+        export_path.unlink()
+
+        segments = baseline['segments'] + ([str(segment)] if new_posts else [])
+        metadata['Export_Path'] = baseline['export_path']
+        metadata['Export_Segments'] = SEGMENT_SEP.join(segments)
+        metadata['ZS_count'] = baseline['posts'] + new_posts
+        metadata['Notes'] = f"Incremental: {new_posts} new posts" + (f"; {metadata['Notes']}" if metadata['Notes'] else '')
+        self.logger.info(metadata['Notes'])
+
+    def _incremental_baseline(self, row):
+        """Newest exported post of an account, or None if it needs a full scrape"""
+        exports = account_exports(row.get('Export_Path'))
+        if not exports:
+            return None
+        segments = account_exports(None, row.get('Export_Segments'))
+        newest = newest_post(exports + segments)
+        if newest is None:
+            return None
+        ig_count = pd.to_numeric(row.get('IG_count'), errors='coerce')
+        return {
+            'export_path': str(exports[0]),
+            'segments': [str(path) for path in segments],
+            'taken_at': newest['taken_at'],
+            'shortcode': newest['shortcode'],
+            'posts': newest['posts'],
+            'ig_count': 0 if pd.isna(ig_count) else int(ig_count),
+            'overlap': min(self.config.PINNED_POSTS + 1, newest['posts']),
+        }
+
+    def update_accounts_csv(self, account_data):
+        """Append an account row; journaled, accounts.csv follows on the next compaction"""
+        columns = {col: dtype for col, dtype in self.tracking_columns.items() if col in account_data}
+        new_row = pd.DataFrame([account_data]).astype(columns)
+        self.accounts = pd.concat([self.accounts, new_row], ignore_index=True)
+        self.journal.append(account_data['Account-Link'], account_data, op="add")
         
         self.logger.info(f"Updated accounts CSV with {account_data['Username']} data")
 
+    def prepare_session(self):
+        """Zeeschuimer + Instagram login after start_browser
+
+        With Config.PERSISTENT_PROFILE the profile directory already holds the
+        session cookies and the installed extension: the popup of the saved
+        UUID and the Instagram home page are checked first, and only a failed
+        check runs _setup_zeeschuimer or setup_instagram.
+        """
+        warm = {'zeeschuimer': False, 'instagram': False}
+        if self.config.PERSISTENT_PROFILE:
+            with self.metrics.span("session_check") as span:
+                uuid = self._load_session_state().get('zeeschuimer_uuid')
+                warm['zeeschuimer'] = bool(uuid) and self._zeeschuimer_ready(uuid)
+                warm['instagram'] = self._instagram_logged_in()
+                span.update(warm)
+
+        if warm['zeeschuimer']:
+            self.logger.info(f"Reusing Zeeschuimer {self.zeeschuimer_uuid} from {self.profile_dir}")
+        else:
+            self._setup_zeeschuimer()
+
+        if warm['instagram']:
+            self.logger.info("Instagram session still valid, skipping login")
+        elif not self.setup_instagram():
+            return False
+
+        if self.config.PERSISTENT_PROFILE:
+            self._save_session_state()
+        return True
+
+    def _session_state_path(self):
+        return self.profile_dir / "bundesposts_session.json"
+
+    def _load_session_state(self):
+        try:
+            return json.loads(self._session_state_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_session_state(self):
+        state = {'zeeschuimer_uuid': self.zeeschuimer_uuid, 'saved_at': datetime.now().isoformat()}
+        self._session_state_path().write_text(json.dumps(state), encoding="utf-8")
+
+    def _zeeschuimer_ready(self, uuid):
+        """Extension with this UUID is installed in the profile; collection gets (re-)enabled"""
+        self.zeeschuimer_uuid = uuid
+        try:
+            self.driver.get(self._zeeschuimer_popup())
+            WebDriverWait(self.driver, 5).until(EC.presence_of_element_located((By.ID, "stats-instagramcom")))
+            self._enable_collection()
+            return True
+        except (TimeoutException, WebDriverException, RuntimeError) as e:
+            self.logger.info(f"Saved Zeeschuimer {uuid} not usable, installing again: {str(e)}")
+            self.zeeschuimer_uuid = None
+            return False
+
+    def _instagram_logged_in(self):
+        """Instagram home page shows the logged-in navigation (persisted session cookies)"""
+        try:
+            self.driver.get("https://www.instagram.com")
+            return WebDriverWait(self.driver, 15).until(instagram_session) == "logged_in"
+        except (TimeoutException, WebDriverException):
+            return False
+
     def setup_instagram(self):
+        trace = self.metrics.trace(None, total="login")
         try:
+            trace.phase("login_page")
             self.driver.get("https://www.instagram.com")
+            trace.phase("login_cookies")
             self._decline_cookies()
-            time.sleep(2)  # Fixed delay for cookie dismissal
             
+            # _enter_credentials waits for the login form itself
+            trace.phase("login_credentials")
             self._enter_credentials()
             
             # Verify login success
+            trace.phase("login_check")
             WebDriverWait(self.driver, 15).until(
                 EC.presence_of_element_located((By.XPATH, "//nav[contains(@aria-label,'Navigation')]"))
             )
 
-            time.sleep(1)
+            trace.phase("login_modals")
             self.driver.get("https://www.instagram.com/accounts/onetap/?next=%2F")
-            time.sleep(2)
+            WebDriverWait(self.driver, self.config.WAIT_TIMEOUT).until(document_ready)
             self._dismiss_post_login_modals()
+            trace.close(ok=True)
             return True
         except Exception as e:
             self.logger.error(f"Login failed: {str(e)}", exc_info=True)
+            trace.close(ok=False)
             return False
-            return False
 
-    def scrape_accounts(self):
-        """Add scrape_status initialization"""
+    def scrape_accounts(self, incremental=None):
+        """Add scrape_status initialization
+
+        incremental (default Config.INCREMENTAL): re-scrape accounts that
+        already have an export, but only back to their newest exported post.
+        """
+        if incremental is None:
+            incremental = self.config.INCREMENTAL
         # Initialize status column if missing
         if 'scrape_status' not in self.accounts.columns:
             self.accounts['scrape_status'] = 'pending'
@@ -931,72 +1109,80 @@ class BundesScraper:
                     # Skip invalid or completed accounts
                     if 'Account-Link' not in row or not row['Account-Link']:
                         self.logger.info(f"Skipping row {idx}: No valid Account-Link")
-                        self.accounts.at[idx, 'scrape_status'] = 'skipped'
+                        self._update_account(idx, scrape_status='skipped')
                         break
 
-                    # Handle new accounts with no data
-                    if pd.isna(row['ZS_count']) or pd.isna(row['IG_count']):
-                        ig = 0
-                        zs = 0
-                    else:
-                        ig = int(float(row['IG_count']))  # Handle potential float strings
-                        zs = int(float(row['ZS_count']))
-                    
-                    # Only skip if either:
-                    # 1. Status is completed/done OR
-                    # 2. We've captured at least 90% of posts
-                    if (row['scrape_status'] in ['completed', 'done']) or (zs / ig >= 0.9 if ig > 0 else False):
+                    baseline = self._incremental_baseline(row) if incremental else None
+                    if not baseline and self._is_scraped(row):
                         self.logger.info(f"Skipping {row['Account-Link']}: {row['scrape_status']} profile")
                         break
                     
                     
                     # Process account
                     self.logger.info(f"\nProcessing profile: {row['Account-Link']}")
-                    success = self.process_profile(idx, row['Account-Link'])
+                    success = self.process_profile(idx, row['Account-Link'], baseline)
                     
 
                     ######################         
                     if success:
-                        # Get fresh counts as integers
-                        zs = int(self.accounts.at[idx, 'ZS_count'])
-                        ig = int(self.accounts.at[idx, 'IG_count'])
-                        
-                        # New status hierarchy
-                        if zs >= ig:
-                            new_status = 'completed'
-                        elif (ig - zs) <= 3:  # 1-3 posts missing
-                            new_status = 'done'
-                            self.logger.info(f"Marked {row['Account-Link']} as done ({ig-zs} posts missing)")
-                        else:
-                            new_status = 'incomplete'
-                        
+                        new_status = self._capture_status(idx)
                         self.logger.info(f"Successfully processed {row['Account-Link']} ({new_status})")
-                        self.accounts.at[idx, 'scrape_status'] = new_status
-                        self.accounts.at[idx, 'last_scraped'] = datetime.now().isoformat()
+                        self._update_account(idx, scrape_status=new_status, last_scraped=datetime.now().isoformat())
                         break
 
                     retry_count += 1
                     if retry_count == max_retries:
                         self.logger.error(f"Failed to process {row['Account-Link']} after {max_retries} attempts")
-                        self.accounts.at[idx, 'scrape_status'] = 'failed'
+                        self._update_account(idx, scrape_status='failed')
                     else:
                         self.logger.warning(f"Retrying {row['Account-Link']} (attempt {retry_count + 1}/{max_retries})")
+                        self.metrics.event("retry", account=self._sanitize_handle(row['Account-Link']),
+                                           step="process_profile", attempt=retry_count + 1)
                     time.sleep(5)
                     
                 except Exception as e:
                     self.logger.error(f"Error processing {row['Account-Link']}: {str(e)}")
                     retry_count += 1
                     if retry_count == max_retries:
-                        self.accounts.at[idx, 'scrape_status'] = 'failed'
+                        self._update_account(idx, scrape_status='failed')
                     time.sleep(5)
                     
                 finally:
-                    # Save progress after each attempt
-                    self.accounts.to_csv(self.data_dir / "accounts.csv", index=False)
-                    time.sleep(random.uniform(2, 4))
+                    # Progress is already journaled, nothing to rewrite per attempt
+                    if self.config.HUMAN_DELAY:  # Pacing between accounts (anti-detection)
+                        time.sleep(random.uniform(2, 4) * self.config.HUMAN_DELAY_SCALE)
 
+        # Materialize accounts.csv once at the end (an interrupted run replays the journal)
+        self._save_accounts()
         print("Scraping finished.")
 
+    @staticmethod
+    def _is_scraped(row):
+        """Skip accounts that are completed/done or have at least 90% of posts"""
+        # Handle new accounts with no data
+        if pd.isna(row['ZS_count']) or pd.isna(row['IG_count']):
+            ig = 0
+            zs = 0
+        else:
+            ig = int(float(row['IG_count']))  # Handle potential float strings
+            zs = int(float(row['ZS_count']))
+        
+        return (row['scrape_status'] in ['completed', 'done']) or (zs / ig >= 0.9 if ig > 0 else False)
+
+    def _capture_status(self, idx):
+        """Status after a successful process_profile run"""
+        # Get fresh counts as integers
+        zs = int(self.accounts.at[idx, 'ZS_count'])
+        ig = int(self.accounts.at[idx, 'IG_count'])
+        
+        # New status hierarchy
+        if zs >= ig:
+            return 'completed'
+        elif (ig - zs) <= 3:  # 1-3 posts missing
+            self.logger.info(f"Marked {self.accounts.at[idx, 'Account-Link']} as done ({ig-zs} posts missing)")
+            return 'done'
+        return 'incomplete'
+
     def live_progress(scraper):
         """Display sorted version without affecting storage"""
         while scraper.scrape_running:
@@ -1066,17 +1252,20 @@ class BundesScraper:
             'scrape_status': 'pending',
             'last_scraped': pd.NaT,
             'Export_Path': '',
+            'Export_Segments': '',
             'ZS_count': 0,
             'IG_count': 0,
             'IG_Followers': 0,
             'IG_Followed': 0,
             'Scrape_Start': pd.NaT,
             'Scrape_End': pd.NaT,
+            'Scroll_Seconds': 0.0,
             'Notes': ''
         })
         
         self.accounts = pd.concat([self.accounts, new_profiles], ignore_index=True)
-        self._save_accounts()
+        for _, profile in new_profiles.iterrows():
+            self.journal.append(profile['Account-Link'], profile.drop('Account-Link').to_dict(), op="add")
         self.logger.info(f"Added {len(urls)} new profiles")
 
     def _init_live_view(self):
@@ -1104,61 +1293,6 @@ class BundesScraper:
         # Update display
         clear_output(wait=True)
         self.live_view.update(styled)
-    def _get_follower_count(self):
-        """Robust follower count parsing with metric suffix support"""
-        try:
-            element = self.driver.find_element(By.XPATH, "//a[contains(@href,'followers')]/span")
-            text = element.get_attribute("title") or element.text
-            
-            # Handle metric suffixes (k/M) with different language formats
-            clean_text = text.replace('\xa0', ' ').replace(',', '.').lower()
-            
-            if 'mio' in clean_text:  # German "Millionen"
-                return int(float(clean_text.replace(' mio', '')) * 1_000_000)
-            elif 'tsd' in clean_text:  # German "Tausend"
-                return int(float(clean_text.replace(' tsd', '')) * 1_000)
-            elif 'm' in clean_text:  # English million
-                return int(float(clean_text.replace('m', '')) * 1_000_000)
-            elif 'k' in clean_text:  # English thousand
-                return int(float(clean_text.replace('k', '')) * 1_000)
-                
-            return int(float(clean_text.split()[0].replace('.', '')))
-        except Exception as e:
-            self.logger.warning(f"Could not parse follower count: {str(e)}")
-            return 0
-
-
-    @staticmethod
-    def _parse_metric_number(value):
-        """Universal metric parser handling all number formats"""
-        try:
-            # Normalize different decimal separators and suffixes
-            clean = str(value).lower() \
-                .replace(',', '.') \
-                .replace('tsd', 'k') \
-                .replace('mio', 'm') \
-                .replace('t', 'k') \
-                .replace('\xa0', '') \
-                .replace(' ', '')
-            
-            # Extract numeric components and suffix
-            match = re.match(r"^([\d\.]+)([mk]?)$", clean)
-            if not match:
-                return 0
-            
-            number_str, suffix = match.groups()
-            
-            # Remove thousand separators and parse
-            number = float(number_str.replace('.', '')) if '.' in number_str \
-                else float(number_str)
-            
-            # Apply multipliers
-            multipliers = {'k': 1_000, 'm': 1_000_000}
-            return int(number * multipliers.get(suffix, 1))
-        
-        except:
-            return 0
-
     def _apply_sorting(self, df):
         """Safe sorting with index preservation"""
         sorted_df = df.reset_index(drop=True).copy()  # Prevent index corruption
@@ -1213,7 +1347,7 @@ class BundesScraper:
         for attempt in range(5):
             try:
                 self._scroll_profile(attempt)
-                current_count = self._get_zeeschuimer_count()
+                current_count = self._get_zeeschuimer_count() or 0
                 
                 # Allow partial success if >75% captured
                 if current_count >= 0.75 * self.accounts.at[idx, 'IG_count']:
@@ -1228,16 +1362,6 @@ class BundesScraper:
         time.sleep(10)
         self._export_data()
 
-    def _handle_private_account(self):
-        """Private account detection and handling"""
-        try:
-            private = self.driver.find_element(By.XPATH, "//h2[contains(., 'This Account is Private')]")
-            if private:
-                self.logger.warning("Private account detected - skipping")
-                return True
-        except NoSuchElementException:
-            return False
-
     def _enforce_accounts_dtypes(self):
         """Atomic type enforcement before save"""
         type_map = {
@@ -1246,6 +1370,7 @@ class BundesScraper:
             'IG_Followers': ('int32', lambda x: pd.to_numeric(x, errors='coerce').fillna(0)),
             'IG_Followed': ('int32', lambda x: pd.to_numeric(x, errors='coerce').fillna(0)),
             'Export_Path': ('string', lambda x: x.astype('string')),
+            'Export_Segments': ('string', lambda x: x.astype('string')),
             'Scrape_Start': ('datetime64[ns]', lambda x: pd.to_datetime(x, errors='coerce')),
             'Scrape_End': ('datetime64[ns]', lambda x: pd.to_datetime(x, errors='coerce'))
         }
@@ -0,0 +1,136 @@
+"""
+Adaptive scroll schedule for BundesScraper.scroll_profile
+
+The controller watches how many posts Zeeschuimer captured and how much the
+page grew after every scroll. While new posts keep arriving it shortens the
+pause between scrolls, when the feed stalls it backs off exponentially, and it
+stops as soon as the IG_count target is reached (or the feed stays stalled,
+or max_scrolls/max_duration run out, so a feed that keeps growing without new
+captures cannot scroll forever).
+A few empty observations are expected while a page request is in flight, so
+backoff only starts after `patience` of them.
+In incremental mode the caller also reports whether the newest post of the
+previous export has been captured, which ends the scroll early ('known_post').
+It holds no driver, so the same logic runs against a simulated feed in
+src/benchmark.py.
+"""
+import random
+import time
+
+
+class ScrollController:
+    def __init__(self, target_count, min_delay=0.3, max_delay=6.0, start_delay=1.5,
+                 speedup=0.5, backoff=1.6, patience=3, max_stalls=12, max_scrolls=None, max_duration=None,
+                 jitter=0.15, clock=time.monotonic):
+        self.target_count = target_count
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.speedup = speedup
+        self.backoff = backoff
+        self.patience = patience
+        self.max_stalls = max_stalls
+        self.max_scrolls = max_scrolls
+        self.max_duration = max_duration
+        self.jitter = jitter
+        self.clock = clock
+
+        self.delay = start_delay
+        self.count = 0
+        self.height = 0
+        self.scrolls = 0
+        self.stalls = 0  # consecutive observations without new posts or page growth
+        self.stall_events = 0
+        self.rate = 0.0  # posts captured per second (smoothed)
+        self.reason = None
+        self.started = None
+        self._last_time = None
+
+    @classmethod
+    def from_config(cls, config, target_count, **kwargs):
+        """Controller with the SCROLL_* settings from Config"""
+        settings = dict(
+            min_delay=config.SCROLL_MIN_DELAY,
+            max_delay=config.SCROLL_MAX_DELAY,
+            max_stalls=config.SCROLL_MAX_STALLS,
+            max_scrolls=config.SCROLL_MAX_SCROLLS,
+            max_duration=config.SCROLL_MAX_DURATION,
+        )
+        settings.update(kwargs)
+        return cls(target_count, **settings)
+
+    def start(self, count=0, height=0, reached=False):
+        self.started = self._last_time = self.clock()
+        self.count = count
+        self.height = height
+        if reached:
+            self.reason = 'known_post'
+        elif self.target_count is not None and count >= self.target_count:
+            self.reason = 'target'
+        return self
+
+    @property
+    def elapsed(self):
+        return 0.0 if self.started is None else self.clock() - self.started
+
+    @property
+    def done(self):
+        return self.reason is not None
+
+    def next_delay(self):
+        """Pause before the next scroll, with a little anti-detection jitter"""
+        return self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def observe(self, count, height, reached=False):
+        """Feed the state after a scroll; returns True once scrolling should stop
+
+        `reached` is True once the scroll has caught up with posts that are
+        already exported (incremental re-scrape).
+        """
+        now = self.clock()
+        self.scrolls += 1
+        new_items = count - self.count
+        grew = height > self.height
+
+        interval = max(now - self._last_time, 1e-6)
+        self.rate = 0.5 * self.rate + 0.5 * (max(new_items, 0) / interval)
+        self._last_time = now
+
+        if new_items > 0:
+            # Feed is flowing: scroll sooner
+            self.stalls = 0
+            self.delay = max(self.min_delay, self.delay * self.speedup)
+        elif grew:
+            # Page rendered more but Zeeschuimer has not seen the response yet
+            self.stalls = 0
+        else:
+            self.stalls += 1
+            if self.stalls > self.patience:
+                self.stall_events += 1
+                self.delay = min(self.max_delay, self.delay * self.backoff)
+
+        self.count = max(count, self.count)
+        self.height = max(height, self.height)
+
+        if reached:
+            self.reason = 'known_post'
+        elif self.target_count is not None and self.count >= self.target_count:
+            self.reason = 'target'
+        elif self.stalls >= self.max_stalls:
+            self.reason = 'stalled'
+        elif self.max_scrolls and self.scrolls >= self.max_scrolls:
+            self.reason = 'max_scrolls'
+        elif self.max_duration and now - self.started >= self.max_duration:
+            self.reason = 'timeout'
+        return self.done
+
+    def summary(self):
+        elapsed = self.elapsed
+        return {
+            'reason': self.reason,
+            'scrolls': self.scrolls,
+            'count': self.count,
+            'target': self.target_count,
+            'seconds': round(elapsed, 2),
+            'posts_per_sec': round(self.count / elapsed, 2) if elapsed else 0.0,
+            'stall_events': self.stall_events,
+        }
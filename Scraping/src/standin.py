@@ -0,0 +1,438 @@
+"""
+Local stand-in for Instagram profiles and the Zeeschuimer popup
+
+Serves fake profile pages with the same header markup the scraper reads
+(//header//ul/li[n]//span) and a fake extension popup exposing
+#stats-instagramcom, so BundesScraper and ScraperPool can be exercised
+without a live Instagram login.
+
+Profile grids scroll like the real ones: the page comes with the first
+`page_size` posts, scrolling near the bottom fetches the next page from
+/_api/feed/<handle>/ and the grid grows once the response arrives (after
+`latency` seconds). Like Zeeschuimer, which reads the responses inside the
+browser, capture happens on the browser side: the page reports the posts of
+every response it received to /_zs/capture, so the popup count lags the scroll
+exactly like in the browser, and a browser setting that kept responses from
+the page (see Config.LEAN_BROWSER) shows up as served_count(handle) >
+received_count(handle).
+Every post shows a thumbnail and the page uses a web font, both served from
+/_media/ and counted (media_requests, media_bytes), which shows what a lean
+browser (Config.LEAN_BROWSER) no longer downloads.
+
+Every browser gets its own capture buffer (keyed by a session cookie), just
+like every Firefox instance has its own Zeeschuimer.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = "zs_session"
+
+PROFILE_PAGE = """<!DOCTYPE html>
+<html lang="de">
+<head><meta charset="utf-8"><title>{handle} • Instagram</title>
+<style>
+  @font-face {{ font-family: "StandInSans"; src: url("/_media/standin-sans.woff2"); }}
+  body {{ font-family: "StandInSans", sans-serif; }}
+  #grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 4px; }}
+  .post {{ height: 300px; background: #ddd; }}
+  .post img {{ width: 100%; height: 100%; object-fit: cover; }}
+</style>
+</head>
+<body>
+<main>
+  <header>
+    <h1>{full_name}</h1>
+    <ul>
+      <li><span>{posts}</span> Beiträge</li>
+      <li><span title="{followers_exact}">{followers}</span> Follower</li>
+      <li><span>{following}</span> Gefolgt</li>
+    </ul>
+  </header>
+  <article id="grid">{grid}</article>
+</main>
+<script>
+const grid = document.getElementById("grid");
+let offset = {offset};
+let loading = false;
+async function capture(codes) {{
+  // Zeeschuimer stand-in: report the posts this browser received
+  if (codes.length) await fetch("/_zs/capture", {{method: "POST", body: JSON.stringify(codes)}});
+}}
+async function loadMore() {{
+  if (loading || offset === null) return;
+  loading = true;
+  try {{
+    const response = await fetch(`/_api/feed/{handle}/?offset=${{offset}}`);
+    const page = await response.json();
+    grid.insertAdjacentHTML("beforeend", page.html);
+    await capture(page.codes);
+    offset = page.next;
+  }} finally {{
+    loading = false;
+  }}
+}}
+function nearBottom() {{
+  return window.innerHeight + window.scrollY >= document.body.scrollHeight - 600;
+}}
+window.addEventListener("scroll", () => {{ if (nearBottom()) loadMore(); }});
+capture({codes}).then(() => {{ if (nearBottom()) loadMore(); }});
+</script>
+</body>
+</html>
+"""
+
+POPUP_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Zeeschuimer</title></head>
+<body>
+<table>
+  <tr id="stats-instagramcom">
+    <td><input type="checkbox" id="zs-enabled-instagram.com" checked>
+        <label for="zs-enabled-instagram.com">instagram.com</label></td>
+    <td class="num-items">{count}</td>
+    <td><button class="reset">Reset</button>
+        <button class="download-ndjson">.ndjson</button></td>
+  </tr>
+</table>
+<script>
+const numItems = document.querySelector("#stats-instagramcom td.num-items");
+async function refreshStats() {{
+  const response = await fetch("/_zs/stats");
+  numItems.textContent = (await response.json()).count;
+}}
+document.querySelector("button.reset").addEventListener("click", async () => {{
+  await fetch("/_zs/reset", {{method: "POST"}});
+  await refreshStats();
+}});
+document.querySelector("button.download-ndjson").addEventListener("click", () => {{
+  const link = document.createElement("a");
+  link.href = "/_zs/export";
+  link.download = "";
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+}});
+setInterval(refreshStats, 500);
+</script>
+</body>
+</html>
+"""
+
+
+def format_metric(value):
+    """Render a counter the way the German Instagram header does"""
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.1f}".rstrip("0").rstrip(".").replace(".", ",") + " Mio"
+    if value >= 10_000:
+        return f"{value / 1_000:.1f}".rstrip("0").rstrip(".").replace(".", ",") + " Tsd"
+    return f"{value:,}".replace(",", ".")
+
+
+def make_profile(handle, posts, followers=1000, following=100, seed=None):
+    """Fixture profile with `posts` synthetic items in Zeeschuimer item-list format"""
+    rng = random.Random(seed if seed is not None else handle)
+    now = int(time.time())
+    items = []
+    for n in range(posts):
+        code = f"{handle}{n:06d}".replace(".", "_")
+        caption = f"Beitrag {posts - n} von {handle} #bundestag #politik"
+        items.append({
+            "id": f"{rng.getrandbits(48)}_{n}",
+            "code": code,
+            "taken_at": now - (n + 1) * 86400,
+            "media_type": 1,
+            "caption": {"text": caption},
+            "user": {"username": handle, "full_name": handle.title(), "profile_pic_url": ""},
+            "image_versions2": {"candidates": [{"url": f"https://example.invalid/{code}.jpg"}]},
+            "like_count": rng.randint(0, 5000),
+            "comment_count": rng.randint(0, 300),
+        })
+    return {
+        "handle": handle,
+        "full_name": handle.title(),
+        "posts": posts,
+        "followers": followers,
+        "following": following,
+        "items": items,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "BundesStandIn/1.0"
+
+    def log_message(self, format, *args):
+        self.server.standin.logger.debug(format % args)
+
+    def _session(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        if SESSION_COOKIE in cookie:
+            return cookie[SESSION_COOKIE].value, False
+        return uuid.uuid4().hex, True
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200, headers=None, session=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        if session:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={session}; Path=/")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        standin = self.server.standin
+        session, new_session = self._session()
+        cookie = session if new_session else None
+        path = urlparse(self.path).path
+
+        if path == "/popup/interface.html":
+            self._send(POPUP_PAGE.format(count=standin.captured_count(session)), session=cookie)
+        elif path == "/_zs/stats":
+            self._send(json.dumps({"count": standin.captured_count(session)}), "application/json", session=cookie)
+        elif path == "/_zs/export":
+            filename = f"zeeschuimer-export-instagram.com-{datetime.now().strftime('%Y-%m-%dT%H%M%S')}.ndjson"
+            self._send(standin.export_ndjson(session), "application/ndjson", session=cookie,
+                       headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+        elif path.startswith("/_media/"):
+            content_type = "font/woff2" if path.endswith(".woff2") else "image/jpeg"
+            self._send(standin.media(path), content_type, session=cookie)
+        elif path.startswith("/_api/feed/"):
+            handle = path[len("/_api/feed/"):].strip("/")
+            if handle not in standin.profiles:
+                self._send(json.dumps({"error": "not found"}), "application/json", status=404, session=cookie)
+                return
+            offset = parse_qs(urlparse(self.path).query).get("offset", ["0"])[0]
+            page = standin.feed_page(handle, session, int(offset))
+            self._send(json.dumps(page), "application/json", session=cookie)
+        elif path.strip("/") in standin.profiles:
+            self._send(standin.render_profile(path.strip("/"), session), session=cookie)
+        elif path == "/":
+            self._send("<html><body>BundesPosts stand-in</body></html>", session=cookie)
+        else:
+            self._send("Sorry, this page isn't available.", "text/plain; charset=utf-8", status=404, session=cookie)
+
+    def do_POST(self):
+        standin = self.server.standin
+        session, new_session = self._session()
+        path = urlparse(self.path).path
+        if path == "/_zs/reset":
+            standin.reset(session)
+            self._send(json.dumps({"count": 0}), "application/json", session=session if new_session else None)
+        elif path == "/_zs/capture":
+            length = int(self.headers.get("Content-Length", 0))
+            codes = json.loads(self.rfile.read(length) or b"[]")
+            standin.capture(session, codes)
+            self._send(json.dumps({"count": standin.captured_count(session)}), "application/json",
+                       session=session if new_session else None)
+        else:
+            self._send("Not found", "text/plain; charset=utf-8", status=404)
+
+
+class StandInServer:
+    """
+    Threaded HTTP server standing in for instagram.com + Zeeschuimer
+
+    with StandInServer.from_accounts(scraper.accounts.head(4)) as standin:
+        scraper.popup_url = standin.popup_url
+        scraper.process_profile(idx, standin.profile_url("bundeskanzler"))
+    """
+
+    def __init__(self, profiles, host="127.0.0.1", port=0, page_size=12, latency=(0.2, 0.6), seed=0,
+                 media_size=40_000):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.profiles = {profile["handle"]: profile for profile in profiles}
+        self.host = host
+        self.port = port
+        self.page_size = page_size
+        self.latency = latency  # (min, max) seconds per feed page
+        self.media_size = media_size
+        self.feed_requests = 0
+        self.media_requests = 0
+        self.media_bytes = 0
+        self._rng = random.Random(seed)
+        self._items = {item["code"]: item for profile in profiles for item in profile["items"]}
+        self._served = {}  # handle -> codes sent to a browser
+        self._received = {}  # handle -> codes a page reported as received
+        self._captured = {}  # session -> {code: item}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @classmethod
+    def from_accounts(cls, accounts, max_posts=60, seed=0, **kwargs):
+        """Build one fixture profile per account handle in an accounts frame"""
+        rng = random.Random(seed)
+        profiles = []
+        for link in accounts['Account-Link'].dropna():
+            handle = cls.handle_of(link)
+            profiles.append(make_profile(
+                handle,
+                posts=rng.randint(3, max_posts),  # keeps exports above MIN_EXPORT_SIZE
+                followers=rng.choice([rng.randint(100, 9_999), rng.randint(10_000, 999_999)]),
+                following=rng.randint(1, 2_000),
+                seed=rng.random(),
+            ))
+        return cls(profiles, seed=seed, **kwargs)
+
+    @staticmethod
+    def handle_of(profile_url):
+        """Instagram handle from a profile link"""
+        return profile_url.strip("/").split("/")[-1]
+
+    # Lifecycle
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="standin-http", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Stand-in serving {len(self.profiles)} profiles at {self.url}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def popup_url(self):
+        return f"{self.url}/popup/interface.html"
+
+    def profile_url(self, profile_url_or_handle):
+        """Map an instagram.com link (or a bare handle) onto the stand-in"""
+        return f"{self.url}/{self.handle_of(profile_url_or_handle)}/"
+
+    # Zeeschuimer emulation
+    def capture(self, session, codes):
+        """Record items the page of one browser session received, as seen by its Zeeschuimer"""
+        with self._lock:
+            buffer = self._captured.setdefault(session, {})
+            for code in codes:
+                item = self._items.get(code)
+                if item is not None:
+                    buffer.setdefault(code, item)
+                    self._received.setdefault(item["user"]["username"], set()).add(code)
+
+    def captured_count(self, session):
+        with self._lock:
+            return len(self._captured.get(session, {}))
+
+    def served_count(self, handle):
+        """Posts of `handle` sent to any browser so far (not cleared by reset)"""
+        with self._lock:
+            return len(self._served.get(handle, ()))
+
+    def received_count(self, handle):
+        """Posts of `handle` any page reported as received so far (not cleared by reset)"""
+        with self._lock:
+            return len(self._received.get(handle, ()))
+
+    def reset(self, session):
+        with self._lock:
+            self._captured.pop(session, None)
+
+    def export_ndjson(self, session):
+        """Captured items as a Zeeschuimer ndjson export"""
+        with self._lock:
+            items = list(self._captured.get(session, {}).values())
+        lines = []
+        for item in items:
+            lines.append(json.dumps({
+                "item_id": item["code"],
+                "source_platform": "instagram.com",
+                "source_platform_url": f"{self.url}/{item['user']['username']}/",
+                "timestamp_collected": int(time.time() * 1000),
+                "data": item,
+            }))
+        return "\n".join(lines) + "\n" if lines else ""
+
+    @staticmethod
+    def _grid(items):
+        return "".join(f'<a href="/p/{item["code"]}/"><div class="post">'
+                       f'<img src="/_media/{item["code"]}.jpg" alt=""></div></a>' for item in items)
+
+    def media(self, path):
+        """Placeholder bytes for a thumbnail or font (content does not matter, the download does)"""
+        with self._lock:
+            self.media_requests += 1
+            self.media_bytes += self.media_size
+        return bytes(self.media_size)
+
+    def _page(self, handle, session, offset):
+        """Posts offset..offset+page_size (served) and the next offset, None at the end"""
+        items = self.profiles[handle]["items"][offset:offset + self.page_size]
+        with self._lock:
+            self._served.setdefault(handle, set()).update(item["code"] for item in items)
+        end = offset + len(items)
+        return items, end if end < len(self.profiles[handle]["items"]) else None
+
+    def render_profile(self, handle, session):
+        """Profile page with the first page of the grid"""
+        profile = self.profiles[handle]
+        items, next_offset = self._page(handle, session, 0)
+        return PROFILE_PAGE.format(
+            handle=handle,
+            full_name=profile["full_name"],
+            posts=format_metric(profile["posts"]),
+            followers=format_metric(profile["followers"]),
+            followers_exact=f"{profile['followers']:,}".replace(",", "."),
+            following=format_metric(profile["following"]),
+            grid=self._grid(items),
+            codes=json.dumps([item["code"] for item in items]),
+            offset="null" if next_offset is None else next_offset,
+        )
+
+    def feed_page(self, handle, session, offset):
+        """Next grid page for the infinite scroll, served after the simulated latency"""
+        with self._lock:
+            self.feed_requests += 1
+            delay = self._rng.uniform(*self.latency)
+        time.sleep(delay)
+        items, next_offset = self._page(handle, session, offset)
+        return {"html": self._grid(items), "codes": [item["code"] for item in items], "next": next_offset}
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Serve stand-in profiles for the accounts in data/accounts.csv")
+    parser.add_argument("--accounts", default="data/accounts.csv")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--page-size", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    accounts = pd.read_csv(args.accounts, dtype="string").head(args.limit)
+    standin = StandInServer.from_accounts(accounts, port=args.port, page_size=args.page_size).start()
+    print(f"Popup: {standin.popup_url}")
+    for handle in standin.profiles:
+        print(f"  {standin.profile_url(handle)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
@@ -0,0 +1,152 @@
+"""
+Parquet store for the global post corpus
+
+data/global_posts/ is a hive-partitioned Parquet dataset
+
+    data/global_posts/handle=<IG_handle>/year=<YYYY>/part-0.parquet
+
+with typed columns (timestamps, integer counts) and list-typed
+image_url/media_url. load_posts() reads only the requested columns and pushes
+filters down to the partitions and row groups, so e.g. the word count only
+ever touches the body column:
+
+    from src.store import load_posts
+    body = load_posts(columns=["body"])["body"]
+    recent = load_posts(filters=[("handle", "in", ["bundeskanzler"]), ("year", ">=", 2024)])
+"""
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_ROOT = Path("data/global_posts")
+
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("thread_id", pa.string()),
+    ("parent_id", pa.string()),
+    ("body", pa.string()),
+    ("author", pa.string()),
+    ("author_fullname", pa.string()),
+    ("author_avatar_url", pa.string()),
+    ("timestamp", pa.timestamp("s", tz="UTC")),
+    ("type", pa.string()),
+    ("url", pa.string()),
+    ("image_url", pa.list_(pa.string())),
+    ("media_url", pa.list_(pa.string())),
+    ("hashtags", pa.string()),
+    ("num_likes", pa.int64()),
+    ("num_comments", pa.int64()),
+    ("num_media", pa.int32()),
+    ("location_name", pa.string()),
+    ("location_latlong", pa.string()),
+    ("location_city", pa.string()),
+    ("unix_timestamp", pa.int64()),
+    ("media_n", pa.int32()),
+    ("media_filename", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("handle", pa.string()), ("year", pa.int32())]), flavor="hive")
+
+
+def _partition_dir(root, handle):
+    return Path(root) / f"handle={handle}"
+
+
+def _record(post):
+    # `timestamp` in the post dict is a local-time string, the store keeps the epoch (UTC)
+    return dict(post, timestamp=post["unix_timestamp"])
+
+
+def write_account(root, handle, posts, batch_size=5000):
+    """
+    Write the posts of one account as its own partition; returns the post count
+
+    Posts are buffered per year and flushed every `batch_size` rows, so memory
+    stays bounded. The partition is written to a `_tmp_` dir (ignored by
+    readers) and swapped in only when complete, replacing the previous one.
+    """
+    root = Path(root)
+    tmp_dir = root / f"_tmp_handle={handle}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    writers = {}
+    buffers = {}
+    count = 0
+
+    def flush(year):
+        if not buffers.get(year):
+            return
+        if year not in writers:
+            year_dir = tmp_dir / f"year={year}"
+            year_dir.mkdir(parents=True, exist_ok=True)
+            writers[year] = pq.ParquetWriter(year_dir / "part-0.parquet", SCHEMA)
+        writers[year].write_batch(pa.RecordBatch.from_pylist(buffers[year], schema=SCHEMA))
+        buffers[year] = []
+
+    try:
+        for post in posts:
+            year = datetime.fromtimestamp(post["unix_timestamp"], timezone.utc).year
+            buffers.setdefault(year, []).append(_record(post))
+            count += 1
+            if len(buffers[year]) >= batch_size:
+                flush(year)
+        for year in list(buffers):
+            flush(year)
+    except BaseException:
+        for writer in writers.values():
+            writer.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    for writer in writers.values():
+        writer.close()
+
+    final_dir = _partition_dir(root, handle)
+    shutil.rmtree(final_dir, ignore_errors=True)
+    if count:
+        tmp_dir.rename(final_dir)
+    else:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return count
+
+
+def clear(root=STORE_ROOT):
+    shutil.rmtree(root, ignore_errors=True)
+    Path(root).mkdir(parents=True, exist_ok=True)
+
+
+def stage(root=STORE_ROOT):
+    """Empty `<root>.tmp` next to the store to rebuild it in; swap_in() replaces the store with it"""
+    staging = Path(root).with_name(Path(root).name + ".tmp")
+    clear(staging)
+    return staging
+
+
+def swap_in(staging, root=STORE_ROOT):
+    """Replace the store at `root` with the rebuilt `staging` dir, the old store survives until then"""
+    root = Path(root)
+    old = root.with_name(root.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if root.exists():
+        os.replace(root, old)
+    os.replace(staging, root)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load_table(root=STORE_ROOT, columns=None, filters=None):
+    """
+    pyarrow Table with only `columns` (list "handle"/"year" to get the partition keys)
+
+    `filters` uses the pyarrow DNF form, e.g. [("year", ">=", 2024)];
+    filters on handle/year skip whole directories, the others skip row groups.
+    """
+    return pq.read_table(root, columns=columns, filters=filters, partitioning=PARTITIONING)
+
+
+def load_posts(root=STORE_ROOT, columns=None, filters=None):
+    """load_table() as a DataFrame"""
+    return load_table(root, columns, filters).to_pandas()
@@ -0,0 +1,79 @@
+"""
+Readiness conditions for WebDriverWait
+
+Used instead of fixed time.sleep calls: each condition returns a truthy value
+as soon as the page is ready, so a wait ends the moment the browser is done
+instead of after a worst-case guess.
+"""
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+ZS_COUNT_CELL = (By.CSS_SELECTOR, "#stats-instagramcom td.num-items")
+
+
+def zeeschuimer_count(predicate=None):
+    """
+    Popup count once the cell shows a number (and `predicate(count)` holds)
+
+    Returns the count as a digit string, so that a count of 0 still ends the
+    wait; callers int() the result.
+    """
+    def _condition(driver):
+        try:
+            text = driver.find_element(*ZS_COUNT_CELL).text.strip().replace('.', '').replace(',', '')
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        if not text.isdigit():
+            return False
+        if predicate is not None and not predicate(int(text)):
+            return False
+        return text
+    return _condition
+
+
+def document_ready(driver):
+    """Current document finished loading"""
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def field_value(locator, value):
+    """Input field holds exactly `value` (typing has reached the DOM)"""
+    def _condition(driver):
+        try:
+            return driver.find_element(*locator).get_attribute("value") == value
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+    return _condition
+
+
+def element_selected(locator):
+    """Checkbox/toggle is checked"""
+    def _condition(driver):
+        try:
+            return driver.find_element(*locator).is_selected()
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+    return _condition
+
+
+def extension_uuid(name):
+    """UUID of an installed extension on about:debugging, once its card is rendered"""
+    def _condition(driver):
+        try:
+            for card in driver.find_elements(By.CSS_SELECTOR, "li.card"):
+                if name in card.text:
+                    uuid = card.find_element(By.XPATH, ".//dt[contains(., 'UUID')]/following-sibling::dd").text.strip()
+                    return uuid or False
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        return False
+    return _condition
+
+
+def instagram_session(driver):
+    """'logged_in' once the navigation bar is rendered, 'logged_out' once the login form is"""
+    if driver.find_elements(By.XPATH, "//nav[contains(@aria-label,'Navigation')]"):
+        return "logged_in"
+    if driver.find_elements(By.NAME, "username"):
+        return "logged_out"
+    return False
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.header import parse_count
+
+RAW_ACCOUNTS = Path(__file__).resolve().parents[1] / "data" / "raw_accounts.csv"
+
+
+def convert_followers(val):
+    """BundesScraper._convert_followers before parse_count replaced it"""
+    original = str(val).strip()
+    if original == '-':
+        return 0
+    normalized = original.replace('.', '').replace(',', '.')
+    clean = ''.join([c for c in normalized if c.isdigit() or c in ('.', '-')])
+    if not clean:
+        return 0
+    multiplier = 1
+    if 'T' in original.upper():
+        multiplier = 1000
+    elif 'M' in original.upper():
+        multiplier = 1_000_000
+    elif 'K' in original.upper():
+        multiplier = 1000
+    return int(float(clean) * multiplier)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.298 Beiträge", 1298),
+    ("1,298", 1298),
+    ("12.345", 12345),
+    ("12,3 Tsd.", 12_300),
+    ("1.000 Tsd", 1_000_000),
+    ("1,5 Mio", 1_500_000),
+    ("1.234,5 Mio", 1_234_500_000),
+    ("12.3K", 12_300),
+    ("1,234.5K", 1_234_500),
+    ("15,7 T", 15_700),
+    ("611 T", 611_000),
+    ("0,5 Mrd.", 500_000_000),
+    ("1\xa0234", 1234),
+    ("-", None),
+    (None, None),
+])
+def test_parse_count(text, expected):
+    assert parse_count(text) == expected
+
+
+def test_parse_count_matches_raw_accounts():
+    followers = pd.read_csv(RAW_ACCOUNTS)["Followers"]
+    mismatches = [(value, convert_followers(value), parse_count(value) or 0) for value in followers
+                  if convert_followers(value) != (parse_count(value) or 0)]
+    assert not mismatches
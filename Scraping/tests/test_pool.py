@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src import pool as pool_module
+from src.config.config import Config
+from src.journal import StateJournal
+from src.pool import PoolWorker, RateLimiter, ScraperPool
+from src.scraper import BundesScraper
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Config in an empty working dir; placeholder geckodriver/xpi so nothing is downloaded"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src" / "driver").mkdir(parents=True)
+    (tmp_path / "src" / "driver" / "geckodriver").touch()
+    (tmp_path / "src" / "extension").mkdir()
+    (tmp_path / "src" / "extension" / f"zeeschuimer-{Config.ZEESCHUIMER_VERSION}.xpi").touch()
+    config = Config()
+    config.JOURNAL_FSYNC = False
+    config.RATE_LIMIT_EVERY = 0
+    return config
+
+
+def make_pool(config, rows, workers=3):
+    accounts = pd.DataFrame(rows, dtype="string")
+    coordinator = BundesScraper(config, accounts=accounts)
+    coordinator.journal = StateJournal(coordinator.data_dir / "accounts.journal", fsync=False)
+    return ScraperPool(config, workers=workers, coordinator=coordinator)
+
+
+def account(n, status='pending', zs='0', ig='0'):
+    return {'Account-Link': f"https://www.instagram.com/mdb_{n:03d}/", 'scrape_status': status,
+            'Export_Path': '', 'Export_Segments': '', 'ZS_count': zs, 'IG_count': ig}
+
+
+def test_rate_limiter_pauses_every_n_starts():
+    limiter = RateLimiter(every=2, delay=0.2)
+    started = []
+    for _ in range(5):
+        limiter.wait()
+        started.append(time.monotonic())
+    gaps = [b - a for a, b in zip(started, started[1:])]
+    assert gaps[0] < 0.1 and gaps[2] < 0.1
+    assert gaps[1] >= 0.19 and gaps[3] >= 0.19
+
+
+def test_rate_limiter_across_threads():
+    limiter = RateLimiter(every=4, delay=0.3)
+    barrier = threading.Barrier(8)
+    waited = []
+
+    def worker():
+        barrier.wait()
+        started = time.monotonic()
+        limiter.wait()
+        waited.append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # The first 4 starts go right away, the next 4 wait out the pause
+    assert limiter._started == 8
+    assert sum(seconds < 0.1 for seconds in waited) == 4
+    assert sum(seconds >= 0.25 for seconds in waited) == 4
+
+
+def test_fill_queue_skips_missing_and_scraped(config):
+    rows = [account(0), account(1, status='completed', zs='10', ig='10'), account(2, zs='95', ig='100'),
+            account(3, zs='5', ig='100'), dict(account(4), **{'Account-Link': None})]
+    pool = make_pool(config, rows)
+    pool._fill_queue()
+
+    queued = [pool.queue.get_nowait()[0] for _ in range(pool.queue.qsize())]
+    assert queued == [0, 3]
+    assert pool.accounts.at[4, 'scrape_status'] == 'skipped'
+
+
+def test_workers_mark_failed_after_max_retries(config, monkeypatch):
+    """Concurrent workers: failing accounts end up failed after MAX_RETRIES, the rest completed"""
+    pool = make_pool(config, [account(n) for n in range(12)], workers=3)
+    attempts = {}
+    lock = threading.Lock()
+
+    def process_profile(self, idx, profile_url, baseline=None):
+        with lock:
+            attempts[idx] = attempts.get(idx, 0) + 1
+        time.sleep(0.01)
+        if idx % 3 == 0:
+            return False
+        self._record_export(idx, {'Export_Path': f"{idx}.ndjson", 'Export_Segments': '', 'ZS_count': 7,
+                                  'IG_count': 7, 'IG_Followers': 100, 'IG_Followed': 10, 'Scrape_End': '',
+                                  'Scroll_Seconds': 1.0, 'Notes': ''})
+        return True
+
+    monkeypatch.setattr(PoolWorker, "process_profile", process_profile)
+    monkeypatch.setattr(PoolWorker, "start_session", lambda self: None)
+    monkeypatch.setattr(pool_module.time, "sleep", lambda seconds: None)
+    pool.scrape_accounts()
+
+    failed = [idx for idx in range(12) if idx % 3 == 0]
+    assert {idx: attempts[idx] for idx in failed} == {idx: config.MAX_RETRIES for idx in failed}
+    assert all(attempts[idx] == 1 for idx in range(12) if idx not in failed)
+    statuses = pool.accounts['scrape_status']
+    assert (statuses[failed] == 'failed').all()
+    assert (statuses.drop(failed) == 'completed').all()
+    assert pool.queue.qsize() == 0
+
+    # Workers never wrote a journal or accounts.csv of their own: the compacted file has every account
+    assert all(worker.journal is None for worker in pool.workers)
+    saved = pd.read_csv(pool.coordinator.accounts_csv, dtype="string")
+    assert saved['scrape_status'].tolist() == statuses.tolist()
+    assert (saved.loc[saved['scrape_status'] == 'completed', 'ZS_count'] == '7').all()
@@ -0,0 +1,43 @@
+from src.config.config import Config
+from src.scroll import ScrollController
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_growing_feed_without_captures_stops():
+    clock = Clock()
+    controller = ScrollController(100, max_scrolls=50, clock=clock).start(0, 1000)
+    height = 1000
+    while not controller.observe(0, height):
+        height += 500
+        clock.now += 1
+    assert controller.reason == 'max_scrolls'
+    assert controller.scrolls == 50
+
+
+def test_max_duration():
+    clock = Clock()
+    controller = ScrollController(100, max_duration=30, clock=clock).start(0, 1000)
+    height = 1000
+    while not controller.observe(0, height):
+        height += 500
+        clock.now += 1
+    assert controller.reason == 'timeout'
+    assert clock.now == 30
+
+
+def test_zero_target_is_reached_at_start():
+    controller = ScrollController(0, clock=Clock()).start(0, 1000)
+    assert controller.done and controller.reason == 'target'
+
+
+def test_from_config_limits_scrolling():
+    controller = ScrollController.from_config(Config, 100)
+    assert controller.max_scrolls == Config.SCROLL_MAX_SCROLLS
+    assert controller.max_duration == Config.SCROLL_MAX_DURATION
@@ -0,0 +1,245 @@
+"""
+Benchmarks for the sentiment models
+
+benchmark_inference() times the per-row predict_sentiment() loop of
+Classification_of_evaluation_texts.ipynb against the batched, length-sorted
+src.inference.predict_proba on the same posts (by default the bodies of the
+evaluation dataset) and checks that both give the same labels.
+
+benchmark_quantized() compares a checkpoint with its int8 variant
+(src/quantize.py) on the gold standard: macro F1, posts/sec and memory.
+
+benchmark_distilled() does the same for GBERT2 and its distilled student
+(src/distill.py).
+
+benchmark_training() fine-tunes gbert-base with each sequence-length setup of
+TRAINING_CONFIGS (src/training.py) and reports training samples/sec, F1 on
+the test split and macro F1 on the gold standard.
+
+    python -m src.benchmark inference --model gbert_finetuned_twitter --limit 500
+    python -m src.benchmark quantized --model gbert_finetuned_twitter --quantized gbert_finetuned_twitter_int8
+    python -m src.benchmark distilled --teacher "gbert_finetuned_twitter&germeval17" --student gbert_student
+    python -m src.benchmark training --data twitter --epochs 1
+"""
+import argparse
+import io
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.evaluation import EVALUATION_DATA
+from src.inference import LABELS, MAX_LENGTH, clean_texts, load_model, predict_proba
+
+# The GBERT1 notebook setup first, the speedups are relative to it
+TRAINING_CONFIGS = {
+    "padded_512": {"max_length": 512, "padding": "max_length", "group_by_length": False},
+    "dynamic_512": {"max_length": 512, "group_by_length": False},
+    "grouped_512": {"max_length": 512},
+    "grouped_auto": {"max_length": "auto"},
+    "grouped_auto_accum": {"max_length": "auto", "batch_size": 4, "gradient_accumulation_steps": 2},
+}
+
+
+def rss_mb():
+    """Current resident memory of the process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # No /proc: peak instead
+
+
+def model_size_mb(model):
+    """Size of the serialized weights"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+
+def load_texts(path=EVALUATION_DATA, column="body", limit=None):
+    """Post texts from an .xlsx/.csv/.parquet file"""
+    if str(path).endswith(".xlsx"):
+        frame = pd.read_excel(path, usecols=[column])
+    elif str(path).endswith(".csv"):
+        frame = pd.read_csv(path, usecols=[column])
+    else:
+        frame = pd.read_parquet(path, columns=[column])
+    texts = clean_texts(frame[column])
+    return texts[:limit] if limit else texts
+
+
+def predict_per_row(texts, model, tokenizer, max_length=MAX_LENGTH):
+    """The notebook's predict_sentiment(), one forward pass per post"""
+    device = next(model.parameters()).device
+    probs = []
+    for text in texts:
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=max_length)
+        inputs = {key: value.to(device) for key, value in inputs.items()}
+        with torch.no_grad():
+            logits = model(**inputs).logits
+        probs.append(torch.softmax(logits, dim=-1)[0].cpu().numpy())
+    return np.stack(probs)
+
+
+def benchmark_inference(model_path, texts, batch_sizes=(8, 32, 64), max_length=MAX_LENGTH):
+    """Seconds and posts/sec of the per-row loop and of each batch size"""
+    tokenizer, model = load_model(model_path)
+    torch.set_grad_enabled(False)
+
+    started = time.perf_counter()
+    reference = predict_per_row(texts, model, tokenizer, max_length).argmax(axis=1)
+    rows = [{'mode': 'per_row', 'batch_size': 1, 'seconds': time.perf_counter() - started,
+             'label_agreement': 1.0}]
+
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        labels = predict_proba(texts, model, tokenizer, batch_size=batch_size, max_length=max_length).argmax(axis=1)
+        rows.append({'mode': 'batched', 'batch_size': batch_size, 'seconds': time.perf_counter() - started,
+                     'label_agreement': float((labels == reference).mean())})
+
+    results = pd.DataFrame(rows)
+    results['posts_per_sec'] = (len(texts) / results['seconds']).round(1)
+    results['speedup'] = (results['seconds'].iloc[0] / results['seconds']).round(2)
+    results['seconds'] = results['seconds'].round(2)
+    return results
+
+
+def benchmark_quantized(model_path, quantized_path=None, data=EVALUATION_DATA, limit=None,
+                        batch_size=32, max_length=MAX_LENGTH):
+    """
+    fp32 vs. int8 on the gold standard (see compare_on_gold)
+
+    Without `quantized_path` the fp32 model is quantized in memory.
+    """
+    from src.quantize import load_quantized, quantize
+
+    def int8():
+        if quantized_path:
+            return load_quantized(quantized_path)
+        tokenizer, model = load_model(model_path)
+        return tokenizer, quantize(model)
+
+    return compare_on_gold({"fp32": lambda: load_model(model_path), "int8": int8},
+                           data, limit, batch_size, max_length)
+
+
+def benchmark_distilled(teacher_path, student_path, data=EVALUATION_DATA, limit=None,
+                        batch_size=32, max_length=MAX_LENGTH):
+    """Teacher vs. distilled student on the gold standard (see compare_on_gold)"""
+    return compare_on_gold({"teacher": lambda: load_model(teacher_path), "student": lambda: load_model(student_path)},
+                           data, limit, batch_size, max_length)
+
+
+def compare_on_gold(variants, data=EVALUATION_DATA, limit=None, batch_size=32, max_length=MAX_LENGTH):
+    """
+    Accuracy, macro F1, posts/sec, model size and resident memory added by
+    loading each model / after scoring the gold standard
+
+    variants: {name: function returning (tokenizer, model)}; speedup and the
+    changes of accuracy/macro F1 are relative to the first one
+    """
+    from src.evaluation import load_gold_standard, scores
+
+    gold = load_gold_standard(data)
+    gold = gold[:limit] if limit else gold
+    texts = gold["body"].tolist()
+
+    rows = []
+    for variant, load in variants.items():
+        before = rss_mb()
+        tokenizer, model = load()
+        loaded = rss_mb()
+        started = time.perf_counter()
+        probs = predict_proba(texts, model, tokenizer, batch_size=batch_size, max_length=max_length)
+        seconds = time.perf_counter() - started
+        predicted = [LABELS[i] for i in probs.argmax(axis=1)]
+        rows.append({'variant': variant, **scores(gold["gold"], predicted), 'seconds': seconds,
+                     'model_mb': model_size_mb(model), 'rss_load_mb': loaded - before,
+                     'rss_after_mb': rss_mb() - before})
+        del tokenizer, model
+
+    results = pd.DataFrame(rows).set_index('variant')
+    results['posts_per_sec'] = (len(texts) / results['seconds']).round(1)
+    results['speedup'] = (results['seconds'].iloc[0] / results['seconds']).round(2)
+    results['accuracy_change'] = results['accuracy'] - results['accuracy'].iloc[0]
+    results['macro_f1_change'] = results['macro_f1'] - results['macro_f1'].iloc[0]
+    return results.round(4)
+
+
+def benchmark_training(data="twitter", configs=None, epochs=1, gold_path=EVALUATION_DATA):
+    """Samples/sec, test F1 and gold standard macro F1 per training configuration"""
+    from src.evaluation import load_gold_standard, scores
+    from src.training import fine_tune, load_training_data
+
+    dataset = load_training_data(data)
+    gold = load_gold_standard(gold_path) if gold_path else None
+    rows = []
+    for name in configs or TRAINING_CONFIGS:
+        with tempfile.TemporaryDirectory() as output_dir:
+            trainer, result = fine_tune(dataset, {**TRAINING_CONFIGS[name], "epochs": epochs}, output_dir, name=data)
+        row = {'config': name, **{key: result[key] for key in
+                                  ['max_length', 'padding', 'group_by_length', 'batch_size',
+                                   'gradient_accumulation_steps', 'samples_per_sec', 'test_f1']}}
+        if gold is not None:
+            probs = predict_proba(gold["body"], trainer.model.eval(), trainer.processing_class, max_length=result['max_length'])
+            row['gold_macro_f1'] = scores(gold["gold"], [LABELS[i] for i in probs.argmax(axis=1)])['macro_f1']
+        rows.append(row)
+        del trainer
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    results = pd.DataFrame(rows).set_index('config')
+    results['speedup'] = (results['samples_per_sec'] / results['samples_per_sec'].iloc[0]).round(2)
+    return results.round(4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment model benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    inference = sub.add_parser("inference", help="per-row vs. batched, length-sorted inference")
+    inference.add_argument("--model", required=True, help="path of a fine-tuned checkpoint")
+    inference.add_argument("--texts", default=EVALUATION_DATA, help=".xlsx/.csv/.parquet with a body column")
+    inference.add_argument("--limit", type=int, default=None)
+    inference.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    inference.add_argument("--max-length", type=int, default=MAX_LENGTH)
+
+    quantized = sub.add_parser("quantized", help="fp32 vs. int8 model on the gold standard")
+    quantized.add_argument("--model", required=True, help="path of a fine-tuned checkpoint")
+    quantized.add_argument("--quantized", default=None, help="export of src.quantize (default: quantize in memory)")
+    quantized.add_argument("--data", default=EVALUATION_DATA)
+    quantized.add_argument("--limit", type=int, default=None)
+    quantized.add_argument("--batch-size", type=int, default=32)
+
+    distilled = sub.add_parser("distilled", help="teacher vs. distilled student on the gold standard")
+    distilled.add_argument("--teacher", default="gbert_finetuned_twitter&germeval17")
+    distilled.add_argument("--student", required=True, help="output of src.distill")
+    distilled.add_argument("--data", default=EVALUATION_DATA)
+    distilled.add_argument("--limit", type=int, default=None)
+    distilled.add_argument("--batch-size", type=int, default=32)
+
+    training = sub.add_parser("training", help="fine-tuning throughput and F1 per sequence-length setup")
+    training.add_argument("--data", default="twitter", choices=["twitter", "twitter_germeval17"])
+    training.add_argument("--configs", nargs="+", default=None, choices=list(TRAINING_CONFIGS))
+    training.add_argument("--epochs", type=int, default=1)
+    training.add_argument("--gold", default=EVALUATION_DATA, help="gold standard .xlsx ('' to skip)")
+
+    args = parser.parse_args()
+    if args.command == "inference":
+        texts = load_texts(args.texts, limit=args.limit)
+        print(benchmark_inference(args.model, texts, args.batch_sizes, args.max_length).to_string(index=False))
+    elif args.command == "quantized":
+        print(benchmark_quantized(args.model, args.quantized, args.data, args.limit, args.batch_size).to_string())
+    elif args.command == "distilled":
+        print(benchmark_distilled(args.teacher, args.student, args.data, args.limit, args.batch_size).to_string())
+    elif args.command == "training":
+        print(benchmark_training(args.data, args.configs, args.epochs, args.gold).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Disk cache for sentiment predictions
+
+After a re-scrape most captions are unchanged, so re-scoring the corpus
+mostly recomputes known results. PredictionCache keeps the class
+probabilities in an SQLite file, keyed on
+
+    (model key, hash of the normalized text)
+
+The model key is a hash of the checkpoint (weights, config, module types, so
+a quantized variant gets its own key) plus max_length. score() looks every
+post up first and only runs the models on posts without a cached result:
+
+    from src.cache import PredictionCache
+    cache = PredictionCache()
+    results = score(posts["body"], models, cache=cache)
+    print(cache.stats())     # hits, misses and hit rate per model
+    cache.evict_stale()      # drop results of older versions of each model
+"""
+import hashlib
+import logging
+import sqlite3
+import time
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+CACHE_PATH = Path("data/prediction_cache.sqlite")
+QUERY_SIZE = 500  # Hashes per SELECT ... IN (...), below the SQLite variable limit
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text):
+    """Text as scored and hashed: whitespace runs collapsed, stripped"""
+    return " ".join(text.split())
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def model_fingerprint(model):
+    """Hash of the checkpoint weights, the config and the module types"""
+    h = hashlib.sha1()
+    h.update(model.config.to_json_string().encode("utf-8"))
+    h.update(" ".join(sorted({type(module).__name__ for module in model.modules()})).encode("utf-8"))
+
+    path = Path(getattr(model, "name_or_path", "") or "")
+    weights = sorted(p for pattern in ("*.safetensors", "*.bin") for p in path.glob(pattern)) if path.is_dir() else []
+    if weights:
+        for weight_file in weights:
+            with open(weight_file, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+    else:
+        # Hub models and in-memory variants: hash the tensors themselves
+        for key, value in model.state_dict().items():
+            if isinstance(value, torch.Tensor):
+                h.update(key.encode("utf-8"))
+                value = value.int_repr() if value.is_quantized else value
+                h.update(value.detach().cpu().contiguous().view(torch.uint8).numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+class PredictionCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS models (
+                model_key TEXT PRIMARY KEY, name TEXT, fingerprint TEXT, max_length INTEGER, last_used REAL);
+            CREATE TABLE IF NOT EXISTS predictions (
+                model_key TEXT, text_hash BLOB, probs BLOB, PRIMARY KEY (model_key, text_hash)) WITHOUT ROWID;
+        """)
+        # model -> fingerprint, hashing a checkpoint takes a moment; weak so a freed model's entry goes with it
+        self._fingerprints = weakref.WeakKeyDictionary()
+        self._stats = {}  # model_key -> [name, hits, misses]
+
+    def model_key(self, name, model, max_length):
+        """Key of `model` at `max_length`, registered as the latest version of `name`"""
+        fingerprint = self._fingerprints.get(model)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[model] = model_fingerprint(model)
+        key = f"{fingerprint}:{max_length}"
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?)",
+                            (key, name, fingerprint, max_length, time.time()))
+        self._stats.setdefault(key, [name, 0, 0])
+        return key
+
+    def get(self, model_key, hashes):
+        """{text hash: probabilities} for the hashes with a cached result"""
+        found = {}
+        unique = list(set(hashes))
+        for start in range(0, len(unique), QUERY_SIZE):
+            part = unique[start:start + QUERY_SIZE]
+            rows = self.db.execute(
+                f"SELECT text_hash, probs FROM predictions WHERE model_key = ? "
+                f"AND text_hash IN ({','.join('?' * len(part))})", [model_key, *part])
+            found.update((text_hash, np.frombuffer(probs, dtype=np.float32)) for text_hash, probs in rows)
+
+        hits = sum(text_hash in found for text_hash in hashes)
+        stats = self._stats.setdefault(model_key, [model_key, 0, 0])
+        stats[1] += hits
+        stats[2] += len(hashes) - hits
+        return found
+
+    def put(self, model_key, hashes, probs):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                ((model_key, text_hash, row.astype(np.float32).tobytes()) for text_hash, row in zip(hashes, probs)))
+
+    def versions(self):
+        """Registered model keys with their number of cached predictions"""
+        return pd.read_sql_query(
+            "SELECT m.name, m.model_key, m.max_length, datetime(m.last_used, 'unixepoch') AS last_used, "
+            "COUNT(p.text_hash) AS predictions FROM models m "
+            "LEFT JOIN predictions p ON p.model_key = m.model_key GROUP BY m.model_key ORDER BY m.name, m.last_used",
+            self.db)
+
+    def evict(self, model_key):
+        """Drop all cached predictions of one model version"""
+        with self.db:
+            removed = self.db.execute("DELETE FROM predictions WHERE model_key = ?", (model_key,)).rowcount
+            self.db.execute("DELETE FROM models WHERE model_key = ?", (model_key,))
+        logger.info(f"Evicted {removed} predictions of {model_key}")
+        return removed
+
+    def evict_stale(self, name=None):
+        """Keep only the most recently used version of each model name (or just of `name`)"""
+        stale = self.db.execute(
+            "SELECT model_key FROM models m WHERE (? IS NULL OR name = ?) AND last_used < "
+            "(SELECT MAX(last_used) FROM models n WHERE n.name = m.name)", (name, name)).fetchall()
+        return sum(self.evict(key) for key, in stale)
+
+    def stats(self):
+        """Hits, misses and hit rate per model since the cache was opened (or reset_stats)"""
+        stats = pd.DataFrame([(name, key, hits, misses) for key, (name, hits, misses) in self._stats.items()],
+                             columns=["name", "model_key", "hits", "misses"])
+        stats["hit_rate"] = (stats["hits"] / (stats["hits"] + stats["misses"]).clip(lower=1)).round(3)
+        return stats
+
+    def counts(self, model_key):
+        """(hits, misses) of one model key"""
+        _, hits, misses = self._stats.get(model_key, [None, 0, 0])
+        return hits, misses
+
+    def reset_stats(self):
+        self._stats = {key: [name, 0, 0] for key, (name, _, _) in self._stats.items()}
+
+    def close(self):
+        self.db.close()
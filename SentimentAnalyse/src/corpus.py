@@ -0,0 +1,173 @@
+"""
+Streaming sentiment job for the global post corpus
+
+score_corpus() reads the posts of the Parquet store written by the scraper
+(Scraping/data/global_posts, or a posts CSV) in fixed-size chunks, scores
+every chunk with src.inference.score and writes the result of each chunk as
+its own Parquet part:
+
+    data/sentiment/part-00000.parquet   id, author, <model>, <model>_prob_<label>, ...
+    data/sentiment/_checkpoint.json     source and model fingerprints, max_length, completed chunks
+
+A part is written to a temp file and moved into place before the checkpoint
+is updated, so a killed run resumes after the last completed chunk. A run
+with another source, model checkpoint or max_length refuses to resume
+(--restart starts over). Only one chunk of posts and its results are held in
+memory at a time.
+
+    python -m src.corpus --model GBERT1=gbert_finetuned_twitter --model "GBERT2=gbert_finetuned_twitter&germeval17"
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.cache import model_fingerprint
+from src.inference import BATCH_SIZE, MAX_LENGTH, load_model, score
+
+SOURCE = Path("../Scraping/data/global_posts")
+OUTPUT_DIR = Path("data/sentiment")
+CHUNK_SIZE = 50_000
+KEEP_COLUMNS = ("id", "author")
+
+logger = logging.getLogger(__name__)
+
+
+def _is_csv(source):
+    return Path(source).suffix == ".csv"
+
+
+def _source_files(source):
+    if _is_csv(source):
+        return [Path(source)]
+    return sorted(Path(path) for path in ds.dataset(source, format="parquet", partitioning="hive").files)
+
+
+def source_fingerprint(source):
+    """Hash of the files (path, size, mtime) of `source`; changes with every re-export"""
+    h = hashlib.sha1()
+    for path in _source_files(source):
+        stat = path.stat()
+        h.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def iter_chunks(source, columns, chunk_size=CHUNK_SIZE):
+    """DataFrames of `chunk_size` posts (the last one shorter), in a stable order"""
+    if _is_csv(source):
+        yield from pd.read_csv(source, usecols=list(columns), dtype=str, chunksize=chunk_size)
+        return
+
+    dataset = ds.dataset(source, format="parquet", partitioning="hive")
+    pending, rows = [], 0
+    for batch in dataset.to_batches(columns=list(columns), batch_size=chunk_size):
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size).to_pandas()
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def _write_atomic(path, write):
+    temp_path = path.with_name(f".{path.name}.tmp")
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def _load_checkpoint(output_dir, expected):
+    path = output_dir / "_checkpoint.json"
+    if not path.exists():
+        return 0
+    checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    changed = [key for key in expected if checkpoint.get(key) != expected[key]]
+    if changed:
+        # Resuming would mix results of different models/settings in one output
+        raise ValueError(f"{path} does not match this run ({', '.join(changed)} changed); "
+                         f"score with the same settings or restart (resume=False, --restart)")
+    return checkpoint["completed"]
+
+
+def score_corpus(models, source=SOURCE, output_dir=OUTPUT_DIR, chunk_size=CHUNK_SIZE,
+                 keep=KEEP_COLUMNS, resume=True, **kwargs):
+    """
+    Score every post of `source` chunk by chunk; returns the number of posts scored in this run
+
+    models: {name: (tokenizer, model[, labels])} as for src.inference.score
+    kwargs: batch_size, max_length, cache (see src.inference.score_proba)
+    Raises ValueError when resuming a checkpoint of another source, model or max_length.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    expected = {
+        "source": str(source),
+        "fingerprint": source_fingerprint(source),
+        "models": {name: model_fingerprint(spec[1]) for name, spec in sorted(models.items())},
+        "max_length": kwargs.get("max_length", MAX_LENGTH),
+        "chunk_size": chunk_size,
+    }
+    completed = _load_checkpoint(output_dir, expected) if resume else 0
+    if not completed:
+        for part in output_dir.glob("part-*.parquet"):
+            part.unlink()
+    else:
+        logger.info(f"Resuming after chunk {completed - 1}")
+
+    scored = 0
+    columns = list(dict.fromkeys((*keep, "body")))
+    for number, chunk in enumerate(iter_chunks(source, columns, chunk_size)):
+        if number < completed:
+            continue  # Read (only id/author/body) but not scored again
+        results = score(chunk["body"], models, **kwargs)
+        frame = pd.concat([chunk[list(keep)], results], axis=1)
+        _write_atomic(output_dir / f"part-{number:05d}.parquet", lambda path: frame.to_parquet(path, index=False))
+
+        checkpoint = dict(expected, completed=number + 1)
+        _write_atomic(output_dir / "_checkpoint.json",
+                      lambda path: path.write_text(json.dumps(checkpoint, indent=1), encoding="utf-8"))
+        scored += len(chunk)
+        logger.info(f"Chunk {number}: {len(chunk)} posts ({scored} in this run)")
+    return scored
+
+
+def load_results(output_dir=OUTPUT_DIR, columns=None):
+    """All scored chunks as one DataFrame"""
+    return pd.read_parquet(output_dir, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the global post corpus chunk by chunk")
+    parser.add_argument("--model", action="append", required=True, metavar="NAME=PATH",
+                        help="model to score with, repeatable")
+    parser.add_argument("--source", default=str(SOURCE), help="Parquet store directory or posts CSV")
+    parser.add_argument("--output", default=str(OUTPUT_DIR))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--cache", action="store_true", help="use the prediction cache (src/cache.py)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    models = {name: load_model(path) for name, path in (spec.split("=", 1) for spec in args.model)}
+    cache = None
+    if args.cache:
+        from src.cache import PredictionCache
+        cache = PredictionCache()
+    score_corpus(models, args.source, args.output, args.chunk_size, resume=not args.restart,
+                 batch_size=args.batch_size, max_length=args.max_length, cache=cache)
+    if cache is not None:
+        print(cache.stats().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Distillation of GBERT2 into a small student model
+
+GBERT2 (gbert-base, 12 layers) is the teacher. Its class probabilities over the
+unlabelled posts of the global corpus are the soft labels of a 6 layer German
+DistilBERT student, trained with the temperature-scaled KL divergence of
+Hinton et al. The student has its own tokenizer, the teacher only
+contributes probabilities:
+
+    from src.distill import build_soft_labels, distill, load_soft_labels
+    build_soft_labels()                      # teacher over Scraping/data/global_posts, resumable
+    distill(load_soft_labels(), output_path="gbert_student")
+
+    python -m src.benchmark distilled --student gbert_student   # speedup and F1 change on the gold standard
+"""
+import argparse
+import logging
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from datasets import Dataset
+from transformers import (AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding,
+                          Trainer, TrainingArguments)
+
+from src.corpus import SOURCE, load_results, score_corpus
+from src.inference import LABELS, load_model, predict_proba
+from src.pretokenize import LENGTH_COLUMN, tokenize_dataset
+
+TEACHER_MODEL = "gbert_finetuned_twitter&germeval17"
+STUDENT_MODEL = "distilbert-base-german-cased"
+SOFT_LABELS_DIR = Path("data/distill/soft_labels")
+TEACHER = "teacher"
+PROB_COLUMNS = [f"{TEACHER}_prob_{LABELS[i]}" for i in sorted(LABELS)]
+
+logger = logging.getLogger(__name__)
+
+
+def build_soft_labels(teacher_path=TEACHER_MODEL, source=SOURCE, output_dir=SOFT_LABELS_DIR, **kwargs):
+    """Teacher probabilities of every post (src.corpus job, so it resumes after a crash)"""
+    score_corpus({TEACHER: load_model(teacher_path)}, source, output_dir, keep=("id", "body"), **kwargs)
+    return output_dir
+
+
+def load_soft_labels(output_dir=SOFT_LABELS_DIR, min_chars=3, limit=None, test_size=0.05, seed=0):
+    """train/test DatasetDict of distinct post texts with the teacher probabilities as soft_labels"""
+    frame = load_results(output_dir, columns=["body", *PROB_COLUMNS])
+    frame = frame[frame["body"].str.strip().str.len() >= min_chars].drop_duplicates("body")
+    if limit:
+        frame = frame.sample(n=min(limit, len(frame)), random_state=seed)
+    dataset = Dataset.from_dict({
+        "text": frame["body"].tolist(),
+        "soft_labels": frame[PROB_COLUMNS].to_numpy(np.float32).tolist(),
+    })
+    return dataset.train_test_split(test_size=test_size, seed=seed)
+
+
+class DistillationTrainer(Trainer):
+    """Trainer with the KL divergence to the teacher's temperature-scaled probabilities as loss"""
+
+    def __init__(self, *args, temperature=2.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        teacher_probs = inputs.pop("soft_labels")
+        inputs.pop(LENGTH_COLUMN, None)
+        outputs = model(**inputs)
+        t = self.temperature
+        # softmax(log p / t) == softmax(teacher logits / t)
+        target = torch.softmax(torch.log(teacher_probs.clamp_min(1e-8)) / t, dim=-1)
+        loss = F.kl_div(F.log_softmax(outputs.logits / t, dim=-1), target, reduction="batchmean") * t * t
+        return (loss, outputs) if return_outputs else loss
+
+
+def distill(soft_labels, output_path="gbert_student", student_model=STUDENT_MODEL, max_length=128,
+            batch_size=32, epochs=2, learning_rate=5e-5, temperature=2.0):
+    """Train the student on `soft_labels` (load_soft_labels), save it; returns the teacher agreement on the test split"""
+    tokenizer = AutoTokenizer.from_pretrained(student_model)
+    tokenized = tokenize_dataset(soft_labels, tokenizer, max_length, name="distill")
+    model = AutoModelForSequenceClassification.from_pretrained(
+        student_model, num_labels=len(LABELS), id2label=LABELS, label2id={label: i for i, label in LABELS.items()})
+
+    training_args = TrainingArguments(output_dir=f"{output_path}_training",
+                                      num_train_epochs=epochs,
+                                      learning_rate=learning_rate,
+                                      per_device_train_batch_size=batch_size,
+                                      logging_strategy="no",
+                                      report_to="none",
+                                      save_strategy="no",
+                                      group_by_length=True,
+                                      length_column_name=LENGTH_COLUMN,
+                                      remove_unused_columns=False,  # soft_labels is no model input
+                                      disable_tqdm=False,
+                                      log_level="info")
+    trainer = DistillationTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=tokenized["train"],
+        data_collator=DataCollatorWithPadding(tokenizer=tokenizer, return_tensors="pt"),
+        processing_class=tokenizer,
+        temperature=temperature,
+    )
+    trainer.train()
+    model.save_pretrained(output_path)
+    tokenizer.save_pretrained(output_path)
+
+    test = soft_labels["test"]
+    student = predict_proba(test["text"], model.eval(), tokenizer, max_length=max_length).argmax(axis=1)
+    agreement = float((student == np.asarray(test["soft_labels"]).argmax(axis=1)).mean())
+    logger.info(f"Student saved to {output_path}, agrees with the teacher on {agreement:.1%} of held-out posts")
+    return agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distil GBERT2 into a small student model")
+    parser.add_argument("--teacher", default=TEACHER_MODEL)
+    parser.add_argument("--student", default=STUDENT_MODEL, help="pretrained student checkpoint")
+    parser.add_argument("--source", default=str(SOURCE), help="Parquet store directory or posts CSV")
+    parser.add_argument("--output", default="gbert_student")
+    parser.add_argument("--limit", type=int, default=None, help="number of distinct posts to train on")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    build_soft_labels(args.teacher, args.source)
+    distill(load_soft_labels(limit=args.limit), args.output, args.student,
+            epochs=args.epochs, temperature=args.temperature)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Gold standard evaluation with NumPy
+
+Evaluationsdatensatz-3.xlsx holds the 2,000 annotated posts, the agreed label
+of both annotators is in ÜBEREINSTIMUNGEN (0 positive, 1 negative, 2 neutral,
+the same ids as the GBERT fine-tunes). The first 1,001 posts were annotated by
+annotators 1 and 2, posts 1002-1999 by annotators 3 and 4, both pairs in the
+columns annotator_1/annotator_2 (ANNOTATOR_GROUPS, the ranges of
+Evaluation_with_Goldstandard.ipynb).
+
+Labels are encoded to integer codes once; confusion matrices of any number of
+models come from one bincount, and every metric is computed from the
+confusion matrices over arbitrary leading axes. Bootstrap resamples are
+multinomial weight matrices, so thousands of resamples are one matrix product
+instead of a Python loop:
+
+    from src.evaluation import evaluate_models, annotator_agreement
+    evaluate_models(frame["gold"], frame[["GBERT1", "GBERT2"]], n_resamples=2000)
+    annotator_agreement(load_annotations())
+"""
+import numpy as np
+import pandas as pd
+
+from src.labels import LABELS, clean_texts
+
+EVALUATION_DATA = "Evaluationsdatensatz-3.xlsx"
+GOLD_COLUMN = "ÜBEREINSTIMUNGEN"
+ANNOTATOR_COLUMNS = ["annotator_1", "annotator_2"]
+ANNOTATOR_GROUPS = {"annotators 1 and 2": (0, 1001), "annotators 3 and 4": (1002, 2000)}
+CLASSES = sorted(LABELS.values())  # negative, neutral, positive
+BOOTSTRAP_BLOCK = 500  # Resamples per matrix product, bounds memory
+
+
+def load_gold_standard(path=EVALUATION_DATA):
+    """id, body and gold label ("positive"/"negative"/"neutral") of every annotated post"""
+    frame = pd.read_excel(path, usecols=["id", "body", GOLD_COLUMN])
+    frame = frame.dropna(subset=[GOLD_COLUMN])
+    return pd.DataFrame({
+        "id": frame["id"],
+        "body": clean_texts(frame["body"]),
+        "gold": frame[GOLD_COLUMN].astype(int).map(LABELS),
+    })
+
+
+def load_annotations(path=EVALUATION_DATA):
+    """annotator_1/annotator_2 labels ("positive"/...) of every post, missing ratings as None"""
+    frame = pd.read_excel(path, usecols=ANNOTATOR_COLUMNS)
+    return frame.apply(lambda column: column.map(lambda value: None if pd.isna(value) else LABELS[int(value)]))
+
+
+def encode(labels, classes=CLASSES):
+    """Integer codes of `labels` (1-d or 2-d), -1 for missing or unknown labels"""
+    labels = np.asarray(labels, dtype=object)
+    return pd.Categorical(labels.ravel(), categories=classes).codes.astype(np.int64).reshape(labels.shape)
+
+
+def confusion_matrices(gold, predictions, n_classes=len(CLASSES)):
+    """(models, gold, predicted) counts from integer codes; rows with a missing code are left out"""
+    predictions = np.atleast_2d(predictions)
+    valid = (gold >= 0) & (predictions >= 0)
+    model = np.broadcast_to(np.arange(len(predictions))[:, None], predictions.shape)
+    index = (model * n_classes + gold) * n_classes + predictions
+    counts = np.bincount(index[valid], minlength=len(predictions) * n_classes * n_classes)
+    return counts.reshape(len(predictions), n_classes, n_classes)
+
+
+def _divide(a, b):
+    return np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b > 0)
+
+
+def metrics(confusion):
+    """Accuracy and macro precision/recall/F1 over the last two axes of `confusion`"""
+    confusion = np.asarray(confusion, dtype=float)
+    true_positive = np.diagonal(confusion, axis1=-2, axis2=-1)
+    predicted = confusion.sum(axis=-2)
+    actual = confusion.sum(axis=-1)
+    precision = _divide(true_positive, predicted)
+    recall = _divide(true_positive, actual)
+    f1 = _divide(2 * precision * recall, precision + recall)
+    return {
+        "accuracy": _divide(true_positive.sum(axis=-1), actual.sum(axis=-1)),
+        "macro_precision": precision.mean(axis=-1),
+        "macro_recall": recall.mean(axis=-1),
+        "macro_f1": f1.mean(axis=-1),
+    }
+
+
+def per_class_f1(confusion, classes=CLASSES):
+    confusion = np.asarray(confusion, dtype=float)
+    true_positive = np.diagonal(confusion, axis1=-2, axis2=-1)
+    return _divide(2 * true_positive, confusion.sum(axis=-2) + confusion.sum(axis=-1))
+
+
+def scores(gold, predicted):
+    """Accuracy and macro F1 of one model's predicted labels"""
+    result = metrics(confusion_matrices(encode(gold), encode(predicted))[0])
+    return {"accuracy": float(result["accuracy"]), "macro_f1": float(result["macro_f1"])}
+
+
+def bootstrap_weights(n, n_resamples, rng):
+    """(n_resamples, n) how often each row is drawn in each resample"""
+    return rng.multinomial(n, np.full(n, 1 / n), size=n_resamples).astype(np.float32)
+
+
+def _bootstrap(n, statistic_of_weights, n_resamples, seed):
+    """Stack statistic_of_weights(weights) over blocks of resamples"""
+    rng = np.random.default_rng(seed)
+    blocks = []
+    for start in range(0, n_resamples, BOOTSTRAP_BLOCK):
+        blocks.append(statistic_of_weights(bootstrap_weights(n, min(BOOTSTRAP_BLOCK, n_resamples - start), rng)))
+    return {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]}
+
+
+def bootstrap_metrics(gold, predictions, n_resamples=2000, seed=0, n_classes=len(CLASSES)):
+    """{metric: (n_resamples, models)} from resampled posts (integer codes)"""
+    predictions = np.atleast_2d(predictions)
+    valid = (gold >= 0) & (predictions >= 0)
+    cell = np.where(valid, gold * n_classes + predictions, 0)
+    # One-hot cell of every (post, model): (posts, models * k * k)
+    onehot = np.zeros((predictions.shape[1], len(predictions), n_classes * n_classes), dtype=np.float32)
+    posts, models = np.nonzero(valid.T)
+    onehot[posts, models, cell.T[posts, models]] = 1
+    onehot = onehot.reshape(predictions.shape[1], -1)
+
+    def statistic(weights):
+        confusion = (weights @ onehot).reshape(len(weights), len(predictions), n_classes, n_classes)
+        return metrics(confusion)
+
+    return _bootstrap(predictions.shape[1], statistic, n_resamples, seed)
+
+
+def _interval(samples, ci):
+    low, high = np.nanquantile(samples, [(1 - ci) / 2, 1 - (1 - ci) / 2], axis=0)
+    return low, high
+
+
+def evaluate_models(gold, predictions, n_resamples=2000, ci=0.95, seed=0):
+    """
+    Accuracy and macro precision/recall/F1 per model with bootstrap confidence intervals
+
+    gold: labels; predictions: DataFrame with one label column per model
+    """
+    names = list(predictions.columns)
+    gold_codes = encode(gold)
+    codes = encode(predictions.to_numpy().T)
+    estimates = metrics(confusion_matrices(gold_codes, codes))
+    samples = bootstrap_metrics(gold_codes, codes, n_resamples, seed) if n_resamples else {}
+
+    rows = []
+    for metric, values in estimates.items():
+        low, high = _interval(samples[metric], ci) if samples else (np.full(len(names), np.nan),) * 2
+        for i, name in enumerate(names):
+            rows.append({"model": name, "metric": metric, "estimate": values[i], "low": low[i], "high": high[i]})
+    return pd.DataFrame(rows).set_index(["model", "metric"]).sort_index()
+
+
+def classification_report(gold, predictions):
+    """Per-class F1 and the macro metrics of every model as one table"""
+    codes = encode(predictions.to_numpy().T)
+    confusion = confusion_matrices(encode(gold), codes)
+    report = pd.DataFrame(per_class_f1(confusion), index=predictions.columns,
+                          columns=[f"f1_{label}" for label in CLASSES])
+    for metric, values in metrics(confusion).items():
+        report[metric] = values
+    report["support"] = confusion.sum(axis=(1, 2))
+    return report
+
+
+def _unit_counts(ratings, n_classes):
+    """Per unit: category counts (units, k) of the pairable units (at least two ratings)"""
+    ratings = np.atleast_2d(ratings)
+    counts = np.stack([(ratings == c).sum(axis=0) for c in range(n_classes)], axis=-1)
+    pairable = counts.sum(axis=-1) >= 2
+    return counts[pairable].astype(np.float64)
+
+
+def _alpha_from_sums(n, agreement, category_totals):
+    """Nominal alpha from total pairable values, observed coincidences on the diagonal and n_c"""
+    observed = 1 - agreement / n
+    expected = 1 - ((category_totals ** 2).sum(axis=-1) - n) / (n * (n - 1))
+    return 1 - observed / expected
+
+
+def krippendorff_alpha(ratings, n_classes=len(CLASSES)):
+    """Nominal Krippendorff's alpha of (coders, units) integer codes, -1 for missing"""
+    counts = _unit_counts(ratings, n_classes)
+    values = counts.sum(axis=-1)
+    agreement = ((counts ** 2).sum(axis=-1) - values) / (values - 1)
+    return float(_alpha_from_sums(values.sum(), agreement.sum(), counts.sum(axis=0)))
+
+
+def bootstrap_alpha(ratings, n_resamples=2000, seed=0, n_classes=len(CLASSES)):
+    """(n_resamples,) alpha over resampled units"""
+    counts = _unit_counts(ratings, n_classes)
+    values = counts.sum(axis=-1)
+    agreement = ((counts ** 2).sum(axis=-1) - values) / (values - 1)
+    per_unit = np.column_stack([values, agreement, counts])
+
+    def statistic(weights):
+        sums = weights.astype(np.float64) @ per_unit
+        return {"alpha": _alpha_from_sums(sums[:, 0], sums[:, 1], sums[:, 2:])}
+
+    return _bootstrap(len(per_unit), statistic, n_resamples, seed)["alpha"]
+
+
+def annotator_agreement(annotations, groups=ANNOTATOR_GROUPS, columns=ANNOTATOR_COLUMNS,
+                        n_resamples=2000, ci=0.95, seed=0):
+    """
+    Krippendorff's alpha (nominal) with bootstrap interval per annotator group
+
+    groups: {name: (first row, end row)} of `annotations` rated by the same coders
+    """
+    rows = []
+    for name, (start, end) in groups.items():
+        ratings = encode(annotations[columns].iloc[start:end].to_numpy().T)
+        samples = bootstrap_alpha(ratings, n_resamples, seed) if n_resamples else np.array([np.nan])
+        low, high = _interval(samples, ci)
+        rows.append({"group": name, "units": ratings.shape[1], "alpha": krippendorff_alpha(ratings),
+                     "low": low, "high": high})
+    return pd.DataFrame(rows).set_index("group")
@@ -0,0 +1,205 @@
+"""
+Batched sentiment inference for the fine-tuned GBERT models
+
+predict_sentiment() in Classification_of_evaluation_texts.ipynb ran one
+tokenizer call and one forward pass per post. predict() tokenizes a whole
+chunk of posts without padding, sorts it by token length and runs batches
+that are only padded to the longest post in the batch, under
+torch.inference_mode. Results come back in input order, with the label and
+one probability column per class.
+
+    from src.inference import load_model, predict
+    tokenizer, model = load_model("gbert_finetuned_twitter&germeval17")
+    results = predict(dataframe_posts["body"], model, tokenizer, name="GBERT2")
+
+score() does the same for several models in one pass over the posts. Models
+are grouped by a fingerprint of their tokenizer, every chunk is tokenized
+once per group (GBERT1 and GBERT2 share the deepset/gbert-base vocabulary)
+and each padded batch is fed to all models of the group:
+
+    results = score(dataframe_posts["body"], {
+        "GBERT1": load_model("gbert_finetuned_twitter"),
+        "GBERT2": load_model("gbert_finetuned_twitter&germeval17"),
+    })
+
+Passing cache=PredictionCache() (src/cache.py) skips posts already scored by
+the same model version in an earlier run.
+"""
+import hashlib
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from src.labels import LABELS, clean_texts
+
+MAX_LENGTH = 128
+BATCH_SIZE = 32
+CHUNK_SIZE = 8192  # Posts tokenized at once, bounds memory for large corpora
+
+logger = logging.getLogger(__name__)
+
+
+def load_model(path, device=None):
+    """Tokenizer and model from a saved checkpoint, in eval mode"""
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    model = AutoModelForSequenceClassification.from_pretrained(path)
+    model.to(device or "cpu").eval()
+    return tokenizer, model
+
+
+def tokenizer_fingerprint(tokenizer):
+    """Hash that is equal for tokenizers producing the same input ids"""
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        # Vocabulary plus normalizer/pre-tokenizer/post-processor settings
+        config = backend.to_str()
+    else:
+        config = json.dumps(sorted(tokenizer.get_vocab().items()), ensure_ascii=False)
+    special = json.dumps([type(tokenizer).__name__, tokenizer.all_special_tokens, tokenizer.padding_side])
+    return hashlib.sha1((config + special).encode("utf-8")).hexdigest()
+
+
+def group_by_tokenizer(models):
+    """
+    [(tokenizer, [(name, model, labels), ...]), ...] with one entry per distinct tokenizer
+
+    models: {name: (tokenizer, model)} or {name: (tokenizer, model, labels)},
+    labels defaults to LABELS
+    """
+    groups = {}
+    for name, (tokenizer, model, *labels) in models.items():
+        fingerprint = tokenizer_fingerprint(tokenizer)
+        groups.setdefault(fingerprint, (tokenizer, []))[1].append((name, model, labels[0] if labels else LABELS))
+    return list(groups.values())
+
+
+def encode(tokenizer, texts, max_length=MAX_LENGTH):
+    """Token ids of every text, truncated but not padded"""
+    return tokenizer(texts, truncation=True, max_length=max_length)
+
+
+def length_batches(lengths, batch_size=BATCH_SIZE):
+    """Index arrays of texts with similar lengths, longest batch first"""
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def pad_batch(tokenizer, encoding, idx):
+    """Tensors for the texts `idx`, padded to the longest of them"""
+    features = [{key: encoding[key][i] for key in encoding.keys()} for i in idx]
+    return tokenizer.pad(features, return_tensors="pt")
+
+
+def _softmax(model, batch):
+    device = next(model.parameters()).device
+    logits = model(**{key: value.to(device) for key, value in batch.items()}).logits
+    return torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+
+def _cached(cache, keys, members, hashes, probs, start):
+    """Fill in cached results of the chunk; returns the chunk positions still to score"""
+    missing = np.zeros(len(hashes), dtype=bool)
+    for name, _, _ in members:
+        found = cache.get(keys[name], hashes)
+        hit = np.array([text_hash in found for text_hash in hashes], dtype=bool)
+        if hit.any():
+            probs[name][start + np.flatnonzero(hit)] = [found[hashes[i]] for i in np.flatnonzero(hit)]
+        missing |= ~hit
+    return np.flatnonzero(missing)
+
+
+def score_proba(texts, models, batch_size=BATCH_SIZE, max_length=MAX_LENGTH, chunk_size=CHUNK_SIZE,
+                cache=None):
+    """
+    {name: (len(texts), num_labels) class probabilities in input order} (see group_by_tokenizer)
+
+    With a src.cache.PredictionCache only posts without a cached result of a
+    model are scored (texts are whitespace-normalized for scoring and lookup).
+    """
+    texts = clean_texts(texts)
+    groups = group_by_tokenizer(models)
+    probs = {name: np.empty((len(texts), model.config.num_labels), dtype=np.float32)
+             for _, members in groups for name, model, _ in members}
+    if cache is not None:
+        from src.cache import normalize_text, text_hash
+        texts = [normalize_text(text) for text in texts]
+        keys = {name: cache.model_key(name, model, max_length) for _, members in groups for name, model, _ in members}
+
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts[start:start + chunk_size]
+        hashes = [text_hash(text) for text in chunk] if cache is not None else None
+        for tokenizer, members in groups:
+            todo = np.arange(len(chunk))
+            if cache is not None:
+                todo = _cached(cache, keys, members, hashes, probs, start)
+                if not len(todo):
+                    continue
+            encoding = encode(tokenizer, [chunk[i] for i in todo], max_length)
+            lengths = [len(ids) for ids in encoding["input_ids"]]
+            with torch.inference_mode():
+                for idx in length_batches(lengths, batch_size):
+                    batch = pad_batch(tokenizer, encoding, idx)
+                    for name, model, _ in members:
+                        probs[name][start + todo[idx]] = _softmax(model, batch)
+            if cache is not None:
+                for name, _, _ in members:
+                    cache.put(keys[name], [hashes[i] for i in todo], probs[name][start + todo])
+
+    if cache is not None:
+        for name, key in keys.items():
+            hits, misses = cache.counts(key)
+            logger.info(f"{name}: {hits} cached, {misses} scored (hit rate {hits / max(hits + misses, 1):.1%})")
+    return probs
+
+
+def predict_proba(texts, model, tokenizer, name="model", **kwargs):
+    """(len(texts), num_labels) class probabilities of one model in input order"""
+    return score_proba(texts, {name: (tokenizer, model)}, **kwargs)[name]
+
+
+def to_frame(probs, name="label", labels=LABELS, index=None):
+    """
+    Label column `name` plus one `<name>_prob_<label>` column per label
+
+    Class ids mapped to the same label (e.g. "negative" and "very negative" of a
+    5-class model both to "negative") share one column with their summed
+    probability, the label column is the label of the most likely class id.
+    """
+    columns = {}
+    for i in range(probs.shape[1]):
+        column = f"{name}_prob_{labels[i]}"
+        columns[column] = columns[column] + probs[:, i] if column in columns else probs[:, i]
+    frame = pd.DataFrame(columns, index=index)
+    frame.insert(0, name, [labels[i] for i in probs.argmax(axis=1)])
+    return frame
+
+
+def predict(texts, model, tokenizer, name="label", labels=LABELS, **kwargs):
+    """
+    Sentiment of every text as a DataFrame (same index as `texts` if it is a Series)
+
+    kwargs: batch_size, max_length, chunk_size, cache (see score_proba)
+    """
+    index = texts.index if isinstance(texts, pd.Series) else None
+    probs = predict_proba(list(texts), model, tokenizer, name=name, **kwargs)
+    return to_frame(probs, name, labels, index)
+
+
+def score(texts, models, **kwargs):
+    """
+    Label and probability columns of every model, in one pass over `texts`
+
+    models: {name: (tokenizer, model)} or {name: (tokenizer, model, labels)}
+    kwargs: batch_size, max_length, chunk_size, cache (see score_proba)
+    """
+    index = texts.index if isinstance(texts, pd.Series) else None
+    probs = score_proba(list(texts), models, **kwargs)
+    return pd.concat(
+        [to_frame(probs[name], name, spec[2] if len(spec) > 2 else LABELS, index)
+         for name, spec in models.items()],
+        axis=1,
+    )
@@ -0,0 +1,17 @@
+"""
+Label ids and text cleaning shared by inference and evaluation
+
+Kept free of torch/transformers, so the evaluation of saved predictions
+(src.evaluation, Evaluation_with_Goldstandard.ipynb) only needs pandas and
+NumPy.
+"""
+import numpy as np
+
+# Label ids of the GBERT1/GBERT2 fine-tunes
+LABELS = {0: "positive", 1: "negative", 2: "neutral"}
+
+
+def clean_texts(texts):
+    """Posts as a list of strings (missing captions become empty strings)"""
+    return ["" if text is None or (isinstance(text, float) and np.isnan(text)) else str(text)
+            for text in texts]
@@ -0,0 +1,153 @@
+"""
+Leaderboard of sentiment models: quality and cost in one table
+
+Every model is an entry of REGISTRY with its loader and the mapping of its
+class ids to positive/negative/neutral. run_leaderboard() scores each model
+on the Twitter test split (357 posts) and on the gold standard and reports
+accuracy, macro F1, load time, single-post latency percentiles, batched
+posts/sec and peak RSS. Each model runs in its own process, so load time and
+peak memory are not skewed by the models before it.
+
+    python -m src.leaderboard
+    python -m src.leaderboard --models GBERT2 XLM-RoBERTa --datasets gold
+
+New models only need a registry entry:
+
+    REGISTRY["my-model"] = {"type": "transformers", "path": "org/model",
+                            "labels": {0: "negative", 1: "neutral", 2: "positive"}}
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.evaluation import EVALUATION_DATA, load_gold_standard, scores
+from src.labels import LABELS
+
+BATCH_SIZE = 32  # src.inference.BATCH_SIZE; src.inference needs torch, loaders import it lazily
+TWITTER_DATASET = "Alienmaster/german_politicians_twitter_sentiment"
+TWITTER_LABELS = {1: "positive", 2: "negative", 3: "neutral"}
+
+REGISTRY = {
+    "GBERT1": {"type": "transformers", "path": "gbert_finetuned_twitter", "labels": LABELS, "max_length": 512},
+    "GBERT2": {"type": "transformers", "path": "gbert_finetuned_twitter&germeval17", "labels": LABELS,
+               "max_length": 128},
+    "Multilingual": {"type": "transformers", "path": "tabularisai/multilingual-sentiment-analysis",
+                     "labels": {0: "negative", 1: "negative", 2: "neutral", 3: "positive", 4: "positive"},
+                     "max_length": 512},
+    "German-Sentiment-Bert": {"type": "germansentiment", "path": "oliverguhr/german-sentiment-bert"},
+    "XLM-RoBERTa": {"type": "transformers", "path": "ssary/XLM-RoBERTa-German-sentiment",
+                    "labels": {0: "negative", 1: "neutral", 2: "positive"}, "max_length": 512},
+}
+
+
+def load_predictor(entry):
+    """Function mapping a list of texts to labels ("positive"/"negative"/"neutral")"""
+    if entry["type"] == "transformers":
+        from src.inference import load_model, predict_proba
+
+        tokenizer, model = load_model(entry["path"])
+        labels = entry["labels"]
+
+        def predict(texts, batch_size=BATCH_SIZE):
+            probs = predict_proba(texts, model, tokenizer, batch_size=batch_size,
+                                  max_length=entry.get("max_length", 512))
+            return [labels[i] for i in probs.argmax(axis=1)]
+        return predict
+
+    if entry["type"] == "germansentiment":
+        from germansentiment import SentimentModel
+
+        model = SentimentModel(entry["path"])
+
+        def predict(texts, batch_size=BATCH_SIZE):
+            texts = list(texts)
+            return [label for start in range(0, len(texts), batch_size)
+                    for label in model.predict_sentiment(texts[start:start + batch_size])]
+        return predict
+
+    raise ValueError(f"Unknown model type {entry['type']!r}")
+
+
+def load_datasets(names=("twitter", "gold"), gold_path=EVALUATION_DATA):
+    """{name: (texts, gold labels)}"""
+    datasets = {}
+    if "twitter" in names:
+        from datasets import load_dataset
+
+        test = load_dataset(TWITTER_DATASET)["test"]
+        datasets["twitter"] = ([str(text) for text in test["text"]],
+                               [TWITTER_LABELS[label] for label in test["majority_sentiment"]])
+    if "gold" in names:
+        gold = load_gold_standard(gold_path)
+        datasets["gold"] = (gold["body"].tolist(), gold["gold"].tolist())
+    return datasets
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+
+
+def evaluate_entry(name, entry, datasets, latency_sample=100, batch_size=BATCH_SIZE):
+    """Leaderboard rows of one model (one per dataset)"""
+    started = time.perf_counter()
+    predict = load_predictor(entry)
+    load_seconds = time.perf_counter() - started
+
+    rows = []
+    for dataset, (texts, gold) in datasets.items():
+        predict(texts[:batch_size], batch_size)  # Warm-up
+
+        latencies = []
+        for text in texts[:latency_sample]:
+            started = time.perf_counter()
+            predict([text], 1)
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        predicted = predict(texts, batch_size)
+        seconds = time.perf_counter() - started
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        rows.append({"model": name, "dataset": dataset, **scores(gold, predicted), "load_s": load_seconds,
+                     "latency_p50_ms": p50, "latency_p95_ms": p95, "latency_p99_ms": p99,
+                     "posts_per_sec": len(texts) / seconds, "peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+def run_leaderboard(models=None, datasets=("twitter", "gold"), latency_sample=100, batch_size=BATCH_SIZE,
+                    isolate=True, registry=REGISTRY):
+    """One row per model and dataset, sorted by macro F1 within each dataset"""
+    data = load_datasets(datasets)
+    rows = []
+    for name in models or registry:
+        if isolate:
+            # Fresh process per model: clean load time and peak RSS
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                rows += executor.submit(evaluate_entry, name, registry[name], data, latency_sample,
+                                        batch_size).result()
+        else:
+            rows += evaluate_entry(name, registry[name], data, latency_sample, batch_size)
+
+    results = pd.DataFrame(rows).sort_values(["dataset", "macro_f1"], ascending=[True, False])
+    return results.set_index(["dataset", "model"]).round(4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy, latency, throughput and memory of the sentiment models")
+    parser.add_argument("--models", nargs="+", default=None, choices=list(REGISTRY))
+    parser.add_argument("--datasets", nargs="+", default=["twitter", "gold"], choices=["twitter", "gold"])
+    parser.add_argument("--latency-sample", type=int, default=100, help="posts scored one at a time")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-isolate", action="store_true", help="run all models in this process")
+    args = parser.parse_args()
+    print(run_leaderboard(args.models, args.datasets, args.latency_sample, args.batch_size,
+                          isolate=not args.no_isolate).to_string())
+
+
+if __name__ == "__main__":
+    main()
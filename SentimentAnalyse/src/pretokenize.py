@@ -0,0 +1,90 @@
+"""
+Pre-tokenized training data for the fine-tuning notebooks
+
+tokenize_dataset() tokenizes the splits once per (dataset, tokenizer,
+max_length) and saves them as Arrow datasets under data/tokenized/; later
+sessions load them from disk instead of re-running the tokenizer. Posts are
+truncated but not padded and get a `length` column, so DataCollatorWithPadding
+pads every batch only to its longest post and TrainingArguments(group_by_length=True)
+puts posts of similar length into the same batch without measuring them again.
+
+    from src.pretokenize import tokenize_dataset
+    tokenized = tokenize_dataset(DatasetDict({"train": train_data, "test": test_data}),
+                                 tokenizer, max_length=512, name="twitter")
+
+padding_efficiency() shows how much of a batch is real tokens for fixed
+max_length padding, dynamic padding and length-grouped dynamic padding.
+"""
+import hashlib
+import shutil
+from pathlib import Path
+
+import numpy as np
+from datasets import DatasetDict, load_from_disk
+
+from src.inference import tokenizer_fingerprint
+
+TOKENIZED_DIR = Path("data/tokenized")
+LENGTH_COLUMN = "length"
+
+
+def dataset_fingerprint(dataset):
+    """Fingerprint of a Dataset or of all splits of a DatasetDict"""
+    if isinstance(dataset, DatasetDict):
+        return ";".join(f"{split}:{dataset[split]._fingerprint}" for split in sorted(dataset))
+    return dataset._fingerprint
+
+
+def cache_path(dataset, tokenizer, max_length, name, cache_dir=TOKENIZED_DIR):
+    key = hashlib.sha1(
+        f"{dataset_fingerprint(dataset)}|{tokenizer_fingerprint(tokenizer)}|{max_length}".encode("utf-8")
+    ).hexdigest()[:12]
+    return Path(cache_dir) / f"{name}-{max_length}-{key}"
+
+
+def tokenize_dataset(dataset, tokenizer, max_length, name="dataset", text_column="text",
+                     cache_dir=TOKENIZED_DIR):
+    """Dataset(Dict) with unpadded input_ids, attention_mask, ... and `length`; cached on disk"""
+    path = cache_path(dataset, tokenizer, max_length, name, cache_dir)
+    if path.exists():
+        return load_from_disk(str(path))
+
+    def tokenize(batch):
+        encoding = tokenizer([str(text) for text in batch[text_column]], truncation=True, max_length=max_length)
+        encoding[LENGTH_COLUMN] = [len(ids) for ids in encoding["input_ids"]]
+        return encoding
+
+    tokenized = dataset.map(tokenize, batched=True, remove_columns=[text_column])
+
+    temp_path = path.with_name(f".{path.name}.tmp")
+    shutil.rmtree(temp_path, ignore_errors=True)
+    tokenized.save_to_disk(str(temp_path))
+    temp_path.rename(path)
+    return load_from_disk(str(path))
+
+
+def padding_efficiency(lengths, batch_size, max_length, seed=0):
+    """
+    Share of real (non-padding) tokens per strategy
+
+    fixed: every post padded to max_length (padding="max_length")
+    dynamic: random batches padded to their longest post (DataCollatorWithPadding)
+    grouped: like dynamic, but sorted by length within mega-batches of 50 batches,
+             like the LengthGroupedSampler of group_by_length=True
+    """
+    lengths = np.minimum(np.asarray(lengths), max_length)
+    real = lengths.sum()
+
+    def padded(order):
+        batches = [lengths[order[i:i + batch_size]] for i in range(0, len(order), batch_size)]
+        return sum(batch.max() * len(batch) for batch in batches)
+
+    shuffled = np.random.default_rng(seed).permutation(len(lengths))
+    mega = batch_size * 50
+    grouped = np.concatenate([chunk[np.argsort(-lengths[chunk], kind="stable")]
+                              for chunk in np.array_split(shuffled, max(1, -(-len(shuffled) // mega)))])
+    return {
+        "fixed": float(real / (len(lengths) * max_length)),
+        "dynamic": float(real / padded(shuffled)),
+        "grouped": float(real / padded(grouped)),
+    }
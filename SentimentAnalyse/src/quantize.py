@@ -0,0 +1,61 @@
+"""
+int8 CPU variant of the fine-tuned GBERT models
+
+quantize() replaces every nn.Linear of a checkpoint by a dynamically
+quantized int8 Linear (weights stored as int8, activations quantized per
+batch at runtime), which is where almost all of BERT's CPU time goes.
+Embeddings and LayerNorms stay fp32. export_quantized() stores the quantized
+weights next to the config and tokenizer, load_quantized() rebuilds the model
+from them; the result works with src.inference like the fp32 model.
+
+    python -m src.quantize gbert_finetuned_twitter gbert_finetuned_twitter_int8
+    python -m src.benchmark quantized --model gbert_finetuned_twitter --quantized gbert_finetuned_twitter_int8
+"""
+import argparse
+from pathlib import Path
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from src.inference import load_model
+
+QUANTIZED_WEIGHTS = "quantized_int8.pt"
+
+
+def quantize(model):
+    """Copy of `model` with int8 dynamically quantized Linear layers"""
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_quantized(model_path, output_path):
+    """Quantize a saved checkpoint and write it to `output_path`"""
+    tokenizer, model = load_model(model_path)
+    output_path = Path(output_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    model.config.save_pretrained(output_path)
+    tokenizer.save_pretrained(output_path)
+    torch.save(quantize(model).state_dict(), output_path / QUANTIZED_WEIGHTS)
+    return output_path
+
+
+def load_quantized(path):
+    """Tokenizer and int8 model exported by export_quantized()"""
+    path = Path(path)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    model = quantize(AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(path)))
+    # Own export, the packed int8 params are not plain tensors
+    model.load_state_dict(torch.load(path / QUANTIZED_WEIGHTS, weights_only=False))
+    model.name_or_path = str(path)
+    return tokenizer, model.eval()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an int8 dynamically quantized copy of a checkpoint")
+    parser.add_argument("model", help="path of a fine-tuned checkpoint")
+    parser.add_argument("output", help="directory for the quantized model")
+    args = parser.parse_args()
+    print(export_quantized(args.model, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Length-aware fine-tuning of gbert-base
+
+The fine-tuning notebooks as functions, with the sequence-length knobs
+exposed:
+
+- max_length="auto" picks the smallest multiple of 8 that covers 99% of the
+  training posts (choose_max_length) instead of a fixed 512/128
+- padding="longest" pads each batch to its longest post, "max_length" pads
+  every post to max_length like GBERT1 did
+- group_by_length puts posts of similar length into the same batch
+- gradient_accumulation_steps keeps the effective batch size when the
+  per-device batch has to shrink
+
+    from src.training import fine_tune, load_training_data
+    trainer, result = fine_tune(load_training_data("twitter"), {"max_length": "auto", "batch_size": 8})
+
+src.benchmark training compares several configurations (samples/sec, test F1,
+gold standard F1).
+"""
+import numpy as np
+from datasets import DatasetDict, concatenate_datasets, load_dataset
+from transformers import (AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding,
+                          Trainer, TrainingArguments)
+
+from src.evaluation import confusion_matrices, metrics
+from src.pretokenize import LENGTH_COLUMN, tokenize_dataset
+
+BASE_MODEL = "deepset/gbert-base"
+MAX_POSITIONS = 512
+
+# Label ids of the fine-tunes: 0 positive, 1 negative, 2 neutral
+TWITTER_LABELS = {1: 0, 2: 1, 3: 2}
+GERMEVAL_LABELS = {"negative": 1, "neutral": 2, "positive": 0}
+
+DEFAULT_CONFIG = {
+    "max_length": MAX_POSITIONS,  # int or "auto"
+    "padding": "longest",  # "longest" (dynamic) or "max_length"
+    "group_by_length": True,
+    "batch_size": 8,
+    "gradient_accumulation_steps": 1,
+    "epochs": 4,
+    "learning_rate": 2e-5,
+    "length_quantile": 0.99,
+}
+
+
+def load_training_data(name="twitter"):
+    """train/test DatasetDict with text and label: "twitter" (GBERT1) or "twitter_germeval17" (GBERT2)"""
+    twitter = load_dataset("Alienmaster/german_politicians_twitter_sentiment")
+    twitter = twitter.map(lambda x: {"label": TWITTER_LABELS[x["majority_sentiment"]]})
+    twitter = twitter.remove_columns(["ID", "majority_sentiment"])
+    if name == "twitter":
+        return twitter
+    if name != "twitter_germeval17":
+        raise ValueError(f"Unknown training data {name!r}")
+
+    germeval = load_dataset("akash418/germeval_2017")
+    germeval = germeval.map(lambda x: {"label": GERMEVAL_LABELS[x["sentiment"]]})
+    germeval = germeval.remove_columns(["id", "relevance", "sentiment"])
+    return DatasetDict({split: concatenate_datasets([twitter[split], germeval[split]]) for split in ["train", "test"]})
+
+
+def choose_max_length(lengths, quantile=0.99, multiple=8, limit=MAX_POSITIONS):
+    """Smallest multiple of `multiple` covering `quantile` of the token lengths, at most `limit`"""
+    covered = np.quantile(np.asarray(lengths), quantile)
+    return int(min(limit, multiple * np.ceil(covered / multiple)))
+
+
+def compute_metrics(pred):
+    preds = pred.predictions.argmax(-1)
+    result = metrics(confusion_matrices(pred.label_ids, preds, n_classes=pred.predictions.shape[-1])[0])
+    return {
+        "precision": float(result["macro_precision"]),
+        "recall": float(result["macro_recall"]),
+        "acc": float(result["accuracy"]),
+        "f1": float(result["macro_f1"]),
+    }
+
+
+def prepare(dataset, tokenizer, config, name="dataset"):
+    """Tokenized dataset and the max_length actually used"""
+    max_length = config["max_length"]
+    if max_length == "auto":
+        # Length distribution up to the model limit decides the cutoff
+        full = tokenize_dataset(dataset, tokenizer, MAX_POSITIONS, name)
+        max_length = choose_max_length(full["train"][LENGTH_COLUMN], config["length_quantile"])
+    return tokenize_dataset(dataset, tokenizer, max_length, name), max_length
+
+
+def fine_tune(dataset, config=None, output_dir="gbert-finetuned", name="dataset", base_model=BASE_MODEL):
+    """
+    Train on dataset["train"], evaluate on dataset["test"]; returns (trainer, result dict)
+
+    config: keys of DEFAULT_CONFIG to change
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    tokenizer = AutoTokenizer.from_pretrained(base_model)
+    tokenized, max_length = prepare(dataset, tokenizer, config, name)
+    model = AutoModelForSequenceClassification.from_pretrained(base_model, num_labels=3)
+
+    if config["padding"] == "max_length":
+        data_collator = DataCollatorWithPadding(tokenizer, padding="max_length", max_length=max_length)
+    else:
+        data_collator = DataCollatorWithPadding(tokenizer=tokenizer, return_tensors="pt")
+
+    training_args = TrainingArguments(output_dir=output_dir,
+                                      num_train_epochs=config["epochs"],
+                                      learning_rate=config["learning_rate"],
+                                      logging_strategy="no",
+                                      report_to="none",
+                                      save_strategy="no",
+                                      per_device_train_batch_size=config["batch_size"],
+                                      per_device_eval_batch_size=config["batch_size"],
+                                      gradient_accumulation_steps=config["gradient_accumulation_steps"],
+                                      group_by_length=config["group_by_length"],
+                                      length_column_name=LENGTH_COLUMN,
+                                      disable_tqdm=False,
+                                      log_level="info")
+    trainer = Trainer(
+        model=model,
+        args=training_args,
+        compute_metrics=compute_metrics,
+        train_dataset=tokenized["train"],
+        data_collator=data_collator,
+        processing_class=tokenizer,
+    )
+    train_output = trainer.train()
+    evaluation = trainer.evaluate(tokenized["test"])
+    result = {
+        **config,
+        "max_length": max_length,
+        "samples_per_sec": train_output.metrics["train_samples_per_second"],
+        "train_seconds": train_output.metrics["train_runtime"],
+        "test_f1": evaluation["eval_f1"],
+        "test_acc": evaluation["eval_acc"],
+    }
+    return trainer, result